@@ -0,0 +1,197 @@
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from selenium.webdriver.remote.command import Command
+
+from Appium_FW.Utils.HierarchySnapshot import UnsupportedLocatorError
+from Appium_FW.Utils.Instrumentation import Instrumentation, instrumented
+
+# Device round trips a step costs through the plain AppiumActions methods
+# (input_text: find + clear + send_keys, click: find + click, swipe: one actions call)
+UNBATCHED_CALLS = {"fill": 3, "tap": 2, "swipe": 1}
+GESTURES = ("tap", "swipe")
+
+
+class ActionBatch:
+    def __init__(self, actions, flow: str = ""):
+        """
+        Steps of a page flow, run with as few device round trips as possible.
+
+        - fill: one find plus a single set-value command (mobile: replaceElementValue on
+          Android) instead of find + clear + send_keys.
+        - tap/swipe: consecutive gestures are sent as one W3C actions call. When a run of
+          gestures contains taps and more than one step, the tap points are resolved from a
+          single page source pull; a lone tap is a find + click, which costs the same.
+
+        Taps of one run must target the screen shown when the run starts. A tap whose target is
+        not on that screen (e.g. an item of a menu opened by the previous tap) ends the run: the
+        gestures before it are sent first and it is then found on the device and clicked.
+
+        :param actions: AppiumActions of the page.
+        :param flow: Name the flow's round-trip saving is reported under.
+        """
+        self.actions = actions
+        self.flow = flow
+        self.steps: List[Tuple[str, Tuple]] = []
+        self.device_calls = 0
+        self._gestures: List[Dict] = []
+
+    def fill(self, locator_name: str, text: str) -> "ActionBatch":
+        """Replace the text of a field."""
+        self.steps.append(("fill", (locator_name, text)))
+        return self
+
+    def tap(self, locator_name: str) -> "ActionBatch":
+        self.steps.append(("tap", (locator_name,)))
+        return self
+
+    def swipe(self, direction: str = 'up', distance: float = 0.5, duration: int = 1000) -> "ActionBatch":
+        """Swipe like AppiumActions.swipe."""
+        self.steps.append(("swipe", (direction, distance, duration)))
+        return self
+
+    @property
+    def unbatched_calls(self) -> int:
+        """Round trips the steps would cost one by one."""
+        return sum(UNBATCHED_CALLS[kind] for kind, _ in self.steps)
+
+    @instrumented("batch", takes_locator=False)
+    def run(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Run the steps in order.
+
+        :param timeout: Wait for each element found on the device (learned per locator when None).
+        :return: The device calls made, the calls the steps cost one by one, and the saving.
+        """
+        start = time.perf_counter()
+        self.device_calls = 0
+        index = 0
+        while index < len(self.steps):
+            kind, arguments = self.steps[index]
+            if kind == "fill":
+                self._flush()  # Gestures queued before the fill happen before it
+                self._fill(*arguments, timeout)
+                index += 1
+                continue
+            end = index
+            while end < len(self.steps) and self.steps[end][0] in GESTURES:
+                end += 1
+            self._run_gestures(self.steps[index:end], timeout)
+            index = end
+        self._flush()
+        self.actions.invalidate_snapshot()
+
+        result = {"flow": self.flow, "steps": len(self.steps), "device_calls": self.device_calls,
+                  "unbatched_calls": self.unbatched_calls,
+                  "saved_calls": self.unbatched_calls - self.device_calls,
+                  "seconds": time.perf_counter() - start}
+        if Instrumentation.enabled:
+            Instrumentation.record_flow(self.flow, self.device_calls, self.unbatched_calls, result["seconds"])
+        logging.info(f"Flow '{self.flow}': {self.device_calls} device calls instead of {self.unbatched_calls}")
+        return result
+
+    # Steps ----------------------------------------------------------------------------------
+
+    def _find(self, locator_name: str, timeout: Optional[float]):
+        locator_type, locator_value = self.actions.resolve_locator(locator_name)
+
+        def attempt():
+            self.device_calls += 1
+            return self.actions.driver.find_element(locator_type, locator_value)
+
+        return self.actions.waits.until(attempt, key=self.actions.stats_key(locator_name), timeout=timeout,
+                                        message=f"Element '{locator_name}' not found")
+
+    def _fill(self, locator_name: str, text: str, timeout: Optional[float]):
+        element = self._find(locator_name, timeout)
+        self.device_calls += self.actions.set_element_value(element, text)
+        logging.info(f"Entered text '{text}' into element '{locator_name}'")
+
+    def _click(self, locator_name: str, timeout: Optional[float]):
+        self._find(locator_name, timeout).click()
+        self.device_calls += 1
+        logging.info(f"Clicked on element '{locator_name}'")
+
+    def _run_gestures(self, steps: List[Tuple[str, Tuple]], timeout: Optional[float]):
+        resolve_locally = len(steps) > 1 and any(kind == "tap" for kind, _ in steps)
+        snapshot_pulled = False
+        for kind, arguments in steps:
+            if kind == "swipe":
+                self._gestures.append(self._swipe_sequence(*arguments))
+                continue
+            point = None
+            if resolve_locally:
+                if not snapshot_pulled:
+                    self.actions.refresh_snapshot()
+                    self.device_calls += 1
+                    snapshot_pulled = True
+                point = self._tap_point(arguments[0])
+            if point is None:
+                # Not on the screen the run started on: let the previous gestures happen first
+                self._flush()
+                self._click(arguments[0], timeout)
+                resolve_locally = False
+                continue
+            self._gestures.append(self.tap_sequence(*point))
+            logging.info(f"Tapping element '{arguments[0]}' at {point}")
+
+    def _tap_point(self, locator_name: str) -> Optional[Tuple[int, int]]:
+        try:
+            node = self.actions.find_in_snapshot(locator_name)
+        except UnsupportedLocatorError:
+            return None
+        store = self.actions.element_store
+        record = store.record_for(node) if node is not None else None
+        return store.tap_point(record) if record is not None else None
+
+    # W3C actions ----------------------------------------------------------------------------
+
+    @staticmethod
+    def tap_sequence(x: int, y: int, settle_ms: int = 250) -> List[Dict]:
+        """
+        Pointer actions of one tap.
+
+        :param settle_ms: Pause after the tap, letting the app react before the next gesture.
+        """
+        return [{"type": "pointerMove", "duration": 0, "x": x, "y": y},
+                {"type": "pointerDown", "button": 0},
+                {"type": "pause", "duration": 100},
+                {"type": "pointerUp", "button": 0},
+                {"type": "pause", "duration": settle_ms}]
+
+    @staticmethod
+    def perform(driver, sequence: List[Dict]):
+        """Send pointer actions to the device as a single touch input source."""
+        driver.execute(Command.W3C_ACTIONS, {"actions": [{
+            "type": "pointer", "id": "finger", "parameters": {"pointerType": "touch"}, "actions": sequence}]})
+
+    def _swipe_sequence(self, direction: str, distance: float, duration: int) -> List[Dict]:
+        if not self.actions.window_size_cached:
+            self.device_calls += 1
+        size = self.actions.window_size
+        x, y = size['width'] // 2, size['height'] // 2
+        moves = {
+            'up': (x, int(y * (1 + distance)), x, int(y * (1 - distance))),
+            'down': (x, int(y * (1 - distance)), x, int(y * (1 + distance))),
+            'left': (int(x * (1 + distance)), y, int(x * (1 - distance)), y),
+            'right': (int(x * (1 - distance)), y, int(x * (1 + distance)), y),
+        }
+        if direction.lower() not in moves:
+            return []
+        start_x, start_y, end_x, end_y = moves[direction.lower()]
+        return [{"type": "pointerMove", "duration": 0, "x": start_x, "y": start_y},
+                {"type": "pointerDown", "button": 0},
+                {"type": "pointerMove", "duration": duration, "x": end_x, "y": end_y, "origin": "viewport"},
+                {"type": "pointerUp", "button": 0},
+                {"type": "pause", "duration": 250}]
+
+    def _flush(self):
+        """Send the pending gestures as one pointer input source of a single actions call."""
+        sequence = [action for gesture in self._gestures for action in gesture]
+        self._gestures = []
+        if not sequence:
+            return
+        self.perform(self.actions.driver, sequence)
+        self.device_calls += 1
+        self.actions.invalidate_snapshot()
@@ -0,0 +1,290 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+from Appium_FW.Utils.ActionBatch import ActionBatch
+from Appium_FW.Utils.ArtifactPipeline import ArtifactPipeline
+from Appium_FW.Utils.DriverManager import DriverManager
+from Appium_FW.Utils.ElementStore import ElementStore
+from Appium_FW.Utils.HierarchySnapshot import HierarchySnapshot
+from Appium_FW.Utils.LocatorOptimizer import LocatorOptimizer
+
+Point = Tuple[int, int]
+# Attributes that make up a screen's structure; texts and bounds are content, not structure
+STRUCTURAL_ATTRIBUTES = ("class", "type", "resource-id", "content-desc", "clickable", "scrollable")
+
+
+class CrawlAction:
+    def __init__(self, key: str, label: str, point: Point):
+        """
+        A tap the crawler can try on a screen.
+
+        :param key: Identity of the tapped element (class, ids, text and bounds).
+        :param label: Readable name of the element.
+        :param point: Where to tap it.
+        """
+        self.key = key
+        self.label = label
+        self.point = point
+
+
+class CrawlState:
+    def __init__(self, name: str, fingerprint: str, page_source: str, path: List[CrawlAction],
+                 parent: Optional["CrawlState"] = None):
+        """
+        A distinct screen found by the crawler.
+
+        :param name: Page name of the screen; its locators go to <name>_locators.json.
+        :param fingerprint: Structural fingerprint the screen is deduplicated by.
+        :param page_source: Hierarchy the screen was discovered with.
+        :param path: Taps leading from the start screen to this one.
+        :param parent: Screen the last tap of the path was made on.
+        """
+        self.name = name
+        self.fingerprint = fingerprint
+        self.page_source = page_source
+        self.path = path
+        self.parent = parent
+        self.actions: List[CrawlAction] = []
+
+    @property
+    def depth(self) -> int:
+        return len(self.path)
+
+
+class AppCrawler:
+    def __init__(self, driver, output_dir: str = "crawled_pages", device_type: Optional[str] = None,
+                 app_id: Optional[str] = None, max_states: int = 50, max_depth: int = 5,
+                 max_actions_per_state: int = 40, settle_ms: int = 300, reuse_transitions: bool = False):
+        """
+        Breadth-first crawler mapping an app's screens and writing their locator files.
+
+        Every screen is pulled once and reduced to a structural fingerprint (element classes,
+        ids and accessibility labels, no texts or bounds), so a screen already seen is never
+        explored again. Its clickable elements come from the same pull (through an
+        ElementStore, tapping where no other element covers them) and are tried one by one:
+        a tap that leaves the screen unchanged is pruned, and with reuse_transitions an element
+        already tapped on another screen at the same place (tab bars, toolbars) is not tapped
+        again. After a tap the crawler goes back to the screen with one back press, or restarts
+        the app and replays the whole path as a single W3C actions call. Locator files are
+        generated by LocatorOptimizer in the background while the crawl goes on.
+
+        :param driver: Appium WebDriver instance, on the app's start screen.
+        :param output_dir: Where the *_locators.json files and crawl_map.json are written.
+        :param device_type: Locator platform ("android" or "ios"); read from the session when omitted.
+        :param app_id: Package/bundle id used to restart the app; read from the capabilities when omitted.
+        :param max_states: Stop after discovering this many screens.
+        :param max_depth: Do not explore screens more taps away from the start screen.
+        :param max_actions_per_state: Clickable elements tried per screen, in document order.
+        :param settle_ms: Pause after each tap before the screen is pulled.
+        :param reuse_transitions: Assume an element tapped before at the same place does the same
+                                  on every screen. Faster on apps with tab bars and toolbars, but
+                                  a button whose effect depends on the screen it is on is then
+                                  tapped only once, so screens it leads to can be missed.
+        """
+        self.driver = driver
+        self.output_dir = output_dir
+        platform = str((driver.capabilities or {}).get("platformName", "android")).lower()
+        self.device_type = (device_type or ("ios" if platform == "ios" else "android")).lower()
+        self.app_id = app_id or DriverManager._app_id(driver)
+        self.max_states = max_states
+        self.max_depth = max_depth
+        self.max_actions_per_state = max_actions_per_state
+        self.settle_ms = settle_ms
+        self.reuse_transitions = reuse_transitions
+        self.states: Dict[str, CrawlState] = {}  # fingerprint -> state
+        self.transitions: List[Dict] = []
+        self.stats = {"pulls": 0, "taps": 0, "backs": 0, "restarts": 0, "pruned": 0, "reused": 0, "unreachable": 0}
+        self._known_actions: Dict[str, Optional[str]] = {}  # action key -> fingerprint reached (None: no-op)
+        self._current: Optional[CrawlState] = None
+        self._came_from: Optional[CrawlState] = None  # Screen the last tap was made on, if it left it
+        self._writes: List[Future] = []
+
+    # Fingerprints and screens ---------------------------------------------------------------
+
+    @staticmethod
+    def fingerprint(snapshot: HierarchySnapshot) -> str:
+        """Structural fingerprint of a screen: the element tree with its classes and ids."""
+        digest = hashlib.blake2b(digest_size=16)
+        stack = [(snapshot.root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            digest.update(f"{depth}<{node.tag}".encode("utf-8"))
+            for attribute in STRUCTURAL_ATTRIBUTES:
+                value = node.attrib.get(attribute)
+                if value:
+                    digest.update(f" {attribute}={value}".encode("utf-8"))
+            stack.extend((child, depth + 1) for child in reversed(node))
+        return digest.hexdigest()
+
+    def _actions(self, snapshot: HierarchySnapshot) -> List[CrawlAction]:
+        """Clickable elements of the screen that a tap can reach, one per tap point."""
+        store = ElementStore(snapshot)
+        actions, points = [], set()
+        for record in store.records:
+            if not (record.clickable and record.displayed and record.area):
+                continue
+            point = store.tap_point(record)
+            if point is None or point in points:
+                continue
+            points.add(point)
+            identity = [record.node.attrib.get(name, "") for name in ("resource-id", "content-desc", "name", "text")]
+            key = "|".join([record.class_name, *identity, str(record.bounds)])
+            actions.append(CrawlAction(key, record.name or record.class_name, point))
+            if len(actions) == self.max_actions_per_state:
+                break
+        return actions
+
+    def _pull(self) -> Tuple[str, HierarchySnapshot, str]:
+        """One hierarchy pull, serving the fingerprint, the tap targets and the locator file."""
+        page_source = self.driver.page_source
+        self.stats["pulls"] += 1
+        snapshot = HierarchySnapshot(page_source)
+        return page_source, snapshot, self.fingerprint(snapshot)
+
+    def _add_state(self, page_source: str, snapshot: HierarchySnapshot, fingerprint: str,
+                   path: List[CrawlAction], parent: Optional[CrawlState]) -> CrawlState:
+        state = CrawlState(f"screen_{len(self.states):03d}", fingerprint, page_source, path, parent)
+        if state.depth < self.max_depth:
+            state.actions = self._actions(snapshot)
+        self.states[fingerprint] = state
+        self._writes.append(ArtifactPipeline.shared().run(self._write_locators, state))
+        logging.info(f"Discovered {state.name} at depth {state.depth} ({len(state.actions)} actions)")
+        return state
+
+    def _write_locators(self, state: CrawlState):
+        locators, _ = LocatorOptimizer(state.page_source, self.device_type).locators_for_screen()
+        with open(os.path.join(self.output_dir, f"{state.name}_locators.json"), "w", encoding="utf-8") as file:
+            json.dump(locators, file, indent=2, ensure_ascii=False)
+
+    # Navigation -----------------------------------------------------------------------------
+
+    def _tap(self, points: List[Point]):
+        """Tap one or several points in a single actions call."""
+        sequence = [action for point in points for action in ActionBatch.tap_sequence(*point, self.settle_ms)]
+        ActionBatch.perform(self.driver, sequence)
+        self.stats["taps"] += 1
+
+    def _go_to(self, state: CrawlState) -> bool:
+        """Bring the app to the state; False when it cannot be reached anymore."""
+        if self._current is state:
+            return True
+        if self._came_from is state:
+            self.driver.back()
+            self.stats["backs"] += 1
+            if self._arrived(state):
+                return True
+        if not self.app_id:
+            raise Exception("The crawler needs the app id (appPackage/bundleId) to restart the app.")
+        self.driver.terminate_app(self.app_id)
+        self.driver.activate_app(self.app_id)
+        self.stats["restarts"] += 1
+        if state.path:
+            self._tap([action.point for action in state.path])
+        if self._arrived(state):
+            return True
+        self.stats["unreachable"] += 1
+        logging.warning(f"Could not navigate back to {state.name}")
+        return False
+
+    def _arrived(self, state: CrawlState) -> bool:
+        _, _, fingerprint = self._pull()
+        self._current, self._came_from = self.states.get(fingerprint), None
+        return fingerprint == state.fingerprint
+
+    # Crawling -------------------------------------------------------------------------------
+
+    def crawl(self) -> Dict:
+        """
+        Explore the app from the current screen.
+
+        :return: Statistics of the crawl, including the throughput in states per minute.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        start = time.perf_counter()
+        page_source, snapshot, fingerprint = self._pull()
+        self._current = self._add_state(page_source, snapshot, fingerprint, [], None)
+        queue = deque([self._current])
+        while queue:
+            state = queue.popleft()
+            for action in state.actions:
+                if len(self.states) >= self.max_states:
+                    queue.clear()
+                    break
+                if self.reuse_transitions and action.key in self._known_actions:
+                    self._record(state, action, self._known_actions[action.key], reused=True)
+                    continue
+                if not self._go_to(state):
+                    break
+                self._tap([action.point])
+                page_source, snapshot, fingerprint = self._pull()
+                if fingerprint == state.fingerprint:
+                    self._record(state, action, None)
+                    continue
+                target = self.states.get(fingerprint)
+                if target is None:
+                    target = self._add_state(page_source, snapshot, fingerprint, state.path + [action], state)
+                    queue.append(target)
+                self._current, self._came_from = target, state
+                self._record(state, action, fingerprint)
+
+        for write in self._writes:
+            write.result()  # Surface write errors and leave every file complete on return
+        seconds = time.perf_counter() - start
+        result = dict(self.stats, states=len(self.states), transitions=len(self.transitions), seconds=round(seconds, 3),
+                      states_per_minute=round(len(self.states) * 60 / seconds, 1) if seconds else 0.0)
+        self._write_map(result)
+        return result
+
+    def _record(self, state: CrawlState, action: CrawlAction, fingerprint: Optional[str], reused: bool = False):
+        self._known_actions.setdefault(action.key, fingerprint)
+        if reused:
+            self.stats["reused"] += 1
+        if fingerprint is None or fingerprint == state.fingerprint:
+            if not reused:
+                self.stats["pruned"] += 1
+            return
+        self.transitions.append({"from": state.name, "action": action.label, "point": list(action.point),
+                                 "to": self.states[fingerprint].name})
+
+    def _write_map(self, result: Dict):
+        crawl_map = {
+            "stats": result,
+            "states": [{"name": state.name, "fingerprint": state.fingerprint, "depth": state.depth,
+                        "parent": state.parent.name if state.parent else None,
+                        "path": [action.label for action in state.path],
+                        "locator_file": f"{state.name}_locators.json"} for state in self.states.values()],
+            "transitions": self.transitions,
+        }
+        with open(os.path.join(self.output_dir, "crawl_map.json"), "w", encoding="utf-8") as file:
+            json.dump(crawl_map, file, indent=2, ensure_ascii=False)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Crawl the app breadth-first and write a locator file per screen.")
+    parser.add_argument("--output", default="crawled_pages", help="Directory of the locator files and crawl map.")
+    parser.add_argument("--max-states", type=int, default=50)
+    parser.add_argument("--max-depth", type=int, default=5)
+    parser.add_argument("--settle-ms", type=int, default=300, help="Pause after each tap.")
+    args = parser.parse_args(argv)
+
+    driver = DriverManager.init_driver()
+    try:
+        result = AppCrawler(driver, args.output, max_states=args.max_states, max_depth=args.max_depth,
+                            settle_ms=args.settle_ms).crawl()
+    finally:
+        DriverManager.quit_driver()
+    print(f"{result['states']} screens, {result['transitions']} transitions in {result['seconds']}s "
+          f"({result['states_per_minute']} states/min); locator files in {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,62 +1,430 @@
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
 import logging
-from Appium_FW.Utils.LocatorLoader import LocatorLoader
+import re
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
 from appium.webdriver.common.appiumby import AppiumBy
+from Appium_FW.Utils.LocatorLoader import LocatorLoader
+from Appium_FW.Utils.HierarchySnapshot import HierarchySnapshot, UnsupportedLocatorError
+from Appium_FW.Utils.WaitEngine import WaitEngine
+from Appium_FW.Utils.Instrumentation import Instrumentation, instrumented
+from Appium_FW.Utils.ArtifactPipeline import ArtifactPipeline
+from Appium_FW.Utils.ElementStore import ElementStore
+from Appium_FW.Utils.ActionBatch import ActionBatch
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 
 
 class AppiumActions:
-    def __init__(self, driver, locator_loader: LocatorLoader):
-        self.driver = driver
+    def __init__(self, driver, locator_loader: LocatorLoader, use_snapshot: bool = False,
+                 wait_engine: Optional[WaitEngine] = None):
+        """
+        :param driver: Appium WebDriver instance.
+        :param locator_loader: LocatorLoader for the page.
+        :param use_snapshot: Evaluate locators against a locally cached page source and only send
+                             cheap id/bounds lookups to the device. The snapshot is dropped after
+                             every action that can change the screen.
+        :param wait_engine: Polling/timeout policy; defaults to the shared adaptive WaitEngine.
+                            Action timeouts left to None use the timeout it learned for the locator.
+        """
+        self.driver = Instrumentation.instrument_driver(driver)
         self.wait = WebDriverWait(self.driver, 10)  # Default wait time
         self.locator_loader = locator_loader  # LocatorLoader instance
+        self.use_snapshot = use_snapshot
+        self.waits = wait_engine or WaitEngine.shared()
+        self._snapshot: Optional[HierarchySnapshot] = None
+        self._element_store: Optional[ElementStore] = None
+        self._window_size: Optional[Dict[str, int]] = None
+        self._native_scroll: Optional[bool] = None  # Unknown until the first native scroll attempt
+        self._replace_value: Optional[bool] = None  # Unknown until the first set_value on Android
+
+    def resolve_locator(self, locator_name: str) -> Tuple[str, str]:
+        """Return the precompiled (AppiumBy strategy, value) tuple for a locator name."""
+        return self.locator_loader.get_by(locator_name)
+
+    @property
+    def snapshot(self) -> HierarchySnapshot:
+        """The cached hierarchy snapshot, pulled from the device on first use."""
+        if self._snapshot is None:
+            self.refresh_snapshot()
+        return self._snapshot
+
+    @instrumented("page_source", takes_locator=False)
+    def refresh_snapshot(self) -> HierarchySnapshot:
+        """Pull the page source once and cache it for the following read-only queries."""
+        self._snapshot = HierarchySnapshot(self.driver.page_source)
+        return self._snapshot
+
+    def invalidate_snapshot(self):
+        """Drop the cached snapshot; the next query pulls a fresh page source."""
+        self._snapshot = None
+
+    def find_in_snapshot(self, locator_name: str):
+        """
+        Return the snapshot node for a locator, or None when the locator matches nothing.
 
-    def find_element(self, locator_name: str, timeout: int = 10):
-        locator = self.locator_loader.get_locator(locator_name)
-        locator_type = getattr(AppiumBy, locator['type'].upper(), None)
-        locator_value = locator['value']
-        if not locator_type:
-            raise ValueError(f"Invalid locator type: {locator['type']}")
-        return WebDriverWait(self.driver, timeout).until(
-            EC.presence_of_element_located((locator_type, locator_value))
+        :raises UnsupportedLocatorError: If the locator has to be evaluated on the device.
+        """
+        locator_type, locator_value = self.resolve_locator(locator_name)
+        return self.snapshot.find(locator_type, locator_value)
+
+    def stats_key(self, locator_name: str) -> str:
+        """Key under which the locator's latency is learned."""
+        return f"{self.locator_loader.locator_file}:{locator_name}"
+
+    @instrumented("find")
+    def find_element(self, locator_name: str, timeout: Optional[float] = None):
+        locator_type, locator_value = self.resolve_locator(locator_name)
+        if self.use_snapshot:
+            try:
+                node = self.find_in_snapshot(locator_name)
+            except UnsupportedLocatorError as e:
+                logging.debug(f"Evaluating '{locator_name}' on the device: {e}")
+            else:
+                if node is not None:
+                    # Ask the device for the matched node through its cheapest unique locator
+                    locator_type, locator_value = self.snapshot.device_locator(node)
+                else:
+                    # The element may still be rendering; the snapshot is stale either way
+                    self.invalidate_snapshot()
+        return self._find_on_device(locator_name, locator_type, locator_value, timeout)
+
+    def _find_on_device(self, locator_name: str, locator_type: str, locator_value: str, timeout: Optional[float]):
+        return self.waits.until(
+            lambda: self.driver.find_element(locator_type, locator_value),
+            key=self.stats_key(locator_name), timeout=timeout,
+            message=f"Element '{locator_name}' not found"
         )
 
-    def click(self, locator_name: str, timeout: int = 10):
+    @instrumented("is_present")
+    def is_element_present(self, locator_name: str, timeout: float = 0) -> bool:
+        """
+        Check whether an element is on screen, without paying a full timeout when it is not.
+
+        :param locator_name: Name of the locator.
+        :param timeout: How long it may take to appear; 0 checks once.
+        """
+        locator_type, locator_value = self.resolve_locator(locator_name)
+        try:
+            self.waits.until(lambda: self.driver.find_elements(locator_type, locator_value), timeout=timeout)
+            return True
+        except TimeoutException:
+            return False
+
+    @instrumented("is_absent")
+    def is_element_absent(self, locator_name: str, timeout: float = 0) -> bool:
+        """
+        Fast negative check: True as soon as no element matches the locator.
+
+        :param locator_name: Name of the locator.
+        :param timeout: How long the element may take to disappear; 0 checks once.
+        """
+        locator_type, locator_value = self.resolve_locator(locator_name)
+        return self.waits.until_not(lambda: self.driver.find_elements(locator_type, locator_value), timeout)
+
+    @instrumented("wait_stable", takes_locator=False)
+    def wait_until_stable(self, consecutive: int = 2, timeout: Optional[float] = None,
+                          ignore_timestamps: bool = True, ignore_patterns: Tuple[str, ...] = ()) -> str:
+        """
+        Wait until the screen stops changing, e.g. after an animation or a network-driven render.
+
+        The page source is polled with the wait engine's backoff and reduced to a cheap
+        fingerprint that ignores volatile attributes (focused) and clock-like texts; the wait
+        ends as soon as `consecutive` pulls in a row have the same fingerprint. Use it instead of
+        fixed sleeps.
+
+        :param consecutive: Identical pulls in a row that count as settled (at least 2).
+        :param timeout: Seconds to wait; None uses the wait engine's default timeout.
+        :param ignore_timestamps: Ignore clock-like texts such as a status bar time.
+        :param ignore_patterns: Extra regular expressions whose matches are ignored.
+        :return: The fingerprint of the settled screen.
+        :raises TimeoutException: If the screen is still changing when the timeout expires.
+        """
+        consecutive = max(2, consecutive)
+        state = {"fingerprint": None, "matches": 0, "page_source": None}
+
+        def settled():
+            page_source = self.driver.page_source
+            fingerprint = HierarchySnapshot.fast_fingerprint(page_source, ignore_timestamps, ignore_patterns)
+            state["matches"] = state["matches"] + 1 if fingerprint == state["fingerprint"] else 1
+            state["fingerprint"], state["page_source"] = fingerprint, page_source
+            return state["matches"] >= consecutive
+
+        self.waits.until(settled, timeout=timeout, ignored_exceptions=(),
+                         message=f"Screen did not settle ({consecutive} identical pulls in a row)")
+        # The last pull is exactly the settled screen; keep it for snapshot queries
+        self._snapshot = HierarchySnapshot(state["page_source"]) if self.use_snapshot else None
+        return state["fingerprint"]
+
+    @instrumented("click")
+    def click(self, locator_name: str, timeout: Optional[float] = None):
         element = self.find_element(locator_name, timeout)
         element.click()
+        self.invalidate_snapshot()
         logging.info(f"Clicked on element '{locator_name}'")
 
-    def input_text(self, locator_name: str, text: str, timeout: int = 10):
+    @property
+    def element_store(self) -> ElementStore:
+        """Spatial index of the current snapshot, built on first use."""
+        snapshot = self.snapshot
+        if self._element_store is None or self._element_store.snapshot is not snapshot:
+            self._element_store = ElementStore(snapshot)
+        return self._element_store
+
+    @instrumented("tap")
+    def tap(self, locator_name: str, timeout: Optional[float] = None) -> Optional[Tuple[int, int]]:
+        """
+        Tap an element at coordinates resolved locally from the snapshot.
+
+        The tap point is chosen on the element where no other clickable element covers it, and
+        the tap is a single W3C action instead of a find_element plus a click. Elements that
+        are not in the snapshot, or are completely covered, are clicked the usual way; so is
+        every element when snapshot mode is off, as pulling a page source would cost more than
+        the click saves.
+
+        :param locator_name: Name of the locator.
+        :param timeout: Timeout of the fallback click.
+        :return: The tapped (x, y), or None when the fallback click was used.
+        """
+        if not self.use_snapshot:
+            self.click(locator_name, timeout)
+            return None
+        try:
+            node = self.find_in_snapshot(locator_name)
+        except UnsupportedLocatorError:
+            node = None
+        record = self.element_store.record_for(node) if node is not None else None
+        point = self.element_store.tap_point(record) if record is not None else None
+        if point is None:
+            self.click(locator_name, timeout)
+            return None
+        self.driver.tap([point])
+        self.invalidate_snapshot()
+        logging.info(f"Tapped element '{locator_name}' at {point}")
+        return point
+
+    @instrumented("send_keys")
+    def input_text(self, locator_name: str, text: str, timeout: Optional[float] = None):
         element = self.find_element(locator_name, timeout)
         element.clear()
         element.send_keys(text)
+        self.invalidate_snapshot()
         logging.info(f"Entered text '{text}' into element '{locator_name}'")
 
-    def get_text(self, locator_name: str, timeout: int = 10) -> str:
+    @instrumented("set_value")
+    def set_value(self, locator_name: str, text: str, timeout: Optional[float] = None):
+        """
+        Replace the text of a field with a single set-value command.
+
+        On Android this is mobile: replaceElementValue (one round trip instead of the clear
+        and send_keys of input_text); elsewhere, or when the driver does not support it, the
+        field is cleared and typed into.
+        """
+        self.set_element_value(self.find_element(locator_name, timeout), text)
+        self.invalidate_snapshot()
+        logging.info(f"Entered text '{text}' into element '{locator_name}'")
+
+    def set_element_value(self, element, text: str) -> int:
+        """Replace an element's text; returns the number of device calls it took."""
+        calls = 0
+        if self._replace_value is not False and self._is_android():
+            try:
+                self.driver.execute_script('mobile: replaceElementValue', {'elementId': element.id, 'text': text})
+                self._replace_value = True
+                return 1
+            except WebDriverException as e:
+                if self._replace_value:
+                    raise
+                logging.debug(f"replaceElementValue unavailable, clearing and typing instead: {e}")
+                self._replace_value = False
+                calls += 1
+        element.clear()
+        element.send_keys(text)
+        return calls + 2
+
+    def batch(self, flow: str = "") -> ActionBatch:
+        """
+        Start a batch of steps that runs with fewer device round trips, e.g.
+
+            actions.batch("login").fill("username_field", user).fill("password_field", pw).tap("login_button").run()
+
+        :param flow: Name under which the flow's saving is reported by the command_timing plugin.
+        """
+        return ActionBatch(self, flow)
+
+    @instrumented("get_text")
+    def get_text(self, locator_name: str, timeout: Optional[float] = None) -> str:
+        if self.use_snapshot:
+            try:
+                node = self.find_in_snapshot(locator_name)
+            except UnsupportedLocatorError:
+                node = None
+            if node is not None:
+                return self.snapshot.text(node)
         element = self.find_element(locator_name, timeout)
         return element.text
 
-    def scroll_to_element(self, locator_name: str, max_swipes: int = 5):
+    @instrumented("get_texts", takes_locator=False)
+    def get_texts(self, locator_names: List[str], timeout: Optional[float] = None) -> Dict[str, str]:
+        """
+        Read the text of several elements at once.
+
+        In snapshot mode every locator is resolved against the same snapshot, pulled at most
+        once; only the locators it does not find (or cannot evaluate) are looked up on the device.
+
+        :param locator_names: Names of the locators to read.
+        :param timeout: Wait time for each device fallback (learned per locator when None).
+        :return: Mapping of locator name to text.
+        """
+        texts = {}
+        missing = list(locator_names)
+        if self.use_snapshot:
+            snapshot = self.snapshot
+            missing = []
+            for name in locator_names:
+                try:
+                    node = snapshot.find(*self.resolve_locator(name))
+                except UnsupportedLocatorError:
+                    node = None
+                if node is None:
+                    missing.append(name)
+                else:
+                    texts[name] = snapshot.text(node)
+            if missing:
+                self.invalidate_snapshot()  # Some elements may still be rendering
+        for name in missing:
+            texts[name] = self._find_on_device(name, *self.resolve_locator(name), timeout).text
+        return {name: texts[name] for name in locator_names}
+
+    # Swipe direction (finger movement, as used by swipe()) -> scroll direction of the content
+    SCROLL_FOR_SWIPE = {'down': 'up', 'up': 'down', 'left': 'right', 'right': 'left'}
+    # Swipes moving through a list toward its end (the way UiScrollable searches)
+    FORWARD_SWIPES = ('up', 'left')
+
+    @instrumented("scroll_to")
+    def scroll_to_element(self, locator_name: str, max_swipes: int = 5, direction: str = 'down'):
         """
         Scrolls to an element by locator name, performing swipe actions until it’s found
         or max_swipes is reached.
+
+        On Android, forward searches (direction 'up' or 'left') of locators with a UiSelector
+        equivalent are handed to UiScrollable, which searches the list in a single command with
+        at most max_swipes scrolls; when it does not find the element the list has been searched
+        and nothing else is tried. Otherwise the current hierarchy is checked locally before every
+        scroll, scrolling uses the native scroll gesture when available, and the search stops as
+        soon as the list reports or shows its end.
+
+        :param locator_name: Name of the locator to bring on screen.
+        :param max_swipes: Maximum number of scrolls.
+        :param direction: Swipe direction, as for swipe().
         """
-        locator = self.locator_loader.get_locator(locator_name)
-        locator_type = getattr(AppiumBy, locator['type'].upper(), None)
-        locator_value = locator['value']
+        locator_type, locator_value = self.resolve_locator(locator_name)
+        if direction.lower() in self.FORWARD_SWIPES:
+            element, searched = self._scroll_into_view_natively(locator_type, locator_value, direction, max_swipes)
+            if searched:
+                self.invalidate_snapshot()  # UiScrollable moved the list
+                if element is not None:
+                    return element
+                raise TimeoutException(f"Element '{locator_name}' not found after {max_swipes} swipes.")
 
-        for _ in range(max_swipes):
+        previous_fingerprint = None
+        at_end = False
+        for swipes in range(max_swipes + 1):
+            snapshot = self.refresh_snapshot()
             try:
-                element = self.find_element(locator_name, timeout=3)
-                return element
-            except TimeoutException:
-                self.swipe('down')
-        raise TimeoutException(f"Element '{locator_name}' not found after {max_swipes} swipes.")
+                if snapshot.find(locator_type, locator_value) is not None:
+                    return self.find_element(locator_name)
+            except UnsupportedLocatorError:
+                # Cannot be evaluated locally: a single device check, no waiting
+                found = self.driver.find_elements(locator_type, locator_value)
+                if found:
+                    return found[0]
+
+            if swipes == max_swipes or at_end or snapshot.fingerprint == previous_fingerprint:
+                break  # Out of swipes, or the last scroll reached (or did not move) the end of the list
+            previous_fingerprint = snapshot.fingerprint
+            at_end = not self._scroll(direction, snapshot)
+        raise TimeoutException(f"Element '{locator_name}' not found after {swipes} swipes.")
 
+    def _uiscrollable_selector(self, locator_type: str, locator_value: str) -> Optional[str]:
+        """Translate a locator into a UiSelector expression, or None if it has no exact equivalent."""
+        quote = HierarchySnapshot.uiselector_string
+        if locator_type == AppiumBy.ID:
+            if ':id/' in locator_value:
+                return f'new UiSelector().resourceId({quote(locator_value)})'
+            return f'new UiSelector().resourceIdMatches({quote(".*:id/" + re.escape(locator_value))})'
+        if locator_type == AppiumBy.ACCESSIBILITY_ID:
+            return f'new UiSelector().description({quote(locator_value)})'
+        if locator_type == AppiumBy.XPATH:
+            match = re.fullmatch(r"//([\w.]+|\*)((?:\[@[\w-]+='[^']*'\])+)", locator_value)
+            if not match:
+                return None
+            selector = 'new UiSelector()'
+            if match.group(1) != '*':
+                selector += f'.className({quote(match.group(1))})'
+            for attribute, value in re.findall(r"\[@([\w-]+)='([^']*)'\]", match.group(2)):
+                if attribute not in HierarchySnapshot.UISELECTOR_METHODS:
+                    return None
+                selector += f'.{HierarchySnapshot.UISELECTOR_METHODS[attribute]}({quote(value)})'
+            return selector
+        return None
+
+    def _is_android(self) -> bool:
+        capabilities = getattr(self.driver, 'capabilities', None) or {}
+        return str(capabilities.get('platformName', '')).lower() == 'android'
+
+    def _scroll_into_view_natively(self, locator_type: str, locator_value: str, direction: str,
+                                   max_swipes: int) -> Tuple[Optional[object], bool]:
+        """
+        Let UiScrollable search the list on the device.
+
+        :return: The element (or None), and whether the list was searched: False when UiScrollable
+                 is not applicable or not supported, so the search has to be done step by step.
+        """
+        if not self._is_android():
+            return None, False
+        selector = self._uiscrollable_selector(locator_type, locator_value)
+        if selector is None:
+            return None, False
+        orientation = 'setAsHorizontalList()' if direction.lower() in ('left', 'right') else 'setAsVerticalList()'
+        try:
+            return self.driver.find_element(
+                AppiumBy.ANDROID_UIAUTOMATOR,
+                f'new UiScrollable(new UiSelector().scrollable(true).instance(0)).{orientation}'
+                f'.setMaxSearchSwipes({max_swipes}).scrollIntoView({selector})'), True
+        except NoSuchElementException:
+            return None, True
+        except WebDriverException as e:
+            logging.debug(f"UiScrollable search failed, scrolling step by step: {e}")
+            return None, False
+
+    def _scroll(self, direction: str, snapshot: HierarchySnapshot) -> bool:
+        """
+        Scroll one page with the native gesture when supported, otherwise with a swipe.
+
+        :return: False when the native gesture reported the end of the list.
+        """
+        if self._native_scroll is not False:
+            scroll_direction = self.SCROLL_FOR_SWIPE[direction.lower()]
+            try:
+                if self._is_android():
+                    area = snapshot.scrollable_area() or {'left': 0, 'top': 0, **self.window_size}
+                    can_scroll_more = self.driver.execute_script(
+                        'mobile: scrollGesture', {**area, 'direction': scroll_direction, 'percent': 0.75})
+                else:
+                    can_scroll_more = self.driver.execute_script('mobile: scroll', {'direction': scroll_direction})
+                self._native_scroll = True
+                self.invalidate_snapshot()
+                return can_scroll_more is not False
+            except WebDriverException as e:
+                logging.debug(f"Native scroll unavailable, falling back to swipes: {e}")
+                self._native_scroll = False
+        self.swipe(direction)
+        return True
+
+    @instrumented("swipe", takes_locator=False)
     def swipe(self, direction: str = 'up', distance: float = 0.5, duration: int = 1000):
         """Swipe in a specified direction by a certain distance and duration."""
-        size = self.driver.get_window_size()
+        size = self.window_size
         x, y = size['width'] // 2, size['height'] // 2
         if direction.lower() == 'up':
             self.driver.swipe(x, int(y * (1 + distance)), x, int(y * (1 - distance)), duration)
@@ -66,17 +434,63 @@ class AppiumActions:
             self.driver.swipe(int(x * (1 + distance)), y, int(x * (1 - distance)), y, duration)
         elif direction.lower() == 'right':
             self.driver.swipe(int(x * (1 - distance)), y, int(x * (1 + distance)), y, duration)
+        self.invalidate_snapshot()
+
+    @property
+    def window_size(self) -> Dict[str, int]:
+        """Window width/height, fetched once and cached (call refresh_window_geometry after a rotation)."""
+        if self._window_size is None:
+            self._window_size = self.driver.get_window_size()
+        return self._window_size
+
+    @property
+    def window_size_cached(self) -> bool:
+        """True when window_size is known and reading it costs no device call."""
+        return self._window_size is not None
+
+    def refresh_window_geometry(self):
+        """Forget the cached window size."""
+        self._window_size = None
 
     def switch_to_context(self, context_name: str):
         """Switches to a specific context (e.g., WEBVIEW or NATIVE_APP)."""
         available_contexts = self.driver.contexts
         if context_name in available_contexts:
             self.driver.switch_to.context(context_name)
+            self.invalidate_snapshot()
             logging.info(f"Switched to context: {context_name}")
         else:
             raise ValueError(f"Context {context_name} not found. Available contexts: {available_contexts}")
 
-    def capture_screenshot(self, file_path: str):
-        """Captures a screenshot and saves it to the specified file path."""
-        self.driver.save_screenshot(file_path)
-        logging.info(f"Screenshot saved to {file_path}")
\ No newline at end of file
+    @instrumented("screenshot", takes_locator=False)
+    def capture_screenshot(self, file_path: Optional[str] = None, asynchronous: bool = True,
+                           label: str = "") -> Optional[Future]:
+        """
+        Captures a screenshot of the screen as it is now; by default only writing it is left to the background.
+
+        :param file_path: Save the PNG to this path; when omitted the screenshot goes to the shared
+                          artifact store (content-addressed and compressed).
+        :param asynchronous: Compress and write on the artifact pipeline instead of blocking the test (the
+                             PNG itself is always fetched before returning); ArtifactPipeline.shared().flush()
+                             waits for pending writes.
+        :param label: Test or step name recorded with a stored screenshot.
+        :return: The pending write when asynchronous, otherwise None.
+        """
+        png = self.driver.get_screenshot_as_png()
+        if file_path is None:
+            pending = ArtifactPipeline.shared().submit(png, "screenshot", "png", label)
+        elif asynchronous:
+            pending = ArtifactPipeline.shared().run(self._save_screenshot, file_path, png)
+        else:
+            self._save_screenshot(file_path, png)
+            return None
+        if asynchronous:
+            return pending
+        pending.result()
+        return None
+
+    @staticmethod
+    def _save_screenshot(file_path: str, png: bytes):
+        with open(file_path, "wb") as file:
+            file.write(png)
+        logging.info(f"Screenshot saved to {file_path}")
@@ -0,0 +1,238 @@
+import atexit
+import gzip
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Union
+
+Content = Union[str, bytes]
+
+
+class ArtifactStore:
+    def __init__(self, directory: str = "artifacts", compress_level: int = 6):
+        """
+        Content-addressed, gzip-compressed artifact storage.
+
+        Every artifact is stored once under objects/<sha[:2]>/<sha>.<ext>.gz, where sha is the
+        SHA-256 of the uncompressed content, so identical screens captured by many tests cost a
+        single file. manifest.jsonl maps each capture (test, kind) to the object it points at.
+
+        :param directory: Root directory of the store.
+        :param compress_level: gzip level; low levels trade size for CPU time.
+        """
+        self.directory = directory
+        self.compress_level = compress_level
+        self.manifest_file = os.path.join(directory, "manifest.jsonl")
+        self._lock = threading.Lock()
+        self._claimed = set()  # Objects written by this process
+
+    def object_path(self, digest: str, extension: str) -> str:
+        return os.path.join(self.directory, "objects", digest[:2], f"{digest}.{extension}.gz")
+
+    def put(self, content: Content, extension: str) -> Dict:
+        """
+        Store content unless an identical object already exists.
+
+        :param content: Artifact bytes (str is encoded as UTF-8).
+        :param extension: File extension of the uncompressed artifact (e.g. "png").
+        :return: {"sha256", "path", "size", "stored_size", "deduplicated"}.
+        """
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.object_path(digest, extension)
+        deduplicated = {"sha256": digest, "path": path, "size": len(content), "stored_size": 0, "deduplicated": True}
+        with self._lock:
+            if path in self._claimed or os.path.exists(path):
+                return deduplicated
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        compressed = gzip.compress(content, compresslevel=self.compress_level, mtime=0)
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporary, "wb") as file:
+                file.write(compressed)
+            os.replace(temporary, path)  # Concurrent writers of the same object write identical bytes
+        except OSError:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+        # Claimed only once the object is in place, so a failed write never passes for a stored one
+        with self._lock:
+            if path in self._claimed:  # Another thread wrote the same object meanwhile
+                return deduplicated
+            self._claimed.add(path)
+        return {"sha256": digest, "path": path, "size": len(content),
+                "stored_size": len(compressed), "deduplicated": False}
+
+    def record(self, entry: Dict):
+        """Append one capture to the manifest."""
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.manifest_file, "a", encoding="utf-8") as file:
+                file.write(json.dumps(entry, sort_keys=True) + "\n")
+
+    def read(self, digest: str, extension: str) -> bytes:
+        """Return the uncompressed content of a stored object."""
+        path = self.object_path(digest, extension)
+        if not os.path.exists(path):
+            raise Exception(f"Artifact '{path}' not found.")
+        with gzip.open(path, "rb") as file:
+            return file.read()
+
+
+class ArtifactPipeline:
+    _shared: Optional["ArtifactPipeline"] = None
+    _shared_lock = threading.Lock()
+    _atexit_registered = False
+
+    # What a capture may contain: kind -> (file extension, how to fetch it from the driver)
+    FETCHERS: Dict[str, tuple] = {
+        "screenshot": ("png", lambda driver: driver.get_screenshot_as_png()),
+        "page_source": ("xml", lambda driver: driver.page_source),
+    }
+
+    def __init__(self, store: Optional[ArtifactStore] = None, max_workers: int = 4,
+                 sample_rate: float = 0.0, seed: Optional[int] = None):
+        """
+        Background capture, compression and storage of test artifacts.
+
+        Fetching, hashing, compressing and writing all run on a thread pool, so a capture only
+        costs the test thread the time needed to queue it. flush() waits for everything queued.
+
+        :param store: Where artifacts go; defaults to an ArtifactStore in ./artifacts.
+        :param max_workers: Background threads (screenshot and page source are fetched in parallel).
+        :param sample_rate: Fraction of passing tests to capture as well (0 = failures only).
+        :param seed: Seed of the sampling decisions, for reproducible runs.
+        """
+        self.store = store or ArtifactStore()
+        self.sample_rate = sample_rate
+        self._random = random.Random(seed)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="artifact-pipeline")
+        self._pending: List[Future] = []
+        self._lock = threading.Lock()
+        self.stats = {"captures": 0, "objects_written": 0, "deduplicated": 0, "bytes_in": 0, "bytes_stored": 0,
+                      "errors": 0}
+
+    @classmethod
+    def shared(cls) -> "ArtifactPipeline":
+        """Process-wide pipeline, flushed when the interpreter exits."""
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._install(cls())
+        return cls._shared
+
+    @classmethod
+    def configure(cls, directory: str = "artifacts", sample_rate: float = 0.0, **kwargs) -> "ArtifactPipeline":
+        """Replace the shared pipeline (flushing the previous one) with one writing to `directory`."""
+        with cls._shared_lock:
+            previous = cls._shared
+            cls._install(cls(ArtifactStore(directory), sample_rate=sample_rate, **kwargs))
+        if previous is not None:
+            previous.flush()
+        return cls._shared
+
+    @classmethod
+    def _install(cls, pipeline: "ArtifactPipeline"):
+        if cls._shared is None and not cls._atexit_registered:
+            atexit.register(cls._flush_shared)
+            cls._atexit_registered = True
+        cls._shared = pipeline
+
+    @classmethod
+    def _flush_shared(cls):
+        if cls._shared is not None:
+            cls._shared.flush()
+
+    def should_capture(self, failed: bool) -> bool:
+        """Failures are always captured; passing tests according to sample_rate."""
+        return failed or (self.sample_rate > 0 and self._random.random() < self.sample_rate)
+
+    def run(self, function: Callable, *args, **kwargs) -> Future:
+        """Run any side output on the pipeline's threads; flush() waits for it too."""
+        future = self._executor.submit(function, *args, **kwargs)
+        with self._lock:
+            self._pending = [pending for pending in self._pending if not pending.done()]
+            self._pending.append(future)
+        return future
+
+    def submit(self, content: Content, kind: str, extension: str, test: str = "",
+               metadata: Optional[Dict] = None) -> Future:
+        """
+        Queue already fetched content for compression and storage.
+
+        :return: Future of the manifest entry.
+        """
+        return self.run(self._store, content, kind, extension, test, metadata or {})
+
+    def capture(self, driver, test: str = "", kinds=("screenshot", "page_source"),
+                metadata: Optional[Dict] = None) -> Dict[str, Future]:
+        """
+        Fetch artifacts from the device in the background and store them.
+
+        :param driver: Driver to fetch from; it must stay usable until the fetches are done
+                       (see wait_for_fetches).
+        :param test: Test (or any label) the capture belongs to.
+        :param kinds: Subset of FETCHERS to capture.
+        :param metadata: Extra fields recorded in the manifest.
+        :return: kind -> Future of the fetched content.
+        """
+        fetches = {}
+        for kind in kinds:
+            extension, fetch = self.FETCHERS[kind]
+            fetches[kind] = self.run(self._fetch_and_store, driver, fetch, kind, extension, test, metadata or {})
+        return fetches
+
+    @staticmethod
+    def wait_for_fetches(fetches: Dict[str, Future], timeout: Optional[float] = None):
+        """Block until the device part of a capture is done (storage may still be running)."""
+        wait([future for future in fetches.values()], timeout=timeout)
+
+    def _fetch_and_store(self, driver, fetch: Callable, kind: str, extension: str, test: str,
+                         metadata: Dict) -> Optional[Content]:
+        try:
+            content = fetch(driver)
+        except Exception as e:
+            with self._lock:
+                self.stats["errors"] += 1
+            logging.warning(f"Could not capture {kind} for '{test}': {e}")
+            return None
+        # Compression and the write go back on the queue so the fetch future completes first
+        self.submit(content, kind, extension, test, metadata)
+        return content
+
+    def _store(self, content: Content, kind: str, extension: str, test: str, metadata: Dict) -> Dict:
+        try:
+            stored = self.store.put(content, extension)
+        except OSError as e:
+            with self._lock:
+                self.stats["errors"] += 1
+            logging.warning(f"Could not store {kind} for '{test}': {e}")
+            raise
+        entry = {"time": round(time.time(), 3), "test": test, "kind": kind, "extension": extension,
+                 "sha256": stored["sha256"], "size": stored["size"], **metadata}
+        self.store.record(entry)
+        with self._lock:
+            self.stats["captures"] += 1
+            self.stats["bytes_in"] += stored["size"]
+            self.stats["bytes_stored"] += stored["stored_size"]
+            self.stats["deduplicated" if stored["deduplicated"] else "objects_written"] += 1
+        return entry
+
+    def flush(self, timeout: Optional[float] = None):
+        """Wait for every queued capture, including stores queued by fetches still running."""
+        while True:
+            with self._lock:
+                pending = [future for future in self._pending if not future.done()]
+            if not pending:
+                return
+            done, not_done = wait(pending, timeout=timeout)
+            if not_done:
+                logging.warning(f"{len(not_done)} artifact job(s) still running after {timeout}s")
+                return
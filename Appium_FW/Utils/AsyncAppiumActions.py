@@ -0,0 +1,178 @@
+import asyncio
+import functools
+import logging
+import threading
+from typing import Coroutine, Dict, List, Optional, Tuple
+
+from selenium.common.exceptions import TimeoutException
+
+from Appium_FW.Utils.AsyncAppiumClient import AsyncSession
+from Appium_FW.Utils.HierarchySnapshot import HierarchySnapshot
+from Appium_FW.Utils.LocatorLoader import LocatorLoader
+from Appium_FW.Utils.WaitEngine import WaitEngine
+
+
+class AsyncAppiumActions:
+    def __init__(self, session: AsyncSession, locator_loader: LocatorLoader, wait_engine: Optional[WaitEngine] = None):
+        """
+        Coroutine counterpart of AppiumActions for an AsyncSession.
+
+        Method names, arguments and waits match AppiumActions, so a flow can move between the
+        two backends unchanged; element handles are W3C element ids.
+
+        :param session: Session created by an AsyncAppiumClient.
+        :param locator_loader: Locators of the page.
+        :param wait_engine: Adaptive wait engine; defaults to the process-wide one.
+        """
+        self.session = session
+        self.locator_loader = locator_loader
+        self.waits = wait_engine or WaitEngine.shared()
+        self._window_size: Optional[Dict[str, int]] = None
+
+    def resolve_locator(self, locator_name: str) -> Tuple[str, str]:
+        """Return the precompiled (AppiumBy strategy, value) tuple for a locator name."""
+        return self.locator_loader.get_by(locator_name)
+
+    def stats_key(self, locator_name: str) -> str:
+        return f"{self.locator_loader.locator_file}:{locator_name}"
+
+    async def find_element(self, locator_name: str, timeout: Optional[float] = None) -> str:
+        """Find an element by locator name, polling with the wait engine's backoff."""
+        locator_type, locator_value = self.resolve_locator(locator_name)
+        return await self.waits.until_async(
+            lambda: self.session.find_element(locator_type, locator_value),
+            key=self.stats_key(locator_name), timeout=timeout,
+            message=f"Element '{locator_name}' not found"
+        )
+
+    async def is_element_present(self, locator_name: str, timeout: float = 0) -> bool:
+        locator_type, locator_value = self.resolve_locator(locator_name)
+        try:
+            await self.waits.until_async(lambda: self.session.find_elements(locator_type, locator_value),
+                                         timeout=timeout)
+            return True
+        except TimeoutException:
+            return False
+
+    async def click(self, locator_name: str, timeout: Optional[float] = None):
+        element = await self.find_element(locator_name, timeout)
+        await self.session.click(element)
+        logging.info(f"Clicked on element '{locator_name}'")
+
+    async def input_text(self, locator_name: str, text: str, timeout: Optional[float] = None):
+        element = await self.find_element(locator_name, timeout)
+        await self.session.clear(element)
+        await self.session.send_keys(element, text)
+        logging.info(f"Entered text '{text}' into element '{locator_name}'")
+
+    async def get_text(self, locator_name: str, timeout: Optional[float] = None) -> str:
+        element = await self.find_element(locator_name, timeout)
+        return await self.session.text(element)
+
+    async def get_texts(self, locator_names: List[str], timeout: Optional[float] = None) -> Dict[str, str]:
+        """Read several texts with the lookups in flight at the same time."""
+        texts = await asyncio.gather(*(self.get_text(name, timeout) for name in locator_names))
+        return dict(zip(locator_names, texts))
+
+    async def page_source(self) -> str:
+        return await self.session.page_source()
+
+    async def wait_until_stable(self, consecutive: int = 2, timeout: Optional[float] = None,
+                                ignore_timestamps: bool = True, ignore_patterns: Tuple[str, ...] = ()) -> str:
+        """
+        Wait until the screen stops changing; see AppiumActions.wait_until_stable.
+
+        :return: The fingerprint of the settled screen.
+        :raises TimeoutException: If the screen is still changing when the timeout expires.
+        """
+        consecutive = max(2, consecutive)
+        state = {"fingerprint": None, "matches": 0}
+
+        async def settled():
+            fingerprint = HierarchySnapshot.fast_fingerprint(await self.session.page_source(),
+                                                             ignore_timestamps, ignore_patterns)
+            state["matches"] = state["matches"] + 1 if fingerprint == state["fingerprint"] else 1
+            state["fingerprint"] = fingerprint
+            return state["matches"] >= consecutive
+
+        await self.waits.until_async(settled, timeout=timeout, ignored_exceptions=(),
+                                     message=f"Screen did not settle ({consecutive} identical pulls in a row)")
+        return state["fingerprint"]
+
+    async def window_size(self) -> Dict[str, int]:
+        """Window width/height, fetched once and cached."""
+        if self._window_size is None:
+            self._window_size = await self.session.window_size()
+        return self._window_size
+
+    async def swipe(self, direction: str = 'up', distance: float = 0.5, duration: int = 1000):
+        """Swipe in a specified direction by a certain distance and duration."""
+        size = await self.window_size()
+        x, y = size['width'] // 2, size['height'] // 2
+        moves = {
+            'up': (x, int(y * (1 + distance)), x, int(y * (1 - distance))),
+            'down': (x, int(y * (1 - distance)), x, int(y * (1 + distance))),
+            'left': (int(x * (1 + distance)), y, int(x * (1 - distance)), y),
+            'right': (int(x * (1 - distance)), y, int(x * (1 + distance)), y),
+        }
+        if direction.lower() in moves:
+            await self.session.swipe(*moves[direction.lower()], duration)
+
+
+class AsyncRunner:
+    _shared: Optional["AsyncRunner"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self):
+        """An event loop on a background thread, so synchronous code can call coroutines."""
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="async-appium", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def shared(cls) -> "AsyncRunner":
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+
+    def run(self, coroutine: Coroutine, timeout: Optional[float] = None):
+        """Run a coroutine on the loop and block until its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+class SyncActionsAdapter:
+    def __init__(self, actions: AsyncAppiumActions, runner: Optional[AsyncRunner] = None):
+        """
+        Expose AsyncAppiumActions with the blocking AppiumActions interface.
+
+        Page objects written against AppiumActions (e.g. LoginPage) take this in place of
+        AppiumActions and then run on the async backend; the coroutines run on the runner's
+        loop, which can be shared with sessions driven concurrently from async code.
+
+        :param actions: The async actions to wrap.
+        :param runner: Loop to run them on; defaults to the process-wide runner.
+        """
+        self.actions = actions
+        self.runner = runner or AsyncRunner.shared()
+
+    def __getattr__(self, name):
+        attribute = getattr(self.actions, name)
+        if not asyncio.iscoroutinefunction(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        def call(*args, **kwargs):
+            return self.runner.run(attribute(*args, **kwargs))
+        return call
+
+    def batch(self, flow: str = ""):
+        """ActionBatch drives a WebDriver directly; fail before any step runs rather than halfway."""
+        raise NotImplementedError("Batched actions need AppiumActions and a WebDriver; "
+                                  "use the unbatched steps on the async backend.")
@@ -0,0 +1,173 @@
+from typing import Any, Dict, List, Optional
+
+from selenium.common.exceptions import (InvalidSessionIdException, NoSuchElementException,
+                                        StaleElementReferenceException, TimeoutException, WebDriverException)
+
+try:
+    import aiohttp
+except ImportError:  # Optional: only the async backend needs it
+    aiohttp = None
+
+# W3C key under which element references are exchanged
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+# W3C error codes raised as the same exceptions the Selenium client raises
+W3C_ERRORS = {
+    "no such element": NoSuchElementException,
+    "stale element reference": StaleElementReferenceException,
+    "invalid session id": InvalidSessionIdException,
+    "timeout": TimeoutException,
+}
+
+
+class AsyncAppiumClient:
+    def __init__(self, limit: int = 100, limit_per_host: int = 0, keepalive_timeout: float = 60.0,
+                 request_timeout: float = 120.0):
+        """
+        Asynchronous W3C/Appium client on one pooled keep-alive HTTP session.
+
+        All sessions created through the client share its connection pool, so a single event
+        loop can drive many devices (and many Appium servers) with connections reused across
+        commands instead of one thread and one connection pool per device.
+
+        :param limit: Maximum open connections in total.
+        :param limit_per_host: Maximum open connections per Appium server (0 = no limit).
+        :param keepalive_timeout: Seconds an idle connection is kept for reuse.
+        :param request_timeout: Seconds a single command may take.
+        """
+        if aiohttp is None:
+            raise Exception("The async client needs aiohttp: pip install aiohttp")
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.request_timeout = request_timeout
+        self._http: Optional["aiohttp.ClientSession"] = None
+
+    def _session(self) -> "aiohttp.ClientSession":
+        # Created lazily: aiohttp binds the connector to the running event loop
+        if self._http is None or self._http.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host,
+                                             keepalive_timeout=self.keepalive_timeout)
+            self._http = aiohttp.ClientSession(connector=connector,
+                                               timeout=aiohttp.ClientTimeout(total=self.request_timeout))
+        return self._http
+
+    async def request(self, method: str, url: str, body: Optional[Dict] = None) -> Any:
+        """
+        Send one command and return its W3C "value".
+
+        :raises WebDriverException: (or the matching subclass) for W3C errors.
+        """
+        async with self._session().request(method, url, json=body if method == "POST" else None) as response:
+            payload = await response.json(content_type=None)
+        value = payload.get("value") if isinstance(payload, dict) else None
+        if response.status >= 400 or (isinstance(value, dict) and "error" in value):
+            error = value.get("error", "unknown error") if isinstance(value, dict) else "unknown error"
+            message = value.get("message", "") if isinstance(value, dict) else str(payload)
+            raise W3C_ERRORS.get(error, WebDriverException)(f"{error}: {message}")
+        return value
+
+    async def create_session(self, server_url: str, capabilities: Dict[str, Any]) -> "AsyncSession":
+        """
+        Start a session on an Appium server.
+
+        :param server_url: e.g. "http://localhost:4723".
+        :param capabilities: W3C capabilities, e.g. DriverManager.capabilities().
+        """
+        server_url = server_url.rstrip("/")
+        value = await self.request("POST", f"{server_url}/session",
+                                   {"capabilities": {"alwaysMatch": capabilities, "firstMatch": [{}]}})
+        return AsyncSession(self, server_url, value["sessionId"], value.get("capabilities", {}))
+
+    async def close(self):
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+
+    async def __aenter__(self) -> "AsyncAppiumClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+class AsyncSession:
+    def __init__(self, client: AsyncAppiumClient, server_url: str, session_id: str, capabilities: Dict[str, Any]):
+        """
+        One Appium session driven through an AsyncAppiumClient.
+
+        :param client: Client whose connection pool carries the commands.
+        :param server_url: Appium server the session lives on.
+        :param session_id: W3C session id.
+        :param capabilities: Capabilities returned by the server.
+        """
+        self.client = client
+        self.server_url = server_url
+        self.session_id = session_id
+        self.capabilities = capabilities
+
+    async def command(self, method: str, path: str = "", body: Optional[Dict] = None) -> Any:
+        return await self.client.request(method, f"{self.server_url}/session/{self.session_id}{path}", body)
+
+    async def find_element(self, by: str, value: str) -> str:
+        """Return the element id of the first match (raises NoSuchElementException)."""
+        element = await self.command("POST", "/element", {"using": by, "value": value})
+        return element[ELEMENT_KEY]
+
+    async def find_elements(self, by: str, value: str) -> List[str]:
+        elements = await self.command("POST", "/elements", {"using": by, "value": value})
+        return [element[ELEMENT_KEY] for element in elements]
+
+    async def click(self, element_id: str):
+        await self.command("POST", f"/element/{element_id}/click", {})
+
+    async def clear(self, element_id: str):
+        await self.command("POST", f"/element/{element_id}/clear", {})
+
+    async def send_keys(self, element_id: str, text: str):
+        await self.command("POST", f"/element/{element_id}/value", {"text": text, "value": list(text)})
+
+    async def text(self, element_id: str) -> str:
+        return await self.command("GET", f"/element/{element_id}/text")
+
+    async def attribute(self, element_id: str, name: str) -> Optional[str]:
+        return await self.command("GET", f"/element/{element_id}/attribute/{name}")
+
+    async def page_source(self) -> str:
+        return await self.command("GET", "/source")
+
+    async def window_size(self) -> Dict[str, int]:
+        rect = await self.command("GET", "/window/rect")
+        return {"width": rect["width"], "height": rect["height"]}
+
+    async def execute_script(self, script: str, *args) -> Any:
+        return await self.command("POST", "/execute/sync", {"script": script, "args": list(args)})
+
+    async def perform_actions(self, actions: List[Dict]):
+        await self.command("POST", "/actions", {"actions": actions})
+
+    async def swipe(self, start_x: int, start_y: int, end_x: int, end_y: int, duration: int = 1000):
+        """Touch swipe as one W3C pointer action sequence, like driver.swipe."""
+        await self.perform_actions([{
+            "type": "pointer", "id": "finger", "parameters": {"pointerType": "touch"},
+            "actions": [
+                {"type": "pointerMove", "duration": 0, "x": start_x, "y": start_y},
+                {"type": "pointerDown", "button": 0},
+                {"type": "pointerMove", "duration": duration, "x": end_x, "y": end_y, "origin": "viewport"},
+                {"type": "pointerUp", "button": 0},
+            ],
+        }])
+
+    async def tap(self, x: int, y: int):
+        await self.perform_actions([{
+            "type": "pointer", "id": "finger", "parameters": {"pointerType": "touch"},
+            "actions": [
+                {"type": "pointerMove", "duration": 0, "x": x, "y": y},
+                {"type": "pointerDown", "button": 0},
+                {"type": "pause", "duration": 100},
+                {"type": "pointerUp", "button": 0},
+            ],
+        }])
+
+    async def quit(self):
+        await self.command("DELETE")
+
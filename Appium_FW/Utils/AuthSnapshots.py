@@ -0,0 +1,251 @@
+import base64
+import glob
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import zipfile
+from typing import Callable, Dict, Iterable, Optional
+
+from selenium.common.exceptions import WebDriverException
+
+BUILD_ENV = "APPIUM_FW_APP_BUILD"
+STRATEGIES = ("session", "deep_link", "app_data")
+
+
+class AuthSnapshots:
+    """
+    Logged-in app states, so tests that need a logged-in user skip the UI login.
+
+    The first test logging a user in goes through the UI; later ones get the same state back
+    with the first of these that works, each checked with is_logged_in():
+
+    - session: the pooled session is still logged in as that user on that build. The pool's
+      reset between tests restarts the app with noReset, and the app keeps its login.
+    - deep_link: a debug deep link of the app logs the user in (config "deep_link", e.g.
+      "myapp://debug/login?user={user}").
+    - app_data: the app's data folders (shared_prefs, databases) pulled after the UI login are
+      pushed back into the cleared app. Android only; the app must be debuggable, its data is
+      reached through Appium's "@<package>/<path>" form (run-as), so no root is needed and the
+      restored files keep the app's ownership.
+
+    Snapshots are keyed by user and app build, so a new build never restores the data of an old
+    one, and capturing a user's snapshot deletes the ones of other builds.
+    """
+    _shared: Optional["AuthSnapshots"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, directory: str = "auth_snapshots", strategies: Iterable[str] = STRATEGIES,
+                 deep_link: Optional[str] = None, app_data_folders: Iterable[str] = ("shared_prefs", "databases"),
+                 build: Optional[str] = None, max_age_seconds: float = 12 * 3600):
+        """
+        :param directory: Where app data snapshots are stored.
+        :param strategies: Restore strategies to try, in order (see STRATEGIES).
+        :param deep_link: Deep link template logging a user in, formatted with {user}.
+        :param app_data_folders: Folders of the app's data directory making up the login state.
+        :param build: Build identifier of the app; by default APPIUM_FW_APP_BUILD, else the size
+                      and mtime of the app file the session installed.
+        :param max_age_seconds: Snapshots older than this are not restored (sessions expire).
+        """
+        unknown = set(strategies) - set(STRATEGIES)
+        if unknown:
+            raise ValueError(f"Unknown snapshot strategies: {sorted(unknown)}")
+        self.directory = directory
+        self.strategies = tuple(strategies)
+        self.deep_link = deep_link
+        self.app_data_folders = tuple(app_data_folders)
+        self.build = build
+        self.max_age_seconds = max_age_seconds
+        self._sessions: Dict[str, str] = {}  # session id -> key of the state its app was left in
+        self._app_data_supported = True
+        self._lock = threading.Lock()
+        self.stats = {"ui_login": 0, **{strategy: 0 for strategy in STRATEGIES}}
+
+    @classmethod
+    def shared(cls) -> "AuthSnapshots":
+        """Process-wide snapshots, so the sessions logged in by earlier tests are known."""
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+
+    @classmethod
+    def configure(cls, **kwargs) -> "AuthSnapshots":
+        """Replace the shared snapshots, e.g. with the config's "auth_snapshots" section."""
+        with cls._shared_lock:
+            cls._shared = cls(**kwargs)
+        return cls._shared
+
+    # Keys -----------------------------------------------------------------------------------
+
+    @staticmethod
+    def _digest(value: str) -> str:
+        return hashlib.blake2b(value.encode("utf-8"), digest_size=8).hexdigest()
+
+    def build_id(self, driver, app_path: Optional[str] = None) -> str:
+        """Identifier of the app build under test."""
+        build = self.build or os.environ.get(BUILD_ENV)
+        if build:
+            return build
+        capabilities = driver.capabilities or {}
+        app = app_path or capabilities.get("app") or capabilities.get("appium:app")
+        if app and os.path.isfile(app):
+            stat = os.stat(app)
+            return f"{os.path.basename(app)}:{stat.st_size}:{stat.st_mtime_ns}"
+        return app or "installed"
+
+    def cache_key(self, user: str, build: str) -> str:
+        return f"{self._digest(user)}-{self._digest(build)}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    # Restoring ------------------------------------------------------------------------------
+
+    def ensure(self, driver, user: str, login: Callable[[], None], is_logged_in: Callable[[], bool],
+               app_path: Optional[str] = None) -> str:
+        """
+        Bring the app to the logged-in state of a user, through the UI only when no snapshot works.
+
+        :param driver: Appium WebDriver instance, with the app in the foreground.
+        :param user: User to log in as.
+        :param login: Logs the user in through the UI.
+        :param is_logged_in: True when the app shows the logged-in state (a single cheap check).
+        :param app_path: App the session was started with, for the build identifier.
+        :return: How the state was obtained: "session", "deep_link", "app_data" or "ui_login".
+        """
+        # Imported here: DriverManager imports this module
+        from Appium_FW.Utils.DriverManager import DriverManager
+
+        build = self.build_id(driver, app_path)
+        key = self.cache_key(user, build)
+        app_id = DriverManager._app_id(driver)
+        android = str((driver.capabilities or {}).get("platformName", "")).lower() == "android"
+        restorers = {
+            "session": lambda: self._sessions.get(driver.session_id) == key,
+            "deep_link": lambda: bool(self.deep_link) and self._deep_link_login(driver, key, user, app_id),
+            "app_data": lambda: android and bool(app_id) and self._restore_app_data(driver, key, app_id),
+        }
+        for strategy in self.strategies:
+            if restorers[strategy]() and is_logged_in():
+                return self._done(driver, key, strategy)
+
+        if app_id and is_logged_in():  # Logged in as somebody else, or in a state we cannot vouch for
+            self._clear_app(driver, app_id)
+            self.forget(driver)
+        login()
+        if not is_logged_in():
+            raise Exception(f"Login as '{user}' did not reach the logged-in state.")
+        if "app_data" in self.strategies and android and app_id:
+            self._capture_app_data(driver, key, user, build, app_id)
+        return self._done(driver, key, "ui_login")
+
+    def _done(self, driver, key: str, strategy: str) -> str:
+        with self._lock:
+            self._sessions[driver.session_id] = key
+            self.stats[strategy] += 1
+        logging.info(f"Logged-in state obtained by {strategy}")
+        return strategy
+
+    def forget(self, driver):
+        """Forget the state of a session, e.g. after a test logged out."""
+        with self._lock:
+            self._sessions.pop(driver.session_id, None)
+
+    def _deep_link_login(self, driver, key: str, user: str, app_id: Optional[str]) -> bool:
+        # A deep link may leave the app logged in as whoever the session already was
+        previous = self._sessions.get(driver.session_id)
+        if previous is not None and previous != key:
+            if not (app_id and self._clear_app(driver, app_id)):
+                return False
+            self.forget(driver)
+        return self._open_deep_link(driver, user, app_id)
+
+    def _open_deep_link(self, driver, user: str, app_id: Optional[str]) -> bool:
+        arguments = {"url": self.deep_link.format(user=user)}
+        if app_id:
+            arguments["package"] = app_id
+        try:
+            driver.execute_script("mobile: deepLink", arguments)
+        except WebDriverException as e:
+            logging.warning(f"Deep link login failed: {e}")
+            return False
+        return True
+
+    @staticmethod
+    def _clear_app(driver, app_id: str, activate: bool = True) -> bool:
+        """Delete the app's data (stopping it, and dropping any login); False when the device refused."""
+        try:
+            driver.execute_script("mobile: clearApp", {"appId": app_id})
+        except WebDriverException as e:
+            logging.warning(f"Clearing the data of {app_id} failed: {e}")
+            return False
+        if activate:
+            driver.activate_app(app_id)
+        return True
+
+    @staticmethod
+    def _app_path(app_id: str, path: str) -> str:
+        """Path inside the app's data directory in Appium's run-as form (no root needed)."""
+        return f"@{app_id}/{path}"
+
+    # App data -------------------------------------------------------------------------------
+
+    def _capture_app_data(self, driver, key: str, user: str, build: str, app_id: str):
+        if not self._app_data_supported:
+            return
+        folders = {}
+        try:
+            for folder in self.app_data_folders:
+                folders[folder] = driver.pull_folder(self._app_path(app_id, folder))
+        except WebDriverException as e:
+            self._app_data_supported = False  # Typically a release build; do not try again
+            logging.warning(f"Cannot snapshot the app data of {app_id}, only session reuse is left: {e}")
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        snapshot = {"user": user, "build": build, "created": time.time(), "folders": folders}
+        with tempfile.NamedTemporaryFile("w", dir=self.directory, suffix=".tmp", delete=False) as file:
+            json.dump(snapshot, file)
+        os.replace(file.name, self._path(key))
+        # Snapshots of the same user on other builds are stale now
+        for stale in glob.glob(os.path.join(self.directory, f"{key.split('-')[0]}-*.json")):
+            if stale != self._path(key):
+                os.remove(stale)
+
+    def _load(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self._path(key), "r") as file:
+                snapshot = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if time.time() - snapshot.get("created", 0) > self.max_age_seconds:
+            return None
+        return snapshot
+
+    def _restore_app_data(self, driver, key: str, app_id: str) -> bool:
+        if not self._app_data_supported:
+            return False
+        snapshot = self._load(key)
+        if snapshot is None:
+            return False
+        if not self._clear_app(driver, app_id, activate=False):  # Stops the app, drops any other login
+            return False
+        try:
+            for folder, archive in snapshot["folders"].items():
+                with zipfile.ZipFile(io.BytesIO(base64.b64decode(archive))) as files:
+                    for name in files.namelist():
+                        if not name.endswith("/"):
+                            driver.push_file(self._app_path(app_id, f"{folder}/{name}"),
+                                             base64.b64encode(files.read(name)).decode("ascii"))
+        except WebDriverException as e:
+            logging.warning(f"Restoring the app data of {app_id} failed: {e}")
+            return False
+        finally:
+            driver.activate_app(app_id)
+        return True
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# (kind, *arguments): ("page", name), ("locator", locator file, name),
+# ("data", data file, key field, key), ("file", path); file paths are absolute
+Dependency = Tuple[str, ...]
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Framework code every test depends on; a change there invalidates every recorded test
+FRAMEWORK_DIRS = ("Utils", "plugins")
+
+
+class DependencyTracker:
+    """
+    Process-wide record of what the running test touches: page objects, the locators it
+    resolves and the test data entries it reads.
+
+    Disabled by default; LocatorLoader and TestDataLoader then only pay a flag check.
+    """
+    enabled = False
+    _current: Optional[Set[Dependency]] = None
+    _page_modules: Optional[Dict[str, List[str]]] = None
+
+    @classmethod
+    def start(cls):
+        """Start recording the dependencies of a test."""
+        cls._current = set()
+
+    @classmethod
+    def stop(cls) -> Set[Dependency]:
+        """Stop recording and return what the test used."""
+        dependencies, cls._current = cls._current or set(), None
+        return dependencies
+
+    @classmethod
+    def record(cls, *dependency: str):
+        if cls._current is not None:
+            cls._current.add(dependency)
+
+    @classmethod
+    def record_page(cls, page: str):
+        cls.record("page", page)
+
+    @classmethod
+    def record_locator(cls, locator_file: str, name: str):
+        cls.record("locator", os.path.abspath(locator_file), name)
+        cls.record("page", os.path.basename(locator_file)[:-len("_locators.json")])
+
+    @classmethod
+    def record_test_data(cls, data_file: str, key: str, key_field: str = "name"):
+        cls.record("data", os.path.abspath(data_file), key_field, key)
+
+    # Hashing --------------------------------------------------------------------------------
+
+    @staticmethod
+    def _digest(content: bytes) -> str:
+        return hashlib.blake2b(content, digest_size=12).hexdigest()
+
+    @classmethod
+    def _file_hash(cls, path: str) -> Optional[str]:
+        try:
+            with open(path, "rb") as file:
+                return cls._digest(file.read())
+        except OSError:
+            return None
+
+    @classmethod
+    def page_modules(cls, page: str) -> List[str]:
+        """Page object modules of a page (<page>_page.py under the pages package)."""
+        if cls._page_modules is None:
+            modules: Dict[str, List[str]] = {}
+            for folder, _, files in os.walk(os.path.join(PACKAGE_DIR, "pages")):
+                for name in files:
+                    if name.endswith("_page.py"):
+                        modules.setdefault(name[:-len("_page.py")], []).append(os.path.join(folder, name))
+            cls._page_modules = modules
+        return sorted(cls._page_modules.get(page, []))
+
+    @classmethod
+    def hash(cls, dependency: Dependency) -> Optional[str]:
+        """
+        Current hash of a dependency, or None when it no longer exists.
+
+        Locators and test data are hashed per entry, so editing one locator or one data case only
+        invalidates the tests that used it.
+        """
+        # Imported here: both loaders import this module to record their lookups
+        from Appium_FW.Utils.LocatorLoader import LocatorRegistry
+        from Appium_FW.Utils.ResourcePaths import ResourceNotFoundError
+        from Appium_FW.Utils.TestDataLoader import TestDataLoader
+
+        kind = dependency[0]
+        try:
+            if kind == "page":
+                modules = cls.page_modules(dependency[1])
+                return cls._digest("".join(f"{path}:{cls._file_hash(path)}" for path in modules).encode("utf-8"))
+            if kind == "locator":
+                entry = LocatorRegistry.locators(dependency[1]).get(dependency[2])
+                return None if entry is None else cls._digest(json.dumps(entry, sort_keys=True,
+                                                                         default=dict).encode("utf-8"))
+            if kind == "data":
+                entry = TestDataLoader.shared(dependency[1], dependency[2]).get_test_data(dependency[3])
+                return cls._digest(json.dumps(entry, sort_keys=True, default=str).encode("utf-8"))
+            if kind == "file":
+                return cls._file_hash(dependency[1])
+        except (KeyError, ValueError, ResourceNotFoundError):
+            return None
+        raise ValueError(f"Unknown dependency kind '{kind}'.")
+
+    @classmethod
+    def framework_hash(cls, directories: Iterable[str] = FRAMEWORK_DIRS) -> str:
+        """Hash of the framework's own code."""
+        parts = []
+        for directory in directories:
+            for folder, _, files in sorted(os.walk(os.path.join(PACKAGE_DIR, directory))):
+                for name in sorted(files):
+                    if name.endswith(".py"):
+                        path = os.path.join(folder, name)
+                        parts.append(f"{os.path.relpath(path, PACKAGE_DIR)}:{cls._file_hash(path)}")
+        return cls._digest("\n".join(parts).encode("utf-8"))
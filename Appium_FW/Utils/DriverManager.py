@@ -1,18 +1,30 @@
+import atexit
 import json
+import logging
+import os
+import threading
 from appium import webdriver
 from appium.options.common import AppiumOptions
-from typing import Optional, Dict
+from typing import Callable, Optional, Dict, List
+from Appium_FW.config import APPIUM_HOST
+from Appium_FW.Utils.AuthSnapshots import AuthSnapshots
+from Appium_FW.Utils.Instrumentation import Instrumentation
+from Appium_FW.Utils.ResourcePaths import ResourcePaths
+from Appium_FW.Utils.SessionPool import SessionPool, PooledSession, SessionKey, xdist_worker_index
 
 class DriverManager:
     _driver: Optional[webdriver.Remote] = None
     _config: Dict = {}
+    _pool: Optional[SessionPool] = None
+    _pool_lock = threading.Lock()
+    _leases = threading.local()  # Session leased by the current thread
 
     @classmethod
     def load_config(cls, config_file: str = 'config.json'):
         """Load configuration from JSON file once and store it in the class variable."""
         if not cls._config:  # Load config only if it's not already loaded
             try:
-                with open(config_file, 'r') as file:
+                with open(ResourcePaths.config_file(config_file), 'r') as file:
                     cls._config = json.load(file)
             except FileNotFoundError:
                 raise Exception(f"Config file '{config_file}' not found.")
@@ -20,11 +32,34 @@ class DriverManager:
                 raise Exception(f"Error parsing JSON in the config file '{config_file}'.")
 
     @classmethod
-    def init_driver(cls, app_path: Optional[str] = None) -> webdriver.Remote:
-        """Initialize Appium driver with capabilities based on config file."""
+    def get_devices(cls) -> List[Dict]:
+        """
+        Return the configured devices.
+
+        Each entry may set "udid" and "appium_server"; without a "devices" list a single device
+        on the default Appium server is assumed.
+        """
         if not cls._config:
-            cls.load_config()  # Ensure config is loaded
+            cls.load_config()
+        server = cls._config.get("appium_server", APPIUM_HOST)
+        devices = cls._config.get("devices") or [{}]
+        return [{"udid": device.get("udid"), "appium_server": device.get("appium_server", server)}
+                for device in devices]
+
+    @classmethod
+    def device_for_worker(cls) -> Dict:
+        """
+        Pick the device for this process.
+
+        A shard started for a specific device sets APPIUM_FW_DEVICE_INDEX; otherwise pytest-xdist
+        workers are spread across the configured devices.
+        """
+        devices = cls.get_devices()
+        index = os.environ.get("APPIUM_FW_DEVICE_INDEX")
+        return devices[(int(index) if index is not None else xdist_worker_index()) % len(devices)]
 
+    @classmethod
+    def _build_options(cls, udid: Optional[str], app_path: Optional[str]) -> AppiumOptions:
         options = AppiumOptions()
         device_type = cls._config.get("device_type", "android").lower()  # Default to "android"
         platform_config = cls._config.get(device_type, {})
@@ -32,22 +67,152 @@ class DriverManager:
         for key, value in platform_config.items():
             options.set_capability(key, value)
 
+        if udid:
+            options.set_capability('udid', udid)
         if app_path:
             options.set_capability('app', app_path)
+        return options
+
+    @classmethod
+    def capabilities(cls, device: Optional[Dict] = None, app_path: Optional[str] = None) -> Dict:
+        """
+        W3C capabilities for a device, e.g. to start a session with the async client.
+
+        :param device: Device entry ({"udid", "appium_server"}); defaults to this worker's device.
+        :param app_path: Optional app to install/launch.
+        """
+        if not cls._config:
+            cls.load_config()
+        device = device or cls.device_for_worker()
+        return cls._build_options(device.get("udid"), app_path).to_capabilities()
+
+    @classmethod
+    def _create_session(cls, key: SessionKey) -> webdriver.Remote:
+        server, udid, app_path = key
+        options = cls._build_options(udid, app_path)
+        # Pooled sessions sit idle between tests; keep the server from reaping them first
+        if options.get_capability('newCommandTimeout') is None:
+            options.set_capability('newCommandTimeout', int(cls.get_pool().max_idle_seconds) + 60)
+        return Instrumentation.instrument_driver(webdriver.Remote(server, options=options))
+
+    @classmethod
+    def _app_id(cls, driver: webdriver.Remote) -> Optional[str]:
+        capabilities = driver.capabilities or {}
+        return (capabilities.get('appPackage') or capabilities.get('bundleId')
+                or capabilities.get('appium:appPackage') or capabilities.get('appium:bundleId'))
+
+    @classmethod
+    def _reset_session(cls, driver: webdriver.Remote):
+        """Cheap app reset between tests: restart the app instead of creating a new session."""
+        app_id = cls._app_id(driver)
+        if app_id:
+            driver.terminate_app(app_id)
+            driver.activate_app(app_id)
+
+    @staticmethod
+    def _health_check(driver: webdriver.Remote):
+        """A single cheap round trip that fails if the session is gone."""
+        driver.get_window_size()
 
-        cls._driver = webdriver.Remote('http://localhost:4723', options=options)
+    @classmethod
+    def get_pool(cls) -> SessionPool:
+        """Return the process-wide session pool, creating it on first use."""
+        if cls._pool is None:
+            with cls._pool_lock:
+                if cls._pool is None:
+                    if not cls._config:
+                        cls.load_config()
+                    pool_config = cls._config.get("session_pool", {})
+                    cls._pool = SessionPool(
+                        create_session=cls._create_session,
+                        reset_session=cls._reset_session if pool_config.get("reset_app", True) else None,
+                        health_check=cls._health_check,
+                        max_idle_seconds=pool_config.get("max_idle_seconds", 240),
+                        max_uses=pool_config.get("max_uses", 500),
+                    )
+                    atexit.register(cls.shutdown)
+        return cls._pool
+
+    @classmethod
+    def init_driver(cls, app_path: Optional[str] = None, device: Optional[Dict] = None) -> webdriver.Remote:
+        """
+        Initialize Appium driver with capabilities based on config file.
+
+        The session is leased from the pool: a session left by a previous test on the same
+        device is reused after an app reset instead of starting a new one.
+
+        :param app_path: Optional app to install/launch.
+        :param device: Device entry ({"udid", "appium_server"}); defaults to this worker's device.
+        """
+        if not cls._config:
+            cls.load_config()  # Ensure config is loaded
+
+        current = getattr(cls._leases, "session", None)
+        if current is not None:
+            cls.get_pool().release(current)
+
+        device = device or cls.device_for_worker()
+        key = (device["appium_server"], device.get("udid"), app_path)
+        session = cls.get_pool().lease(key)
+        cls._leases.session = session
+        cls._driver = session.driver
         return cls._driver
 
     @classmethod
     def get_driver(cls) -> webdriver.Remote:
         """Get the current driver instance."""
+        session: Optional[PooledSession] = getattr(cls._leases, "session", None)
+        if session is not None:
+            return session.driver
         if not cls._driver:
             raise Exception("Driver not initialized. Call init_driver() first.")
         return cls._driver
 
     @classmethod
-    def quit_driver(cls):
-        """Quit the driver instance."""
-        if cls._driver:
+    def quit_driver(cls, healthy: bool = True):
+        """
+        Give the current driver back to the pool for the next test.
+
+        :param healthy: Pass False to quit the session instead of reusing it.
+        """
+        session: Optional[PooledSession] = getattr(cls._leases, "session", None)
+        if session is not None:
+            cls._leases.session = None
+            cls.get_pool().release(session, healthy=healthy)
+            if cls._driver is session.driver:
+                cls._driver = None
+        elif cls._driver:
             cls._driver.quit()
-            cls._driver = None
\ No newline at end of file
+            cls._driver = None
+
+    @classmethod
+    def auth_snapshots(cls) -> AuthSnapshots:
+        """Shared AuthSnapshots, configured from the config's "auth_snapshots" section on first use."""
+        if AuthSnapshots._shared is None:
+            if not cls._config:
+                cls.load_config()
+            AuthSnapshots.configure(**cls._config.get("auth_snapshots", {}))
+        return AuthSnapshots.shared()
+
+    @classmethod
+    def login_once(cls, user: str, login: Callable[[], None], is_logged_in: Callable[[], bool],
+                   app_path: Optional[str] = None) -> str:
+        """
+        Bring the current driver's app to the logged-in state of a user, logging in through the
+        UI only the first time (see AuthSnapshots).
+
+        :param user: User to log in as.
+        :param login: Logs the user in through the UI.
+        :param is_logged_in: True when the app shows the logged-in state.
+        :param app_path: App the driver was initialized with.
+        :return: How the state was obtained ("session", "deep_link", "app_data" or "ui_login").
+        """
+        return cls.auth_snapshots().ensure(cls.get_driver(), user, login, is_logged_in, app_path)
+
+    @classmethod
+    def shutdown(cls):
+        """Quit every pooled session (registered to run at interpreter exit)."""
+        if cls._pool is not None:
+            logging.info(f"Closing pooled sessions: {cls._pool.stats()}")
+            cls._pool.close_all()
+        cls._driver = None
@@ -0,0 +1,254 @@
+import xml.etree.ElementTree as ET
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from Appium_FW.Utils.HierarchySnapshot import HierarchySnapshot
+
+Point = Tuple[int, int]
+Region = Tuple[int, int, int, int]  # x1, y1, x2, y2 (x2/y2 exclusive, like Android bounds)
+
+
+class ElementRecord:
+    __slots__ = ("order", "end", "depth", "x1", "y1", "x2", "y2", "class_name", "name", "clickable",
+                 "displayed", "parent", "node")
+
+    def __init__(self, order: int, depth: int, bounds: Region, node: ET.Element, parent: Optional["ElementRecord"]):
+        """
+        One element of a hierarchy with parsed integer bounds.
+
+        :param order: Position in document order; later elements are drawn on top of earlier ones.
+        :param depth: Nesting depth below the hierarchy root.
+        :param bounds: (x1, y1, x2, y2) in screen pixels.
+        :param node: The page source node.
+        :param parent: Record of the closest ancestor with bounds.
+        """
+        self.order = order
+        self.end = order  # Order of the last descendant, set once the subtree is read
+        self.depth = depth
+        self.x1, self.y1, self.x2, self.y2 = bounds
+        attrib = node.attrib
+        self.class_name = attrib.get("class") or attrib.get("type") or node.tag
+        self.name = (attrib.get("text") or attrib.get("content-desc") or attrib.get("resource-id")
+                     or attrib.get("name") or attrib.get("label") or "")
+        self.clickable = attrib.get("clickable") == "true" or attrib.get("hittable") == "true"
+        self.displayed = attrib.get("displayed", attrib.get("visible", "true")) != "false"
+        self.parent = parent
+        self.node = node
+
+    @property
+    def bounds(self) -> Region:
+        return self.x1, self.y1, self.x2, self.y2
+
+    @property
+    def area(self) -> int:
+        return max(0, self.x2 - self.x1) * max(0, self.y2 - self.y1)
+
+    @property
+    def center(self) -> Point:
+        return (self.x1 + self.x2) // 2, (self.y1 + self.y2) // 2
+
+    def contains(self, x: int, y: int) -> bool:
+        return self.x1 <= x < self.x2 and self.y1 <= y < self.y2
+
+    def intersects(self, region: Region) -> bool:
+        x1, y1, x2, y2 = region
+        return self.x1 < x2 and x1 < self.x2 and self.y1 < y2 and y1 < self.y2
+
+    def is_ancestor_of(self, other: "ElementRecord") -> bool:
+        return self.order < other.order <= self.end
+
+    def __repr__(self):
+        return f"ElementRecord({self.class_name!r}, {self.name!r}, {self.bounds})"
+
+
+class ElementStore:
+    # Elements covering more grid cells than this are kept in one list instead of every cell
+    MAX_CELLS_PER_ELEMENT = 64
+
+    def __init__(self, page_source: Union[str, bytes, HierarchySnapshot], cell_size: int = 128):
+        """
+        Elements of a hierarchy indexed by position, for hit-testing and region queries.
+
+        Records hold integer bounds in __slots__, and a uniform grid maps each cell of the
+        screen to the elements overlapping it, so a point or region query only looks at the
+        handful of elements near it instead of the whole hierarchy.
+
+        :param page_source: Hierarchy XML, or a HierarchySnapshot whose nodes the records should reference.
+        :param cell_size: Grid cell size in pixels.
+        """
+        self.snapshot = page_source if isinstance(page_source, HierarchySnapshot) else None
+        root = self.snapshot.root if self.snapshot else ET.fromstring(page_source)
+        self.cell_size = cell_size
+        self.records: List[ElementRecord] = []
+        self._by_node: Dict[int, ElementRecord] = {}
+        self._cells: Dict[Tuple[int, int], List[ElementRecord]] = {}
+        self._large: List[ElementRecord] = []
+        self._read(root)
+        for record in self.records:
+            self._insert(record)
+
+    @staticmethod
+    def _bounds(attrib: Dict[str, str]) -> Optional[Region]:
+        bounds = attrib.get("bounds")
+        if bounds:
+            return HierarchySnapshot.parse_bounds(bounds)
+        if "x" in attrib and "width" in attrib:  # iOS
+            try:
+                x, y = int(attrib["x"]), int(attrib["y"])
+                return x, y, x + int(attrib["width"]), y + int(attrib["height"])
+            except (KeyError, ValueError):
+                return None
+        return None
+
+    def _read(self, root: ET.Element):
+        """Create the records in document order, iteratively so deep trees cannot hit the recursion limit."""
+        stack: List[Tuple[ET.Element, Optional[ElementRecord], int, bool]] = [(root, None, 0, False)]
+        open_records: List[ElementRecord] = []
+        while stack:
+            node, parent, depth, closing = stack.pop()
+            if closing:
+                record = open_records.pop()
+                record.end = len(self.records) - 1
+                continue
+            bounds = self._bounds(node.attrib)
+            if bounds:
+                record = ElementRecord(len(self.records), depth, bounds, node, parent)
+                self.records.append(record)
+                self._by_node[id(node)] = record
+                open_records.append(record)
+                stack.append((node, None, depth, True))
+                parent = record
+            for child in reversed(node):
+                stack.append((child, parent, depth + 1, False))
+
+    def _cell_range(self, region: Region) -> Tuple[range, range]:
+        x1, y1, x2, y2 = region
+        size = self.cell_size
+        return range(x1 // size, max(x1, x2 - 1) // size + 1), range(y1 // size, max(y1, y2 - 1) // size + 1)
+
+    def _insert(self, record: ElementRecord):
+        if record.area == 0:
+            return
+        columns, rows = self._cell_range(record.bounds)
+        if len(columns) * len(rows) > self.MAX_CELLS_PER_ELEMENT:
+            self._large.append(record)
+            return
+        for column in columns:
+            for row in rows:
+                self._cells.setdefault((column, row), []).append(record)
+
+    def _candidates(self, region: Region) -> Iterator[ElementRecord]:
+        seen = set()
+        columns, rows = self._cell_range(region)
+        for column in columns:
+            for row in rows:
+                for record in self._cells.get((column, row), ()):
+                    if record.order not in seen:
+                        seen.add(record.order)
+                        yield record
+        yield from self._large
+
+    # Queries --------------------------------------------------------------------------------
+
+    def record_for(self, node: ET.Element) -> Optional[ElementRecord]:
+        """The record of a page source node (from the snapshot the store was built on)."""
+        return self._by_node.get(id(node))
+
+    def elements_at(self, x: int, y: int) -> List[ElementRecord]:
+        """Every displayed element containing the point, bottom-most first."""
+        hits = [record for record in self._candidates((x, y, x + 1, y + 1))
+                if record.displayed and record.contains(x, y)]
+        return sorted(hits, key=lambda record: record.order)
+
+    def element_at(self, x: int, y: int,
+                   accept: Optional[Callable[[ElementRecord], bool]] = None) -> Optional[ElementRecord]:
+        """
+        The topmost displayed element at a point.
+
+        :param accept: Only consider elements for which this returns True.
+        """
+        for record in reversed(self.elements_at(x, y)):
+            if accept is None or accept(record):
+                return record
+        return None
+
+    def topmost_clickable_at(self, x: int, y: int) -> Optional[ElementRecord]:
+        """The element a tap at the point would reach."""
+        return self.element_at(x, y, lambda record: record.clickable)
+
+    def within(self, region: Region, fully: bool = True) -> List[ElementRecord]:
+        """
+        Displayed elements inside a region, in document order.
+
+        :param region: (x1, y1, x2, y2).
+        :param fully: Only elements entirely inside; False also returns partially overlapping ones.
+        """
+        x1, y1, x2, y2 = region
+        if fully:
+            match = lambda record: x1 <= record.x1 and y1 <= record.y1 and record.x2 <= x2 and record.y2 <= y2
+        else:
+            match = lambda record: record.intersects(region)
+        return sorted((record for record in self._candidates(region) if record.displayed and match(record)),
+                      key=lambda record: record.order)
+
+    def occluders(self, record: ElementRecord,
+                  accept: Callable[[ElementRecord], bool] = lambda record: record.clickable) -> List[ElementRecord]:
+        """
+        Elements drawn over the record.
+
+        :param accept: Which later elements count as covering it; by default only clickable ones,
+                       as layout containers are usually transparent.
+        """
+        return [other for other in self.within(record.bounds, fully=False)
+                if other.order > record.end and not other.is_ancestor_of(record) and accept(other)]
+
+    def visible_fraction(self, record: ElementRecord,
+                         accept: Callable[[ElementRecord], bool] = lambda record: record.clickable) -> float:
+        """Share of the record's area not covered by occluders (0.0 - 1.0)."""
+        if record.area == 0:
+            return 0.0
+        covered = self._union_area([(max(record.x1, other.x1), max(record.y1, other.y1),
+                                     min(record.x2, other.x2), min(record.y2, other.y2))
+                                    for other in self.occluders(record, accept)])
+        return 1.0 - covered / record.area
+
+    @staticmethod
+    def _union_area(regions: List[Region]) -> int:
+        """Area covered by a set of rectangles (coordinate-compressed sweep)."""
+        regions = [region for region in regions if region[0] < region[2] and region[1] < region[3]]
+        if not regions:
+            return 0
+        xs = sorted({x for region in regions for x in (region[0], region[2])})
+        area = 0
+        for left, right in zip(xs, xs[1:]):
+            spans = sorted((y1, y2) for x1, y1, x2, y2 in regions if x1 <= left and right <= x2)
+            covered, current_start, current_end = 0, None, None
+            for y1, y2 in spans:
+                if current_end is None or y1 > current_end:
+                    if current_end is not None:
+                        covered += current_end - current_start
+                    current_start, current_end = y1, y2
+                else:
+                    current_end = max(current_end, y2)
+            if current_end is not None:
+                covered += current_end - current_start
+            area += covered * (right - left)
+        return area
+
+    def tap_point(self, record: ElementRecord) -> Optional[Point]:
+        """
+        A point where a tap reaches the record (or one of its descendants).
+
+        The center is tried first, then the centers of the quarters and of the edges' midpoints,
+        so a partially covered element can still be tapped.
+
+        :return: (x, y), or None if every probe is covered by another clickable element.
+        """
+        x1, y1, x2, y2 = record.bounds
+        width, height = x2 - x1, y2 - y1
+        probes = [(x1 + width * fx // 4, y1 + height * fy // 4)
+                  for fx, fy in ((2, 2), (1, 1), (3, 1), (1, 3), (3, 3), (2, 1), (2, 3), (1, 2), (3, 2))]
+        for x, y in probes:
+            hit = self.topmost_clickable_at(x, y)
+            if hit is None or hit is record or record.is_ancestor_of(hit) or hit.is_ancestor_of(record):
+                return x, y
+        return None
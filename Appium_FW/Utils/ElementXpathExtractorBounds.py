@@ -1,20 +1,33 @@
 from appium import webdriver
 from appium.webdriver.common.appiumby import AppiumBy
 import json
+import os
+import xml.etree.ElementTree as ET
 from appium.webdriver.webdriver import WebDriver as AppiumWebDriver
 
 from appium.options.android import UiAutomator2Options
+from Appium_FW.Utils.ExtractionCache import ExtractionCache
 
 class ElementXpathExtractor:
-    def __init__(self, driver, output_file="elements_xpaths.json"):
+    # Entries of the extraction cache; bump the version when build_record changes
+    CACHE_KIND = "element_xpaths-v1"
+
+    def __init__(self, driver, output_file="elements_xpaths.json", use_page_source=False, cache=None):
         """
         Initialize the XPath extractor class.
 
         :param driver: Appium WebDriver instance.
         :param output_file: Path to save the generated XPaths as a JSON file.
+        :param use_page_source: Build the records from a single page source pull instead of
+                                querying every element's attributes on the device.
+        :param cache: ExtractionCache reusing the records of screens extracted before, keyed by
+                      the output file; implies use_page_source.
         """
         self.driver = driver
         self.output_file = output_file
+        self.use_page_source = use_page_source or cache is not None
+        self.cache: ExtractionCache = cache
+        self.last_extraction = None
         self.elements = []
         self.seen_bounds = set()  # To avoid duplicate bounds
 
@@ -51,7 +64,8 @@ class ElementXpathExtractor:
 
         return element.get_attribute("className")  # Fallback to class name if no text or resource-id
 
-    def generate_xpath(self, class_name, bounds):
+    @staticmethod
+    def generate_xpath(class_name, bounds):
         """
         Generate the XPath based on class name and bounds.
 
@@ -67,6 +81,9 @@ class ElementXpathExtractor:
 
         :return: A list of elements with their XPaths.
         """
+        if self.use_page_source:
+            return self.extract_elements_xpaths_from_page_source()
+
         # Find all elements on the screen (you can filter based on visibility or other criteria if needed)
         elements = self.driver.find_elements(AppiumBy.ANDROID_UIAUTOMATOR, "new UiSelector()")
 
@@ -91,6 +108,77 @@ class ElementXpathExtractor:
 
         return self.elements
 
+    @staticmethod
+    def get_node_name(attrib, tag=None):
+        """
+        Page source counterpart of get_element_name, reading the node's attributes locally.
+
+        :param attrib: Attribute dictionary of a page source node.
+        :param tag: The node's tag, the name of a node without a class attribute.
+        :return: The element's name as a string.
+        """
+        # Same priority as the device lookup: text -> resource-id -> class_name
+        text = attrib.get("text")
+        if text:
+            return text.strip()
+
+        resource_id = attrib.get("resource-id")
+        if resource_id:
+            return resource_id.strip()
+
+        return attrib.get("class") or tag
+
+    def extract_elements_xpaths_from_page_source(self, page_source=None):
+        """
+        Extract elements' XPaths from one page source pull instead of per-element attribute calls.
+
+        The records (and the seen_bounds dedupe) are identical to extract_elements_xpaths(),
+        the page source attributes 'class', 'bounds', 'text' and 'resource-id' being the same
+        values the device returns for 'className', 'bounds', 'text' and 'resourceId'.
+
+        :param page_source: Hierarchy XML to use; fetched from the driver when omitted.
+        :return: A list of elements with their XPaths.
+        """
+        if page_source is None:
+            page_source = self.driver.page_source
+
+        if self.cache is not None:
+            self.last_extraction = self.cache.extract(self.CACHE_KIND, page_source, self.build_record,
+                                                      screen=os.path.abspath(self.output_file))
+            records = self.last_extraction.records
+        else:
+            records = (self.build_record(node.tag, node.attrib) for node in ET.fromstring(page_source).iter())
+
+        for record in records:
+            if record and record["bounds"] not in self.seen_bounds:
+                self.seen_bounds.add(record["bounds"])
+                self.elements.append(record)
+
+        return self.elements
+
+    @classmethod
+    def build_record(cls, tag, attrib):
+        """
+        Build the record of a page source node, or None if it has no bounds.
+
+        :param tag: The node's tag.
+        :param attrib: The node's attributes.
+        """
+        # The <hierarchy> wrapper is not an element "new UiSelector()" would match
+        if tag == "hierarchy":
+            return None
+
+        class_name = attrib.get("class", tag)
+        bounds = attrib.get("bounds")
+        if not bounds:
+            return None
+        return {
+            "element_name": cls.get_node_name(attrib, tag),
+            "class_name": class_name,
+            "bounds": bounds,
+            "xpath": cls.generate_xpath(class_name, bounds)
+        }
+
     def save_to_json(self):
         """
         Save the extracted XPaths to a JSON file.
@@ -101,8 +189,15 @@ class ElementXpathExtractor:
     def extract_and_save(self):
         """
         Extract the elements' XPaths and save to the JSON file.
+
+        With a cache, the file is left as it is when the screen is the version it was written for.
         """
+        fresh = not self.elements
         self.extract_elements_xpaths()
+        if fresh and self.last_extraction is not None and self.last_extraction.unchanged \
+                and os.path.exists(self.output_file):
+            print(f"Screen unchanged, {self.output_file} is up to date")
+            return
         self.save_to_json()
         print(f"XPaths saved to {self.output_file}")
 
@@ -0,0 +1,284 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import xml.etree.ElementTree as ET
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from Appium_FW.Utils.HierarchySnapshot import HierarchySnapshot
+
+# Attributes that identify a node across pulls; its bounds are what may change when it moves
+IDENTITY_ATTRIBUTES = ("class", "resource-id", "content-desc", "text", "name", "label")
+_BETWEEN_TAGS_PATTERN = re.compile(r">\s+<")
+
+
+class HierarchyDiff:
+    def __init__(self, added: List[Dict], removed: List[Dict], moved: List[Dict]):
+        """
+        Element-level difference between two versions of a screen.
+
+        Nodes are matched by class, ids and text (the n-th occurrence of an identical node with
+        the n-th one), so a node whose bounds changed is reported as moved rather than as
+        removed and added again.
+
+        :param added: Nodes only in the new version, as {"identity", "bounds"}.
+        :param removed: Nodes only in the old version.
+        :param moved: Nodes in both with other bounds, as {"identity", "bounds", "old_bounds"}.
+        """
+        self.added = added
+        self.removed = removed
+        self.moved = moved
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.moved)
+
+    def summary(self) -> Dict[str, int]:
+        return {"added": len(self.added), "removed": len(self.removed), "moved": len(self.moved)}
+
+    def __repr__(self):
+        return f"HierarchyDiff({self.summary()})"
+
+
+class Extraction:
+    def __init__(self, records: List[Any], fingerprint: str, hit: bool, diff: Optional[HierarchyDiff] = None,
+                 unchanged: bool = False, built: int = 0):
+        """
+        Result of ExtractionCache.extract.
+
+        :param records: One extractor record per node of the hierarchy, in document order.
+        :param fingerprint: Structural hash of the page source.
+        :param hit: The records came from the cache without reading the page source.
+        :param diff: Changes against the previous version of the screen, when there was one.
+        :param unchanged: The screen is the same version as the last time it was extracted.
+        :param built: Records built for this call (the others were reused).
+        """
+        self.records = records
+        self.fingerprint = fingerprint
+        self.hit = hit
+        self.diff = diff
+        self.unchanged = unchanged
+        self.built = built
+
+
+class ExtractionCache:
+    def __init__(self, directory: str = "extraction_cache", max_bytes: int = 64 * 1024 * 1024):
+        """
+        Persistent cache of extractor results keyed by the structural hash of the page source.
+
+        An entry holds one record per hierarchy node plus the node's identity, bounds and a
+        signature of its attributes. A screen that was extracted before is answered from its
+        entry without parsing. A screen that changed is still parsed in full and every node's
+        attributes are hashed; it is then diffed node by node against the previous version of
+        the same screen, and the saving is in the build calls: only nodes that were added, moved
+        or otherwise changed get new records, the others reuse theirs.
+
+        Entries are gzip-compressed JSON files whose modification time is their last use. The
+        size of the directory is counted once and then kept up to date as entries are written;
+        the least recently used entries are deleted when it grows past max_bytes.
+
+        :param directory: Root directory of the cache.
+        :param max_bytes: Size cap of the stored entries.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size: Optional[int] = None  # Bytes of the stored entries, counted on the first write
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def structural_hash(page_source: Union[str, bytes]) -> str:
+        """
+        Hash of a page source, insensitive to indentation and focus changes.
+
+        Texts and bounds are part of the hash, as extractor records are made from them.
+        """
+        if isinstance(page_source, bytes):
+            page_source = page_source.decode("utf-8")
+        return HierarchySnapshot.fast_fingerprint(_BETWEEN_TAGS_PATTERN.sub("><", page_source.strip()),
+                                                  ignore_timestamps=False)
+
+    def _entry_path(self, kind: str, fingerprint: str) -> str:
+        return os.path.join(self.directory, "entries", kind, f"{fingerprint}.json.gz")
+
+    def _screen_path(self, kind: str, screen: str) -> str:
+        name = hashlib.sha1(screen.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, "screens", kind, f"{name}.json")
+
+    def _load(self, path: str) -> Optional[Dict]:
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                entry = json.load(file)
+        except (OSError, ValueError) as e:
+            if not isinstance(e, FileNotFoundError):
+                logging.warning(f"Ignoring unreadable cache entry '{path}': {e}")
+            return None
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        return entry
+
+    def _store(self, path: str, content: Dict) -> int:
+        """Write an entry atomically; returns by how many bytes the cache grew."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(temporary, "wt", encoding="utf-8", compresslevel=6) as file:
+            json.dump(content, file, separators=(",", ":"))
+        grown = os.path.getsize(temporary)
+        try:
+            grown -= os.path.getsize(path)  # Replaced, e.g. written concurrently by another process
+        except OSError:
+            pass
+        os.replace(temporary, path)
+        return grown
+
+    def get(self, kind: str, fingerprint: str) -> Optional[List[Any]]:
+        """The records stored for a page source hash, or None."""
+        entry = self._load(self._entry_path(kind, fingerprint))
+        return [node[-1] for node in entry["nodes"]] if entry else None
+
+    def last_fingerprint(self, kind: str, screen: str) -> Optional[str]:
+        """Hash of the version of the screen that was extracted last."""
+        try:
+            with open(self._screen_path(kind, screen), encoding="utf-8") as file:
+                return json.load(file)["fingerprint"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def extract(self, kind: str, page_source: Union[str, bytes],
+                build: Callable[[str, Dict[str, str]], Any], screen: Optional[str] = None) -> Extraction:
+        """
+        Return one record per node of the page source, from the cache when possible.
+
+        :param kind: Extractor (and version of its records) the entry belongs to.
+        :param page_source: Hierarchy XML.
+        :param build: Builds the record of a node from its tag and attributes (JSON-serializable).
+        :param screen: Name of the screen (e.g. the extractor's output file), to diff a changed
+                       screen against its previous version.
+        """
+        fingerprint = self.structural_hash(page_source)
+        previous = self.last_fingerprint(kind, screen) if screen else None
+        cached = self.get(kind, fingerprint)
+        if cached is not None:
+            if previous != fingerprint:
+                self._remember(kind, screen, fingerprint)
+            return Extraction(cached, fingerprint, hit=True, unchanged=previous == fingerprint)
+
+        nodes = list(self._keyed(self._nodes(page_source)))
+        old_entry = self._load(self._entry_path(kind, previous)) if previous else None
+        diff, reusable = None, {}
+        if old_entry is not None:
+            old_nodes = list(self._keyed(old_entry["nodes"]))
+            diff = self.diff(old_nodes, nodes)
+            # Same node, same position and same attributes: its record cannot have changed
+            reusable = {(key, bounds, signature): node[-1] for key, bounds, signature, *node in old_nodes}
+        records, stored, built = [], [], 0
+        for key, bounds, signature, tag, attrib in nodes:
+            if (key, bounds, signature) in reusable:
+                record = reusable[(key, bounds, signature)]
+            else:
+                record = build(tag, attrib)
+                built += 1
+            records.append(record)
+            stored.append([list(key[0]), bounds, signature, record])
+
+        grown = self._store(self._entry_path(kind, fingerprint), {"fingerprint": fingerprint, "nodes": stored})
+        self._remember(kind, screen, fingerprint)
+        self._grow(grown)
+        return Extraction(records, fingerprint, hit=False, diff=diff, built=built)
+
+    def _remember(self, kind: str, screen: Optional[str], fingerprint: str):
+        if not screen:
+            return
+        path = self._screen_path(kind, screen)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"screen": screen, "fingerprint": fingerprint}, file)
+
+    # Diffing --------------------------------------------------------------------------------
+
+    @staticmethod
+    def _nodes(page_source: Union[str, bytes]) -> List[Tuple]:
+        """(identity, bounds, attribute signature, tag, attributes) of every node, in document order."""
+        nodes = []
+        for node in ET.fromstring(page_source).iter():
+            attrib = node.attrib
+            signature = hashlib.blake2b(json.dumps(sorted(attrib.items())).encode("utf-8"), digest_size=8)
+            nodes.append(([node.tag] + [attrib.get(name, "") for name in IDENTITY_ATTRIBUTES],
+                          attrib.get("bounds", ""), signature.hexdigest(), node.tag, dict(attrib)))
+        return nodes
+
+    @staticmethod
+    def _keyed(nodes: List) -> Iterator[Tuple]:
+        """Replace each node's identity with (identity, n) for its n-th occurrence."""
+        occurrences: Dict[Tuple[str, ...], int] = {}
+        for identity, *rest in nodes:
+            identity = tuple(identity)
+            occurrences[identity] = occurrences.get(identity, -1) + 1
+            yield ((identity, occurrences[identity]), *rest)
+
+    @staticmethod
+    def diff(old_nodes: List[Tuple], new_nodes: List[Tuple]) -> HierarchyDiff:
+        """
+        Diff two keyed node lists (see _keyed), each node starting with (key, bounds).
+
+        :return: The added, removed and moved nodes.
+        """
+        old = {node[0]: node[1] for node in old_nodes}
+        new = {node[0]: node[1] for node in new_nodes}
+        added = [{"identity": list(key[0]), "bounds": bounds} for key, bounds in new.items() if key not in old]
+        removed = [{"identity": list(key[0]), "bounds": bounds} for key, bounds in old.items() if key not in new]
+        moved = [{"identity": list(key[0]), "bounds": bounds, "old_bounds": old[key]}
+                 for key, bounds in new.items() if key in old and old[key] != bounds]
+        return HierarchyDiff(added, removed, moved)
+
+    # Size cap -------------------------------------------------------------------------------
+
+    def size(self) -> int:
+        """Bytes used by the stored entries."""
+        return sum(size for _, size, _ in self._entries())
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        for folder, _, files in os.walk(os.path.join(self.directory, "entries")):
+            for name in files:
+                if not name.endswith(".json.gz"):
+                    continue
+                path = os.path.join(folder, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue  # Evicted by another process
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _grow(self, grown: int):
+        """Account for a written entry and evict only once the cache is over max_bytes."""
+        with self._lock:
+            if self._size is None:
+                self._size = self.size()  # Includes the entry just written
+            else:
+                self._size += grown
+            over = self._size > self.max_bytes
+        if over:
+            self.evict()
+
+    def evict(self) -> int:
+        """Delete the least recently used entries until the cache fits max_bytes; returns how many."""
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            evicted = 0
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                evicted += 1
+            self._size = total  # Also picks up what other processes wrote meanwhile
+            return evicted
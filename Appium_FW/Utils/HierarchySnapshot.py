@@ -0,0 +1,199 @@
+import hashlib
+import re
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional, Tuple, Union
+
+from appium.webdriver.common.appiumby import AppiumBy
+
+
+class UnsupportedLocatorError(ValueError):
+    """Raised when a locator cannot be evaluated against a snapshot and must go to the device."""
+
+
+class HierarchySnapshot:
+    # Attributes holding ids / accessibility ids / texts, Android (UiAutomator2) first, then iOS (XCUITest)
+    ID_ATTRIBUTES = ("resource-id", "name")
+    ACCESSIBILITY_ATTRIBUTES = ("content-desc", "name")
+    TEXT_ATTRIBUTES = ("text", "value", "label")
+    # Attributes of simple XPath predicates that have a UiSelector equivalent (className aside)
+    UISELECTOR_METHODS = {"resource-id": "resourceId", "content-desc": "description", "text": "text"}
+    # Attributes that change without the screen content changing; left out of fingerprints
+    VOLATILE_ATTRIBUTES = frozenset({"focused"})
+    _VOLATILE_ATTRIBUTE_PATTERN = re.compile(
+        r' (?:%s)="[^"]*"' % "|".join(re.escape(name) for name in sorted(VOLATILE_ATTRIBUTES)))
+    # Minutes/seconds of clock-like texts ("9:41", "12:05:33") that tick on an otherwise settled
+    # screen; anchored on the colon so the scan stays cheap on large sources
+    TIMESTAMP_PATTERN = re.compile(r":(?<=\d:)[0-5]\d(?::[0-5]\d)?\b")
+    # Displayed texts (Android text/content-desc, iOS value/label) with a colon, the only places
+    # TIMESTAMP_PATTERN is applied: ids, bounds and other attributes are hashed as they are
+    _TIMESTAMP_ATTRIBUTE_PATTERN = re.compile(r' (?:text|content-desc|value|label)="[^":]*:[^"]*"')
+
+    def __init__(self, page_source: Union[str, bytes]):
+        """
+        Parse a page source once so locators can be evaluated locally instead of on the device.
+
+        :param page_source: The hierarchy XML as returned by driver.page_source.
+        """
+        self.page_source = page_source
+        self.root = ET.fromstring(page_source)
+        # XPath is evaluated from a synthetic document node so '//hierarchy' and '/hierarchy/...' also work
+        self._document = ET.Element("document")
+        self._document.append(self.root)
+        self._fingerprint: Optional[str] = None
+        self._index: Dict[Tuple[str, str], List[ET.Element]] = {}
+        for node in self.root.iter():
+            for attribute in set(self.ID_ATTRIBUTES + self.ACCESSIBILITY_ATTRIBUTES):
+                value = node.attrib.get(attribute)
+                if value:
+                    self._index.setdefault((attribute, value), []).append(node)
+
+    def find_all(self, by: str, value: str) -> List[ET.Element]:
+        """
+        Evaluate a locator against the snapshot.
+
+        :param by: AppiumBy strategy (ID, ACCESSIBILITY_ID or XPATH).
+        :param value: Locator value.
+        :return: Matching nodes in document order.
+        :raises UnsupportedLocatorError: If the strategy or XPath syntax cannot be evaluated locally.
+        """
+        if by == AppiumBy.ID:
+            return self._find_by_id(value)
+        if by == AppiumBy.ACCESSIBILITY_ID:
+            return self._find_by_attributes(self.ACCESSIBILITY_ATTRIBUTES, value)
+        if by == AppiumBy.XPATH:
+            return self._find_by_xpath(value)
+        raise UnsupportedLocatorError(f"Locator strategy '{by}' is not supported by snapshots.")
+
+    def find(self, by: str, value: str) -> Optional[ET.Element]:
+        """Return the first node matching the locator, like driver.find_element would, or None."""
+        matches = self.find_all(by, value)
+        return matches[0] if matches else None
+
+    def _find_by_attributes(self, attributes, value: str) -> List[ET.Element]:
+        for attribute in attributes:
+            matches = self._index.get((attribute, value))
+            if matches:
+                return matches
+        return []
+
+    def _find_by_id(self, value: str) -> List[ET.Element]:
+        matches = self._find_by_attributes(self.ID_ATTRIBUTES, value)
+        if matches or ":id/" in value:
+            return matches
+        # UiAutomator2 accepts ids without the package prefix ('login_button' for 'pkg:id/login_button')
+        suffix = f":id/{value}"
+        return [node for node in self.root.iter() if node.attrib.get("resource-id", "").endswith(suffix)]
+
+    def _find_by_xpath(self, xpath: str) -> List[ET.Element]:
+        if not xpath.startswith("/"):
+            raise UnsupportedLocatorError(f"Relative XPath '{xpath}' is not supported by snapshots.")
+        try:
+            return self._document.findall("." + xpath)
+        except (SyntaxError, KeyError, TypeError) as e:
+            # ElementTree only implements an XPath subset (no contains(), text(), 'or', ...)
+            raise UnsupportedLocatorError(f"XPath '{xpath}' cannot be evaluated locally: {e}")
+
+    def text(self, node: ET.Element) -> str:
+        """Return the node's text the way element.text reports it."""
+        for attribute in self.TEXT_ATTRIBUTES:
+            value = node.attrib.get(attribute)
+            if value:
+                return value
+        return ""
+
+    @staticmethod
+    def uiselector_string(value: str) -> str:
+        """Quote a value as a string argument of a UiSelector method."""
+        return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+    def device_locator(self, node: ET.Element) -> Tuple[str, str]:
+        """
+        Return the cheapest device-side locator that still identifies the node uniquely.
+
+        A unique id or accessibility id is used as is. Other Android nodes get a UiSelector on
+        their id, description, text or class with the node's instance number among its matches,
+        which the device resolves without the full-tree scan of an XPath; iOS nodes, without a
+        UiSelector, fall back to an XPath on their position.
+
+        :param node: A node of this snapshot.
+        :return: (AppiumBy strategy, value) tuple.
+        """
+        for attribute in self.ID_ATTRIBUTES:
+            value = node.attrib.get(attribute)
+            if value and len(self._index.get((attribute, value), ())) == 1:
+                return (AppiumBy.ID if attribute == "resource-id" else AppiumBy.ACCESSIBILITY_ID), value
+
+        value = node.attrib.get("content-desc")
+        if value and len(self._index.get(("content-desc", value), ())) == 1:
+            return AppiumBy.ACCESSIBILITY_ID, value
+
+        if "bounds" in node.attrib:  # UiAutomator2 hierarchy
+            for attribute, method in (*self.UISELECTOR_METHODS.items(), ("class", "className")):
+                value = node.attrib.get(attribute)
+                if value:
+                    # UiSelector instances count matches in document order, like iter()
+                    matches = (candidate for candidate in self.root.iter() if candidate.attrib.get(attribute) == value)
+                    instance = next(number for number, candidate in enumerate(matches) if candidate is node)
+                    return (AppiumBy.ANDROID_UIAUTOMATOR,
+                            f"new UiSelector().{method}({self.uiselector_string(value)}).instance({instance})")
+
+        class_name = node.attrib.get("type") or node.tag
+        # iOS nodes have no bounds string; position attributes identify them instead
+        predicates = "".join(f"[@{key}='{node.attrib[key]}']" for key in ("x", "y", "width", "height")
+                             if key in node.attrib)
+        return AppiumBy.XPATH, f"//{class_name}{predicates}"
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the hierarchy's structure and attributes, equal for two pulls of an unchanged screen."""
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            for node in self.root.iter():
+                digest.update(node.tag.encode("utf-8"))
+                for key, value in sorted(node.attrib.items()):
+                    if key not in self.VOLATILE_ATTRIBUTES:
+                        digest.update(f"\x1f{key}={value}".encode("utf-8"))
+                digest.update(b"\x1e")
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    @classmethod
+    def fast_fingerprint(cls, page_source: Union[str, bytes], ignore_timestamps: bool = True,
+                         ignore_patterns: Tuple[str, ...] = ()) -> str:
+        """
+        Hash of a raw page source without parsing it.
+
+        Volatile attributes are cut out with regular expressions, which costs a fraction of
+        building the tree; meant for polling loops that only compare consecutive pulls.
+
+        :param page_source: The hierarchy XML as returned by driver.page_source.
+        :param ignore_timestamps: Also blank out clock-like times (e.g. a status bar clock) in the
+                                  displayed texts: text, content-desc, value and label attributes.
+        :param ignore_patterns: Extra regular expressions whose matches are ignored.
+        :return: Hex digest; equal for two pulls of a screen that only differ in ignored parts.
+        """
+        if isinstance(page_source, bytes):
+            page_source = page_source.decode("utf-8", errors="replace")
+        page_source = cls._VOLATILE_ATTRIBUTE_PATTERN.sub("", page_source)
+        if ignore_timestamps:
+            page_source = cls._TIMESTAMP_ATTRIBUTE_PATTERN.sub(
+                lambda match: cls.TIMESTAMP_PATTERN.sub("", match.group()), page_source)
+        for pattern in ignore_patterns:
+            page_source = re.sub(pattern, "", page_source)
+        return hashlib.blake2b(page_source.encode("utf-8"), digest_size=16).hexdigest()
+
+    @staticmethod
+    def parse_bounds(bounds: str) -> Optional[Tuple[int, int, int, int]]:
+        """Parse '[x1,y1][x2,y2]' into (x1, y1, x2, y2), or None if malformed."""
+        match = re.match(r"\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]", bounds or "")
+        return tuple(int(value) for value in match.groups()) if match else None
+
+    def scrollable_area(self) -> Optional[Dict[str, int]]:
+        """Return the left/top/width/height of the first scrollable container, if any."""
+        for node in self.root.iter():
+            if node.attrib.get("scrollable") == "true":
+                bounds = self.parse_bounds(node.attrib.get("bounds"))
+                if bounds:
+                    x1, y1, x2, y2 = bounds
+                    return {"left": x1, "top": y1, "width": x2 - x1, "height": y2 - y1}
+        return None
@@ -0,0 +1,237 @@
+import csv
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is open-ended
+BUCKET_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+# Selenium/Appium command names grouped under the categories we report on
+COMMAND_CATEGORIES = {
+    "findElement": "find", "findElements": "find", "findChildElement": "find", "findChildElements": "find",
+    "clickElement": "click",
+    "sendKeysToElement": "send_keys", "clearElement": "send_keys",
+    "getPageSource": "page_source",
+    "screenshot": "screenshot", "elementScreenshot": "screenshot",
+}
+
+
+class Histogram:
+    # Raw samples kept per key for percentiles; counts and totals stay exact beyond that
+    MAX_SAMPLES = 10000
+
+    def __init__(self):
+        """Latency distribution of one command or step, in seconds."""
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.samples: List[float] = []
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        milliseconds = seconds * 1000
+        index = next((i for i, bound in enumerate(BUCKET_BOUNDS_MS) if milliseconds <= bound), len(BUCKET_BOUNDS_MS))
+        self.buckets[index] += 1
+        if len(self.samples) < self.MAX_SAMPLES:
+            self.samples.append(seconds)
+
+    def percentile(self, fraction: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def to_dict(self) -> Dict:
+        buckets = {f"<={bound}": count for bound, count in zip(BUCKET_BOUNDS_MS, self.buckets)}
+        buckets[f">{BUCKET_BOUNDS_MS[-1]}"] = self.buckets[-1]
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total * 1000 / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.5) * 1000, 3),
+            "p95_ms": round(self.percentile(0.95) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            "buckets_ms": buckets,
+        }
+
+
+class _Step:
+    def __init__(self):
+        self.device_time = 0.0
+
+
+class Instrumentation:
+    """
+    Process-wide timing of AppiumActions steps and driver commands.
+
+    Disabled by default: the driver is then left unwrapped and instrumented actions only pay a
+    single flag check.
+    """
+    enabled = False
+    _lock = threading.Lock()
+    _commands: Dict[Tuple[str, str], Histogram] = {}  # (category, command) -> latency
+    _steps: Dict[Tuple[str, str, str], Dict[str, Histogram]] = {}  # (action, locator, strategy) -> histograms
+    _flows: Dict[str, Dict] = {}  # batched flow -> device calls made, calls saved and duration
+    _local = threading.local()
+
+    @classmethod
+    def enable(cls):
+        cls.enabled = True
+
+    @classmethod
+    def disable(cls):
+        cls.enabled = False
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._commands.clear()
+            cls._steps.clear()
+            cls._flows.clear()
+
+    @classmethod
+    def instrument_driver(cls, driver):
+        """Time every command the driver sends to the device (no-op when disabled or already done)."""
+        executor = getattr(driver, "command_executor", None)
+        if not cls.enabled or executor is None or getattr(executor, "_instrumented", False):
+            return driver
+        execute = executor.execute
+
+        @functools.wraps(execute)
+        def timed_execute(command, params):
+            start = time.perf_counter()
+            try:
+                return execute(command, params)
+            finally:
+                cls.record_command(command, time.perf_counter() - start)
+
+        executor.execute = timed_execute
+        executor._instrumented = True
+        return driver
+
+    @classmethod
+    def record_command(cls, command: str, seconds: float):
+        """Record one device round trip and charge it to the steps in progress."""
+        for step in getattr(cls._local, "stack", ()):
+            step.device_time += seconds
+        key = (COMMAND_CATEGORIES.get(command, "other"), command)
+        with cls._lock:
+            histogram = cls._commands.get(key)
+            if histogram is None:
+                histogram = cls._commands[key] = Histogram()
+            histogram.add(seconds)
+
+    @classmethod
+    @contextmanager
+    def step(cls, action: str, locator_name: str = "", strategy: str = ""):
+        """Time a framework step, split into device time and waiting/local time."""
+        stack = getattr(cls._local, "stack", None)
+        if stack is None:
+            stack = cls._local.stack = []
+        step = _Step()
+        stack.append(step)
+        start = time.perf_counter()
+        try:
+            yield step
+        finally:
+            total = time.perf_counter() - start
+            stack.pop()
+            with cls._lock:
+                histograms = cls._steps.get((action, locator_name, strategy))
+                if histograms is None:
+                    histograms = cls._steps[(action, locator_name, strategy)] = {
+                        "total": Histogram(), "device": Histogram(), "wait": Histogram()}
+                histograms["total"].add(total)
+                histograms["device"].add(step.device_time)
+                histograms["wait"].add(max(0.0, total - step.device_time))
+
+    @classmethod
+    def record_flow(cls, flow: str, device_calls: int, unbatched_calls: int, seconds: float):
+        """Record one run of a batched flow (see ActionBatch) against its unbatched cost."""
+        with cls._lock:
+            totals = cls._flows.get(flow)
+            if totals is None:
+                totals = cls._flows[flow] = {"device_calls": 0, "unbatched_calls": 0, "time": Histogram()}
+            totals["device_calls"] += device_calls
+            totals["unbatched_calls"] += unbatched_calls
+            totals["time"].add(seconds)
+
+    @classmethod
+    def report(cls) -> Dict:
+        """Return every histogram as plain data."""
+        with cls._lock:
+            return {
+                "commands": [{"category": category, "command": command, **histogram.to_dict()}
+                             for (category, command), histogram in sorted(cls._commands.items())],
+                "steps": [{"action": action, "locator": locator, "strategy": strategy,
+                           **{kind: histogram.to_dict() for kind, histogram in histograms.items()}}
+                          for (action, locator, strategy), histograms in sorted(cls._steps.items())],
+                "flows": [{"flow": flow, "device_calls": totals["device_calls"],
+                           "unbatched_calls": totals["unbatched_calls"],
+                           "saved_calls": totals["unbatched_calls"] - totals["device_calls"],
+                           **totals["time"].to_dict()}
+                          for flow, totals in sorted(cls._flows.items())],
+            }
+
+    @classmethod
+    def slowest(cls, top: int = 10) -> List[Dict]:
+        """Steps ranked by the total time they cost the run."""
+        steps = cls.report()["steps"]
+        return sorted(steps, key=lambda step: step["total"]["total_ms"], reverse=True)[:top]
+
+    @classmethod
+    def export_json(cls, path: str):
+        with open(path, "w") as file:
+            json.dump(cls.report(), file, indent=2)
+
+    @classmethod
+    def export_csv(cls, path: str):
+        """One row per step and per command with count, total, mean, p50, p95 and max."""
+        columns = ["count", "total_ms", "mean_ms", "p50_ms", "p95_ms", "max_ms"]
+        report = cls.report()
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["kind", "name", "locator", "strategy", "measure"] + columns)
+            for step in report["steps"]:
+                for measure in ("total", "device", "wait"):
+                    writer.writerow(["step", step["action"], step["locator"], step["strategy"], measure]
+                                    + [step[measure][column] for column in columns])
+            for command in report["commands"]:
+                writer.writerow(["command", command["command"], "", "", command["category"]]
+                                + [command[column] for column in columns])
+            for flow in report["flows"]:
+                writer.writerow(["flow", flow["flow"], "", "",
+                                 f"{flow['device_calls']}/{flow['unbatched_calls']} calls"]
+                                + [flow[column] for column in columns])
+
+
+def instrumented(action: str, takes_locator: bool = True):
+    """
+    Decorator timing an AppiumActions method as a step named after the action.
+
+    :param action: Step name in the reports (e.g. "click").
+    :param takes_locator: The first positional argument is a locator name; its strategy is
+                          resolved through the instance's resolve_locator.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not Instrumentation.enabled:
+                return method(self, *args, **kwargs)
+            locator_name = args[0] if takes_locator and args and isinstance(args[0], str) else ""
+            strategy = ""
+            if locator_name and hasattr(self, "resolve_locator"):
+                try:
+                    strategy = self.resolve_locator(locator_name)[0]
+                except (KeyError, ValueError):
+                    strategy = ""
+            with Instrumentation.step(action, locator_name, strategy):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
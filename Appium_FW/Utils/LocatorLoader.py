@@ -1,5 +1,166 @@
 import json
-from typing import Dict, Optional
+import logging
+import os
+import threading
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from appium.webdriver.common.appiumby import AppiumBy
+
+from Appium_FW.Utils.DependencyTracker import DependencyTracker
+from Appium_FW.Utils.ResourcePaths import ResourceNotFoundError, ResourcePaths
+
+# Locator precompiled for the active device type: (AppiumBy strategy, value)
+CompiledLocator = Tuple[str, str]
+
+
+def _read_only(value: Any) -> Any:
+    """Nested dicts turned into read-only views, so content shared through the registry cannot be changed."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _read_only(item) for key, item in value.items()})
+    return value
+
+
+class LocatorRegistry:
+    """
+    Process-wide cache of parsed locator and config files.
+
+    Each file is parsed once per process and only re-read when its mtime changes; locator files
+    are also precompiled into immutable (AppiumBy, value) tuples per device type. A built
+    ResourceBundle, when there is one, is installed on first use; bundled files are then decoded
+    from it instead of parsed, each on its first lookup.
+    """
+    _files: Dict[str, Tuple[int, Any]] = {}  # path -> (mtime_ns, parsed content)
+    _compiled: Dict[Tuple[str, str], Tuple[int, Mapping[str, CompiledLocator]]] = {}
+    _bundled: Dict[str, Tuple[int, Callable]] = {}  # path -> (mtime_ns, source) of preloaded content
+    _lock = threading.RLock()
+
+    @classmethod
+    def preload(cls, path: str, mtime: int, source: Callable[[], Tuple[Any, Dict[str, Dict[str, CompiledLocator]]]]):
+        """
+        Register already parsed content of a file (e.g. from a ResourceBundle), decoded on first use.
+
+        The entry is served only while the file's mtime still matches; an edited file is parsed.
+
+        :param path: Path of the file.
+        :param mtime: mtime_ns of the file the content was parsed from.
+        :param source: Returns the parsed content (validated locators, or the device type of a
+                       config file) and the compiled locators by device type; raises ValueError
+                       when it cannot, and the file is parsed instead.
+        """
+        with cls._lock:
+            cls._bundled[os.path.abspath(path)] = (mtime, source)
+
+    @classmethod
+    def _from_bundle(cls, key: str, mtime: int) -> Optional[Tuple[int, Any]]:
+        bundled = cls._bundled.pop(key, None)
+        if not bundled or bundled[0] != mtime:
+            return None
+        try:
+            content, compiled = bundled[1]()
+        except ValueError as e:
+            logging.warning(f"Parsing '{key}' instead of using the resource bundle: {e}")
+            return None
+        for device_type, locators in compiled.items():
+            cls._compiled[(key, device_type)] = (mtime, MappingProxyType(locators))
+        cls._files[key] = (mtime, _read_only(content))
+        return cls._files[key]
+
+    @classmethod
+    def _load(cls, path: str, parse: Callable[[str], Any], label: str) -> Tuple[int, Any]:
+        """Return (mtime_ns, content) for a file, parsing it only when it is new or changed on disk."""
+        ResourcePaths.install_bundle()
+        key = os.path.abspath(path)
+        try:
+            mtime = os.stat(key).st_mtime_ns
+        except FileNotFoundError:
+            raise ResourceNotFoundError(f"{label} file '{path}' not found.")
+
+        cached = cls._files.get(key)
+        if cached and cached[0] == mtime:
+            return cached
+
+        with cls._lock:
+            cached = cls._files.get(key) or cls._from_bundle(key, mtime)
+            if cached and cached[0] == mtime:
+                return cached
+            try:
+                with open(key, 'r') as file:
+                    content = parse(file.read())
+            except FileNotFoundError:
+                raise ResourceNotFoundError(f"{label} file '{path}' not found.")
+            except json.JSONDecodeError:
+                raise Exception(f"Error parsing JSON in the file '{path}'.")
+            cls._files[key] = (mtime, content)
+            return cls._files[key]
+
+    @classmethod
+    def locators(cls, locator_file: str) -> Mapping[str, Mapping[str, Mapping[str, str]]]:
+        """
+        Return the parsed locator file, validating every locator type on load.
+
+        The content is shared by every loader of the file, so it is returned as read-only views.
+        """
+        return cls._load_locator_file(locator_file)[1]
+
+    @classmethod
+    def _load_locator_file(cls, locator_file: str) -> Tuple[int, Mapping[str, Mapping[str, Mapping[str, str]]]]:
+        return cls._load(locator_file, lambda text: _read_only(cls._validate(json.loads(text), locator_file)),
+                         "Locator")
+
+    @classmethod
+    def device_type(cls, config_file: str) -> str:
+        """Return the device type configured in the config file."""
+        return cls._load(config_file, lambda text: json.loads(text).get("device_type", "android").lower(),
+                         "Config")[1]  # Default to 'android'
+
+    @classmethod
+    def compiled(cls, locator_file: str, device_type: str) -> Mapping[str, CompiledLocator]:
+        """Return the locators of a file compiled to (AppiumBy, value) tuples for a device type."""
+        mtime, locators = cls._load_locator_file(locator_file)
+        key = (os.path.abspath(locator_file), device_type)
+        cached = cls._compiled.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        platform_key = f"{device_type}_locator"
+        compiled = MappingProxyType({
+            name: (cls.strategy(info[platform_key]['type']), info[platform_key]['value'])
+            for name, info in locators.items() if info.get(platform_key)
+        })
+        with cls._lock:
+            cls._compiled[key] = (mtime, compiled)
+        return compiled
+
+    @staticmethod
+    def strategy(locator_type: str) -> str:
+        """Map a locator file type (e.g. 'accessibility_id') to its AppiumBy strategy."""
+        strategy = getattr(AppiumBy, locator_type.upper(), None)
+        if not strategy:
+            raise ValueError(f"Invalid locator type: {locator_type}")
+        return strategy
+
+    @classmethod
+    def _validate(cls, locators: Dict[str, Dict[str, Dict[str, str]]], locator_file: str):
+        """Fail at load time, rather than on first use, on malformed entries or unknown locator types."""
+        for name, info in locators.items():
+            for platform_key, locator in info.items():
+                if not isinstance(locator, dict) or 'type' not in locator or 'value' not in locator:
+                    raise ValueError(f"Locator '{name}' ({platform_key}) in '{locator_file}' needs a type and a value.")
+                try:
+                    cls.strategy(locator['type'])
+                except ValueError as e:
+                    raise ValueError(f"Locator '{name}' ({platform_key}) in '{locator_file}': {e}")
+        return locators
+
+    @classmethod
+    def clear(cls):
+        """Forget every cached file."""
+        with cls._lock:
+            cls._files.clear()
+            cls._compiled.clear()
+            cls._bundled.clear()
+        ResourcePaths.reset_bundle()
 
 
 class LocatorLoader:
@@ -7,35 +168,32 @@ class LocatorLoader:
         """
         Initialize the LocatorLoader with the specific page's locator JSON file and a single config file for device type.
 
+        Files are served from the process-wide LocatorRegistry, so constructing many loaders
+        for the same page costs a couple of stat calls rather than re-parsing JSON. Files are
+        taken from the working directory when they are there, else from the package (see
+        ResourcePaths), so tests can run from any directory.
+
         :param page: The name of the page (e.g., "login" or "home"), which corresponds to the locator file (e.g., "login_locators.json").
         """
         self.locator_file = f"{page}_locators.json"  # Page-specific locator file
         self.config_file = 'config.json'  # Single config file for device type
+        self.locator_path = ResourcePaths.locator_file(page)
+        self.config_path = ResourcePaths.config_file(self.config_file)
+        if DependencyTracker.enabled:
+            DependencyTracker.record_page(page)
         self.locators = self._load_locators()
         self.device_type = self._load_device_type()
+        self.compiled_locators = LocatorRegistry.compiled(self.locator_path, self.device_type)
 
-    def _load_locators(self) -> Dict[str, Dict[str, Dict[str, str]]]:
+    def _load_locators(self) -> Mapping[str, Mapping[str, Mapping[str, str]]]:
         """Load locators from the page-specific JSON file and return as a dictionary."""
-        try:
-            with open(self.locator_file, 'r') as file:
-                return json.load(file)
-        except FileNotFoundError:
-            raise Exception(f"Locator file '{self.locator_file}' not found.")
-        except json.JSONDecodeError:
-            raise Exception(f"Error parsing JSON in the file '{self.locator_file}'.")
+        return LocatorRegistry.locators(self.locator_path)
 
     def _load_device_type(self) -> str:
         """Load device type from the config JSON file."""
-        try:
-            with open(self.config_file, 'r') as file:
-                config = json.load(file)
-                return config.get("device_type", "android").lower()  # Default to 'android'
-        except FileNotFoundError:
-            raise Exception(f"Config file '{self.config_file}' not found.")
-        except json.JSONDecodeError:
-            raise Exception(f"Error parsing JSON in the file '{self.config_file}'.")
+        return LocatorRegistry.device_type(self.config_path)
 
-    def get_locator(self, name: str) -> Optional[Dict[str, str]]:
+    def get_locator(self, name: str) -> Optional[Mapping[str, str]]:
         """
         Retrieve the locator for the given name based on the configured device type.
 
@@ -43,6 +201,8 @@ class LocatorLoader:
         :return: Dictionary containing the locator type and value.
         """
         platform_key = f"{self.device_type}_locator"
+        if DependencyTracker.enabled:
+            DependencyTracker.record_locator(self.locator_path, name)
 
         locator_info = self.locators.get(name)
         if not locator_info:
@@ -54,6 +214,21 @@ class LocatorLoader:
 
         return platform_locator
 
+    def get_by(self, name: str) -> CompiledLocator:
+        """
+        Retrieve the precompiled (AppiumBy, value) tuple for the given name on the configured device type.
+
+        :param name: The name of the locator as defined in the JSON.
+        :return: Tuple ready to pass to find_element.
+        """
+        if DependencyTracker.enabled:
+            DependencyTracker.record_locator(self.locator_path, name)
+        try:
+            return self.compiled_locators[name]
+        except KeyError:
+            self.get_locator(name)  # Raises the descriptive KeyError
+            raise
+
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,352 @@
+import argparse
+import json
+import re
+import sys
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional, Tuple
+
+from appium.webdriver.common.appiumby import AppiumBy
+
+from Appium_FW.Utils.HierarchySnapshot import HierarchySnapshot, UnsupportedLocatorError
+from Appium_FW.Utils.LocatorLoader import LocatorRegistry
+
+# Relative device-side cost of one lookup per locator type. id, accessibility id and selector
+# lookups are answered by the automation framework's own queries; XPath makes the driver
+# serialize the whole hierarchy first, so its cost also grows with the number of nodes.
+STRATEGY_COSTS = {
+    "id": 1.0,
+    "accessibility_id": 1.0,
+    "android_uiautomator": 1.3,
+    "ios_predicate": 1.3,
+    "ios_class_chain": 1.6,
+    "xpath": 4.0,
+}
+XPATH_COST_PER_NODE = 0.05
+# contains()/starts-with() predicates are string scans on every node instead of equality checks
+XPATH_FUNCTION_FACTOR = 1.5
+# Tie-break between equally cheap candidates: the most stable strategy wins
+STRATEGY_PREFERENCE = ("id", "accessibility_id", "android_uiautomator", "ios_predicate", "ios_class_chain", "xpath")
+
+_SIMPLE_XPATH = re.compile(r"//([\w.]+|\*)((?:\[(?:@[\w-]+='[^']*'|contains\(@[\w-]+,\s*'[^']*'\))\])*)")
+_XPATH_PREDICATE = re.compile(r"\[(?:@([\w-]+)='([^']*)'|contains\(@([\w-]+),\s*'([^']*)'\))\]")
+_UISELECTOR_CALL = re.compile(r'\.(\w+)\("((?:[^"\\]|\\.)*)"\)')
+
+
+class LocatorCandidate:
+    def __init__(self, locator_type: str, value: str, matches: int, cost: float):
+        """
+        One way of locating an element, checked against the recorded hierarchy.
+
+        :param locator_type: Locator file type (e.g. "accessibility_id").
+        :param value: Locator value.
+        :param matches: Nodes of the hierarchy it matches; only 1 is usable.
+        :param cost: Estimated device-side cost of one lookup (see STRATEGY_COSTS).
+        """
+        self.locator_type = locator_type
+        self.value = value
+        self.matches = matches
+        self.cost = cost
+
+    @property
+    def unique(self) -> bool:
+        return self.matches == 1
+
+    def to_locator(self) -> Dict[str, str]:
+        return {"type": self.locator_type, "value": self.value}
+
+
+class LocatorOptimizer:
+    def __init__(self, page_source: str, device_type: str = "android"):
+        """
+        Rank every way of locating the elements of a recorded screen and rewrite locator files
+        to the cheapest one that is still unique.
+
+        :param page_source: Recorded hierarchy XML (e.g. the content of screen_source.xml).
+        :param device_type: Platform whose locators are optimized ("android" or "ios").
+        """
+        self.snapshot = HierarchySnapshot(page_source)
+        self.device_type = device_type.lower()
+        self.node_count = sum(1 for _ in self.snapshot.root.iter())
+
+    @classmethod
+    def from_file(cls, page_source_file: str, device_type: str = "android") -> "LocatorOptimizer":
+        try:
+            with open(page_source_file, "r", encoding="utf-8") as file:
+                return cls(file.read(), device_type)
+        except FileNotFoundError:
+            raise Exception(f"Page source file '{page_source_file}' not found.")
+
+    def cost(self, locator_type: str, value: str) -> float:
+        """Estimated device-side cost of one lookup with this locator on this screen."""
+        cost = STRATEGY_COSTS.get(locator_type, STRATEGY_COSTS["xpath"])
+        if locator_type == "xpath":
+            cost += XPATH_COST_PER_NODE * self.node_count
+            if "contains(" in value or "starts-with(" in value:
+                cost *= XPATH_FUNCTION_FACTOR
+        return cost
+
+    # Matching -------------------------------------------------------------------------------
+
+    def match(self, locator_type: str, value: str) -> List[ET.Element]:
+        """
+        Nodes a locator matches on the recorded screen.
+
+        :raises UnsupportedLocatorError: If the locator cannot be evaluated offline.
+        """
+        if locator_type in ("id", "accessibility_id"):
+            return self.snapshot.find_all(LocatorRegistry.strategy(locator_type), value)
+        if locator_type == "xpath":
+            try:
+                return self.snapshot.find_all(AppiumBy.XPATH, value)
+            except UnsupportedLocatorError:
+                return self._match_simple_xpath(value)
+        if locator_type == "android_uiautomator":
+            return self._match_uiselector(value)
+        if locator_type == "ios_predicate":
+            return self._match_predicate(value)
+        raise UnsupportedLocatorError(f"Locator type '{locator_type}' cannot be evaluated offline.")
+
+    def _nodes_with(self, tag: Optional[str], conditions: List[Tuple[str, str, bool]]) -> List[ET.Element]:
+        """Nodes with the tag (None = any) whose attributes equal, or contain when the flag is set, the values."""
+        return [node for node in self.snapshot.root.iter()
+                if (tag is None or node.tag == tag or node.attrib.get("class") == tag)
+                and all((expected in node.attrib.get(attribute, "")) if partial
+                        else node.attrib.get(attribute) == expected
+                        for attribute, expected, partial in conditions)]
+
+    def _match_simple_xpath(self, xpath: str) -> List[ET.Element]:
+        """Evaluate '//tag[@a='v'][contains(@b,'w')]' XPaths, the shape the screen extractors generate."""
+        match = _SIMPLE_XPATH.fullmatch(xpath)
+        if not match:
+            raise UnsupportedLocatorError(f"XPath '{xpath}' cannot be evaluated offline.")
+        conditions = [(attribute or contains_attribute, value if attribute else contains_value, not attribute)
+                      for attribute, value, contains_attribute, contains_value
+                      in _XPATH_PREDICATE.findall(match.group(2))]
+        return self._nodes_with(None if match.group(1) == "*" else match.group(1), conditions)
+
+    def _match_uiselector(self, selector: str) -> List[ET.Element]:
+        methods = {method: attribute for attribute, method in HierarchySnapshot.UISELECTOR_METHODS.items()}
+        methods["className"] = "class"
+        conditions = []
+        for method, argument in _UISELECTOR_CALL.findall(selector):
+            if method not in methods:
+                raise UnsupportedLocatorError(f"UiSelector method '{method}' cannot be evaluated offline.")
+            conditions.append((methods[method], re.sub(r'\\(.)', r'\1', argument), False))
+        if not conditions or not selector.startswith("new UiSelector()"):
+            raise UnsupportedLocatorError(f"UiSelector '{selector}' cannot be evaluated offline.")
+        return self._nodes_with(None, conditions)
+
+    def _match_predicate(self, predicate: str) -> List[ET.Element]:
+        clauses = re.split(r"\s+AND\s+", predicate.strip())
+        conditions = []
+        for clause in clauses:
+            match = re.fullmatch(r"(\w+)\s*==\s*'((?:[^'\\]|\\.)*)'", clause)
+            if not match:
+                raise UnsupportedLocatorError(f"Predicate '{predicate}' cannot be evaluated offline.")
+            conditions.append((match.group(1), match.group(2), False))
+        return self._nodes_with(None, conditions)
+
+    # Candidates -----------------------------------------------------------------------------
+
+    def _candidate(self, locator_type: str, value: str) -> LocatorCandidate:
+        return LocatorCandidate(locator_type, value, len(self.match(locator_type, value)), self.cost(locator_type, value))
+
+    def candidates(self, node: ET.Element) -> List[LocatorCandidate]:
+        """
+        Every strategy that can locate the node, cheapest unique one first.
+
+        :param node: A node of the recorded hierarchy.
+        """
+        attrib = node.attrib
+        candidates = []
+        if self.device_type == "ios":
+            if attrib.get("name"):
+                candidates.append(self._candidate("accessibility_id", attrib["name"]))
+            for attribute in ("name", "label", "value"):
+                value = attrib.get(attribute)
+                if value and "'" not in value:
+                    candidates.append(self._candidate(
+                        "ios_predicate", f"type == '{attrib.get('type', node.tag)}' AND {attribute} == '{value}'"))
+        else:
+            if attrib.get("resource-id"):
+                candidates.append(self._candidate("id", attrib["resource-id"]))
+            if attrib.get("content-desc"):
+                candidates.append(self._candidate("accessibility_id", attrib["content-desc"]))
+            candidates.extend(self._uiselector_candidates(node))
+        candidates.extend(self._xpath_candidates(node))
+
+        # Keep one entry per locator, then rank: unique first, then cost, then stability
+        seen, ranked = set(), []
+        for candidate in candidates:
+            if (candidate.locator_type, candidate.value) not in seen:
+                seen.add((candidate.locator_type, candidate.value))
+                ranked.append(candidate)
+        return sorted(ranked, key=lambda candidate: (not candidate.unique, candidate.cost,
+                                                     STRATEGY_PREFERENCE.index(candidate.locator_type)))
+
+    def _uiselector_candidates(self, node: ET.Element) -> List[LocatorCandidate]:
+        quote = HierarchySnapshot.uiselector_string
+        class_name = node.attrib.get("class") or node.tag
+        candidates = []
+        for attribute, method in HierarchySnapshot.UISELECTOR_METHODS.items():
+            value = node.attrib.get(attribute)
+            if value:
+                candidates.append(self._candidate(
+                    "android_uiautomator", f'new UiSelector().className({quote(class_name)}).{method}({quote(value)})'))
+        return candidates
+
+    def _xpath_candidates(self, node: ET.Element) -> List[LocatorCandidate]:
+        """The shortest attribute XPaths that are unique, then the absolute positional path as a last resort."""
+        class_name = node.attrib.get("class") or node.attrib.get("type") or node.tag
+        attributes = [attribute for attribute in ("resource-id", "content-desc", "name", "text", "label", "value")
+                      if node.attrib.get(attribute) and "'" not in node.attrib[attribute]]
+        candidates = []
+        for attribute in attributes:
+            candidate = self._candidate("xpath", f"//{class_name}[@{attribute}='{node.attrib[attribute]}']")
+            candidates.append(candidate)
+            if candidate.unique:
+                return candidates
+        for index, first in enumerate(attributes):
+            for second in attributes[index + 1:]:
+                candidate = self._candidate("xpath", f"//{class_name}[@{first}='{node.attrib[first]}']"
+                                                     f"[@{second}='{node.attrib[second]}']")
+                candidates.append(candidate)
+                if candidate.unique:
+                    return candidates
+        path = self._absolute_path(node)
+        if path:
+            candidates.append(self._candidate("xpath", path))
+        return candidates
+
+    def _absolute_path(self, target: ET.Element) -> Optional[str]:
+        """'/hierarchy/a[1]/b[2]/...' path of a node, with positions among same-tag siblings."""
+        def walk(node, path):
+            if node is target:
+                return path
+            positions = {}
+            for child in node:
+                positions[child.tag] = positions.get(child.tag, 0) + 1
+                found = walk(child, f"{path}/{child.tag}[{positions[child.tag]}]")
+                if found:
+                    return found
+            return None
+        return walk(self.snapshot.root, f"/{self.snapshot.root.tag}")
+
+    # Rewriting ------------------------------------------------------------------------------
+
+    def optimize(self, locators: Dict[str, Dict[str, Dict[str, str]]]) -> Tuple[Dict, Dict]:
+        """
+        Rewrite a page's locators to the fastest unique strategy on the recorded screen.
+
+        Locators that do not resolve to exactly one node are left as they are and reported.
+
+        :param locators: Content of a *_locators.json file.
+        :return: (rewritten locators, report).
+        """
+        platform_key = f"{self.device_type}_locator"
+        rewritten = json.loads(json.dumps(locators, default=dict))  # A writable copy of registry content
+        entries = []
+        for name, info in locators.items():
+            locator = info.get(platform_key)
+            if not locator:
+                continue
+            entry = {"name": name, "before": dict(locator), "before_cost": round(self.cost(locator["type"], locator["value"]), 3)}
+            try:
+                matches = self.match(locator["type"], locator["value"])
+            except UnsupportedLocatorError as e:
+                entries.append(dict(entry, status="unsupported", reason=str(e)))
+                continue
+            if len(matches) != 1:
+                entries.append(dict(entry, status="missing" if not matches else "ambiguous", matches=len(matches)))
+                continue
+            best = self.candidates(matches[0])[0]
+            if not best.unique or best.cost >= entry["before_cost"]:
+                entries.append(dict(entry, status="kept"))
+                continue
+            rewritten[name][platform_key] = best.to_locator()
+            entries.append(dict(entry, status="optimized", after=best.to_locator(), after_cost=round(best.cost, 3),
+                                speedup=round(entry["before_cost"] / best.cost, 2)))
+        return rewritten, self._report(entries)
+
+    def locators_for_screen(self) -> Tuple[Dict, Dict]:
+        """
+        Locators for every identifiable element of the screen, with collision-free names.
+
+        Names follow ScreenElementExtractor (text, content-desc, resource-id) but repeated
+        names get a _2, _3, ... suffix instead of overwriting each other.
+
+        :return: (locators in *_locators.json format, report).
+        """
+        platform_key = f"{self.device_type}_locator"
+        locators, entries, counts = {}, [], {}
+        for node in self.snapshot.root.iter():
+            record = self._element_name(node)
+            if record is None:
+                continue
+            counts[record] = counts.get(record, 0) + 1
+            name = record if counts[record] == 1 else f"{record}_{counts[record]}"
+            best = self.candidates(node)[0]
+            if not best.unique:
+                entries.append({"name": name, "status": "ambiguous", "matches": best.matches})
+                continue
+            locators[name] = {platform_key: best.to_locator()}
+            entries.append({"name": name, "status": "generated", "after": best.to_locator(),
+                            "after_cost": round(best.cost, 3)})
+        return locators, self._report(entries)
+
+    @staticmethod
+    def _element_name(node: ET.Element) -> Optional[str]:
+        for attribute in ("text", "content-desc", "resource-id", "name", "label"):
+            value = node.attrib.get(attribute, "").strip()
+            if value:
+                return re.sub(r"\W+", "_", value.split(":id/")[-1]).strip("_").lower() or None
+        return None
+
+    def _report(self, entries: List[Dict]) -> Dict:
+        optimized = [entry for entry in entries if entry.get("status") == "optimized"]
+        before = sum(entry["before_cost"] for entry in optimized)
+        after = sum(entry["after_cost"] for entry in optimized)
+        statuses = {}
+        for entry in entries:
+            statuses[entry["status"]] = statuses.get(entry["status"], 0) + 1
+        return {
+            "device_type": self.device_type,
+            "hierarchy_nodes": self.node_count,
+            "statuses": statuses,
+            "expected_speedup": round(before / after, 2) if after else 1.0,
+            "locators": entries,
+        }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rewrite locators to the fastest unique strategy on a recorded screen.")
+    parser.add_argument("page_source", help="Recorded hierarchy XML (e.g. screen_source.xml).")
+    parser.add_argument("locator_file", nargs="?", help="*_locators.json to optimize; omit to generate one.")
+    parser.add_argument("--device-type", default="android", choices=["android", "ios"])
+    parser.add_argument("--output", required=True, help="Where to write the rewritten locator file.")
+    parser.add_argument("--report", default=None, help="Where to write the JSON report.")
+    args = parser.parse_args(argv)
+
+    optimizer = LocatorOptimizer.from_file(args.page_source, args.device_type)
+    if args.locator_file:
+        locators, report = optimizer.optimize(LocatorRegistry.locators(args.locator_file))
+    else:
+        locators, report = optimizer.locators_for_screen()
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(locators, file, indent=2, ensure_ascii=False)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+
+    for entry in report["locators"]:
+        detail = (f"{entry['before']['type']} -> {entry['after']['type']} ({entry['speedup']}x)"
+                  if entry["status"] == "optimized" else "")
+        print(f"{entry['status']:12s} {entry['name']} {detail}".rstrip())
+    print(f"{report['statuses']} on {report['hierarchy_nodes']} nodes, expected speedup of the optimized "
+          f"locators: {report['expected_speedup']}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+import argparse
+import functools
+import hashlib
+import json
+import logging
+import mmap
+import os
+import pickle
+import struct
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from Appium_FW.Utils.LocatorLoader import LocatorRegistry
+from Appium_FW.Utils.ResourcePaths import CONFIG_DIR, DATA_DIR, PACKAGE_DIR, ResourcePaths
+from Appium_FW.Utils.TestDataLoader import TestDataLoader
+
+BUNDLE_ENV = "APPIUM_FW_BUNDLE"
+DEFAULT_BUNDLE = os.path.join(PACKAGE_DIR, "build", "resources.bundle")
+DEVICE_TYPES = ("android", "ios")
+
+
+class ResourceBundle:
+    """
+    Every locator file, config file and JSON test data file of the package, parsed, validated and
+    compiled ahead of time into a single file.
+
+    The file is a header (magic, format version, index size and digest), a pickled index and one
+    pickled blob per file. Loading a bundle memory-maps it and reads only the index, so startup
+    costs the same whatever the number of pages; a page's blob is decoded (and checked against
+    its digest) when the page is first looked up. Entries keep the mtime of the file they were
+    built from and are served only while the file is unchanged, so a stale bundle never hides an
+    edit, it only stops saving time.
+
+    Bundles are build artifacts of the checkout they are loaded in; never load one from an
+    untrusted source (unpickling runs code).
+    """
+    MAGIC = b"AFWBNDL\0"
+    FORMAT_VERSION = 2
+    HEADER = struct.Struct("<8sIQ16s")  # magic, format version, index size, index digest
+
+    def __init__(self, path: str, index: Dict[str, Any], buffer):
+        """
+        :param path: Path of the bundle file.
+        :param index: "locators" by page, "configs" and "test_data" by path relative to the package,
+                      each with the mtime_ns of its file and the place of its blob.
+        :param buffer: Contents of the bundle file (a memory map).
+        """
+        self.path = path
+        self.index = index
+        self._buffer = buffer
+
+    @staticmethod
+    def _digest(content) -> bytes:
+        return hashlib.blake2b(content, digest_size=16).digest()
+
+    # Building -------------------------------------------------------------------------------
+
+    @staticmethod
+    def _read_json(path: str) -> Any:
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except json.JSONDecodeError:
+            raise Exception(f"Error parsing JSON in the file '{path}'.")
+
+    @staticmethod
+    def compile(locators: Dict[str, Dict[str, Dict[str, str]]]) -> Dict[str, Dict[str, Tuple[str, str]]]:
+        """Locators compiled to (AppiumBy, value) tuples for every device type."""
+        return {device_type: {name: (LocatorRegistry.strategy(info[f"{device_type}_locator"]["type"]),
+                                     info[f"{device_type}_locator"]["value"])
+                              for name, info in locators.items() if info.get(f"{device_type}_locator")}
+                for device_type in DEVICE_TYPES}
+
+    @classmethod
+    def build(cls, output: Optional[str] = None, config_files: Iterable[str] = ("config.json",),
+              data_dir: str = DATA_DIR, locator_files: Optional[Dict[str, str]] = None) -> str:
+        """
+        Compile the package's resources and write the bundle atomically.
+
+        :param output: Bundle path; APPIUM_FW_BUNDLE or build/resources.bundle in the package by default.
+        :param config_files: Config files in Utils/ (only their device type is used by LocatorLoader).
+        :param data_dir: Directory of the JSON test data files.
+        :param locator_files: Locator files by page; every *_locators.json under pages/ by default.
+        :return: Path of the bundle.
+        :raises ValueError: A locator is malformed or has an unknown type.
+        """
+        blobs: List[bytes] = []
+        offset = 0
+
+        def add(path: str, content: Any) -> Dict[str, Any]:
+            nonlocal offset
+            blob = pickle.dumps(content, protocol=pickle.HIGHEST_PROTOCOL)
+            blobs.append(blob)
+            entry = {"path": os.path.relpath(path, PACKAGE_DIR), "mtime": os.stat(path).st_mtime_ns,
+                     "offset": offset, "length": len(blob), "digest": cls._digest(blob)}
+            offset += len(blob)
+            return entry
+
+        if locator_files is None:
+            ResourcePaths.clear()  # Walk pages/ as it is now, not as an installed bundle saw it
+            locator_files = ResourcePaths.locator_files()
+        index: Dict[str, Any] = {"created": time.time(), "locators": {}, "configs": [], "test_data": []}
+        for page, path in sorted(locator_files.items()):
+            locators = LocatorRegistry._validate(cls._read_json(path), path)
+            index["locators"][page] = add(path, (locators, cls.compile(locators)))
+        for name in config_files:
+            path = os.path.join(CONFIG_DIR, name)
+            index["configs"].append(add(path, (cls._read_json(path).get("device_type", "android").lower(), {})))
+        if os.path.isdir(data_dir):
+            for name in sorted(os.listdir(data_dir)):
+                if name.endswith(".json"):  # JSONL/CSV datasets are served by their offset index
+                    path = os.path.join(data_dir, name)
+                    index["test_data"].append(add(path, cls._read_json(path)))
+
+        output = output or os.environ.get(BUNDLE_ENV) or DEFAULT_BUNDLE
+        payload = pickle.dumps(index, protocol=pickle.HIGHEST_PROTOCOL)
+        directory = os.path.dirname(os.path.abspath(output))
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile("wb", dir=directory, suffix=".tmp", delete=False) as file:
+            file.write(cls.HEADER.pack(cls.MAGIC, cls.FORMAT_VERSION, len(payload), cls._digest(payload)))
+            file.write(payload)
+            for blob in blobs:
+                file.write(blob)
+        os.replace(file.name, output)
+        return output
+
+    # Loading --------------------------------------------------------------------------------
+
+    @classmethod
+    def load(cls, path: str) -> "ResourceBundle":
+        """
+        Map a bundle and read its index.
+
+        :raises ValueError: The file is not a bundle, was built by another format version or is corrupt.
+        """
+        try:
+            with open(path, "rb") as file:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            raise Exception(f"Resource bundle file '{path}' not found.")
+        except ValueError:  # Empty file
+            raise ValueError(f"'{path}' is not a resource bundle.")
+        if len(buffer) < cls.HEADER.size:
+            raise ValueError(f"'{path}' is not a resource bundle.")
+        magic, version, index_size, digest = cls.HEADER.unpack_from(buffer)
+        if magic != cls.MAGIC:
+            raise ValueError(f"'{path}' is not a resource bundle.")
+        if version != cls.FORMAT_VERSION:
+            raise ValueError(f"Resource bundle '{path}' has format {version}, expected {cls.FORMAT_VERSION}; "
+                             f"rebuild it.")
+        payload = buffer[cls.HEADER.size:cls.HEADER.size + index_size]
+        if len(payload) != index_size or cls._digest(payload) != digest:
+            raise ValueError(f"Resource bundle '{path}' is corrupt; rebuild it.")
+        index = pickle.loads(payload)
+        for entry in [*index["locators"].values(), *index["configs"], *index["test_data"]]:
+            entry["offset"] += cls.HEADER.size + index_size  # Blobs follow the index
+        return cls(path, index, buffer)
+
+    def decode(self, entry: Dict[str, Any]) -> Any:
+        """
+        Content of a bundled file.
+
+        :raises ValueError: Its blob does not match the digest recorded at build time.
+        """
+        blob = self._buffer[entry["offset"]:entry["offset"] + entry["length"]]
+        if self._digest(blob) != entry["digest"]:
+            raise ValueError(f"Entry '{entry['path']}' of the resource bundle '{self.path}' is corrupt; rebuild it.")
+        return pickle.loads(blob)
+
+    def install(self) -> int:
+        """
+        Register the bundled files with the locator registry, the shared test data loaders and
+        the page index. Locator and config files are decoded on first use, test data right away.
+
+        :return: Number of files registered.
+        """
+        locator_files = {}
+        for page, entry in self.index["locators"].items():
+            path = locator_files[page] = os.path.join(PACKAGE_DIR, entry["path"])
+            LocatorRegistry.preload(path, entry["mtime"], functools.partial(self.decode, entry))
+        for entry in self.index["configs"]:
+            LocatorRegistry.preload(os.path.join(PACKAGE_DIR, entry["path"]), entry["mtime"],
+                                    functools.partial(self.decode, entry))
+        for entry in self.index["test_data"]:
+            TestDataLoader.preload(os.path.join(PACKAGE_DIR, entry["path"]), entry["mtime"], self.decode(entry))
+        ResourcePaths.register_locator_files(locator_files)
+        return len(locator_files) + len(self.index["configs"]) + len(self.index["test_data"])
+
+    @classmethod
+    def install_default(cls) -> bool:
+        """Install the default bundle if one was built; an unusable bundle is skipped with a warning."""
+        path = os.environ.get(BUNDLE_ENV) or DEFAULT_BUNDLE
+        if not os.path.exists(path):
+            return False
+        try:
+            count = cls.load(path).install()
+        except Exception as e:
+            logging.warning(f"Ignoring resource bundle '{path}': {e}")
+            return False
+        logging.info(f"Registered {count} resource files from '{path}'")
+        return True
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compile locator, config and test data files into one bundle.")
+    parser.add_argument("--output", default=None, help=f"Bundle path (default: ${BUNDLE_ENV} or {DEFAULT_BUNDLE}).")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    path = ResourceBundle.build(args.output)
+    index = ResourceBundle.load(path).index
+    print(f"Bundled {len(index['locators'])} locator files, {len(index['configs'])} config files and "
+          f"{len(index['test_data'])} test data files into {path} in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
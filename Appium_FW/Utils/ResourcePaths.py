@@ -0,0 +1,98 @@
+import os
+import threading
+from typing import Dict, Optional
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES_DIR = os.path.join(PACKAGE_DIR, "pages")
+CONFIG_DIR = os.path.join(PACKAGE_DIR, "Utils")
+DATA_DIR = os.path.join(PACKAGE_DIR, "Resources")
+
+
+class ResourceNotFoundError(Exception):
+    """A locator, config or test data file does not exist."""
+
+
+class ResourcePaths:
+    """
+    Where the framework's resource files are, whatever the working directory.
+
+    A path that exists as given (absolute, or relative to the working directory) always wins, so
+    a suite can still keep its own config.json and locator files next to it. Otherwise the file
+    is looked up in the package: locator files anywhere under pages/, config.json in Utils/ and
+    test data in Resources/. When nothing matches, the path is returned unchanged and the loader
+    reports it as not found.
+    """
+    _locator_files: Optional[Dict[str, str]] = None  # page -> absolute path under pages/
+    _lock = threading.Lock()
+    _bundle_checked = False  # Shared by every loader, so the default bundle is installed once
+    _bundle_lock = threading.Lock()
+
+    @classmethod
+    def install_bundle(cls):
+        """Install the default ResourceBundle, if one was built, before the first file is loaded."""
+        if cls._bundle_checked:
+            return
+        with cls._bundle_lock:
+            if cls._bundle_checked:
+                return
+            cls._bundle_checked = True
+        # Imported here: the bundle imports the loaders, which import this module
+        from Appium_FW.Utils.ResourceBundle import ResourceBundle
+        ResourceBundle.install_default()
+
+    @classmethod
+    def reset_bundle(cls):
+        """Look for the default bundle again on the next load."""
+        with cls._bundle_lock:
+            cls._bundle_checked = False
+
+    @classmethod
+    def locator_files(cls) -> Dict[str, str]:
+        """Locator files of the package by page name, found with a single walk of pages/."""
+        if cls._locator_files is None:
+            with cls._lock:
+                if cls._locator_files is None:
+                    found = {}
+                    for folder, _, files in os.walk(PAGES_DIR):
+                        for name in files:
+                            if name.endswith("_locators.json"):
+                                found.setdefault(name[:-len("_locators.json")], os.path.join(folder, name))
+                    cls._locator_files = found
+        return cls._locator_files
+
+    @classmethod
+    def register_locator_files(cls, locator_files: Dict[str, str]):
+        """Use a known page -> locator file index (e.g. from a ResourceBundle) instead of walking pages/."""
+        with cls._lock:
+            cls._locator_files = dict(locator_files)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._locator_files = None
+
+    @classmethod
+    def locator_file(cls, page: str) -> str:
+        """Locator file of a page: <page>_locators.json in the working directory, else under pages/."""
+        local = f"{page}_locators.json"
+        if os.path.exists(local):
+            return local
+        path = cls.locator_files().get(page)
+        if path is None:  # Possibly a page added since the index was made
+            cls.clear()
+            path = cls.locator_files().get(page, local)
+        return path
+
+    @staticmethod
+    def config_file(config_file: str = 'config.json') -> str:
+        if os.path.exists(config_file):
+            return config_file
+        packaged = os.path.join(CONFIG_DIR, config_file)
+        return packaged if os.path.exists(packaged) else config_file
+
+    @staticmethod
+    def data_file(data_file: str = 'test_data.json') -> str:
+        if os.path.exists(data_file):
+            return data_file
+        packaged = os.path.join(DATA_DIR, data_file)
+        return packaged if os.path.exists(packaged) else data_file
@@ -1,31 +1,60 @@
 from appium import webdriver
 import xml.etree.ElementTree as ET
 import json
+import logging
 import os
+from concurrent.futures import Future
+from typing import Dict, Iterator, Optional, Tuple, Union
 from appium.webdriver.webdriver import WebDriver as AppiumWebDriver
 
 from appium.options.android import UiAutomator2Options
+from Appium_FW.Utils.ArtifactPipeline import ArtifactPipeline
+from Appium_FW.Utils.ExtractionCache import Extraction, ExtractionCache
 
 
 class ScreenElementExtractor:
+    # Bytes fed to the pull parser at a time when streaming a page source
+    CHUNK_SIZE = 64 * 1024
+    # Entries of the extraction cache; bump the version when build_element changes
+    CACHE_KIND = "screen_elements-v1"
+
     def __init__(self, driver: webdriver.Remote, output_file: str = "elements.json",
-                 page_source_file: str = "page_source.xml"):
+                 page_source_file: str = "page_source.xml", cache: Optional[ExtractionCache] = None):
         """
         Initialize the extractor.
 
         :param driver: Appium WebDriver instance.
         :param output_file: Path to the output JSON file.
         :param page_source_file: Path to save the page source XML file.
+        :param cache: Reuse the records of screens extracted before (see ExtractionCache); the
+                      output file is the screen's name in the cache.
         """
         self.driver = driver
         self.output_file = output_file
         self.page_source_file = page_source_file
+        self.cache = cache
+        self.last_extraction: Optional[Extraction] = None
         self.elements = {}
 
-    def save_page_source(self):
-        """Fetch and save the current page source to an XML file."""
-        page_source = self.driver.page_source
-        with open(self.page_source_file, "w", encoding="utf-8") as file:
+    def save_page_source(self, page_source: Optional[str] = None, asynchronous: bool = False) -> Optional[Future]:
+        """
+        Save the page source to an XML file.
+
+        :param page_source: Page source to save; fetched from the driver when omitted.
+        :param asynchronous: Write the file on the shared artifact pipeline and return its Future.
+        :return: The pending write when asynchronous, otherwise None.
+        """
+        if page_source is None:
+            page_source = self.driver.page_source
+        if asynchronous:
+            return ArtifactPipeline.shared().run(self._write_page_source, page_source)
+        self._write_page_source(page_source)
+        return None
+
+    def _write_page_source(self, page_source: Union[str, bytes]):
+        """Write the page source to page_source_file."""
+        mode, encoding = ("wb", None) if isinstance(page_source, bytes) else ("w", "utf-8")
+        with open(self.page_source_file, mode, encoding=encoding) as file:
             file.write(page_source)
 
     def parse_screen_source(self):
@@ -35,52 +64,132 @@ class ScreenElementExtractor:
                 f"The file {self.page_source_file} does not exist. Please fetch the page source first.")
 
         try:
-            tree = ET.parse(self.page_source_file)
-            root = tree.getroot()
-            self._extract_elements(root)
+            with open(self.page_source_file, "rb") as file:
+                self.elements.update(self.iter_elements(file))
         except ET.ParseError as e:
-            print(f"Error parsing screen source: {e}")
+            logging.warning(f"Error parsing screen source: {e}")
 
-    def _extract_elements(self, node):
-        """Recursive method to extract element locators."""
+    @staticmethod
+    def build_element(tag: str, attrib: Dict[str, str]) -> Optional[Tuple[str, Dict[str, str]]]:
+        """
+        Build the (element_name, locator) record for a single node.
+
+        :param tag: The node's tag.
+        :param attrib: The node's attributes.
+        :return: The record, or None when no locator can be derived.
+        """
         # Determine the element name
         element_name = (
-                node.attrib.get("text", "").strip()
-                or node.attrib.get("content-desc", "").strip()
-                or node.attrib.get("resource-id", "").strip()
-                or f"Unnamed_{node.tag}"
+                attrib.get("text", "").strip()
+                or attrib.get("content-desc", "").strip()
+                or attrib.get("resource-id", "").strip()
+                or f"Unnamed_{tag}"
         )
 
         # Determine the locator strategy
-        if "resource-id" in node.attrib and node.attrib["resource-id"].strip():
-            locator = f"//*[@resource-id='{node.attrib['resource-id'].strip()}']"
-        elif "text" in node.attrib and node.attrib["text"].strip():
-            locator = f"//*[contains(@text,'{node.attrib['text'].strip()}')]"
-        elif "content-desc" in node.attrib and node.attrib["content-desc"].strip():
-            locator = f"//*[@content-desc='{node.attrib['content-desc'].strip()}']"
-        elif "class" in node.attrib and node.attrib["class"].strip():
-            locator = f"//*[contains(@class,'{node.attrib['class'].strip()}')]"
+        if "resource-id" in attrib and attrib["resource-id"].strip():
+            locator = f"//*[@resource-id='{attrib['resource-id'].strip()}']"
+        elif "text" in attrib and attrib["text"].strip():
+            locator = f"//*[contains(@text,'{attrib['text'].strip()}')]"
+        elif "content-desc" in attrib and attrib["content-desc"].strip():
+            locator = f"//*[@content-desc='{attrib['content-desc'].strip()}']"
+        elif "class" in attrib and attrib["class"].strip():
+            locator = f"//*[contains(@class,'{attrib['class'].strip()}')]"
         else:
-            locator = None
+            return None
 
-        # Add the element to the JSON structure
-        if locator:
-            self.elements[element_name] = {"xpath": locator}
+        return element_name, {"xpath": locator}
 
-        # Recursively process child elements
-        for child in list(node):
-            self._extract_elements(child)
+    @classmethod
+    def iter_elements(cls, source) -> Iterator[Tuple[str, Dict[str, str]]]:
+        """
+        Stream element records out of a page source without building the full tree.
+
+        Nodes are yielded in document order as the parser reaches them. Only the parse tree is
+        released as it goes: each element is cleared once its subtree is done, and no recursion
+        is involved, so deeply nested trees cannot hit the recursion limit. A str or bytes
+        source is still held in memory, and so are the records the caller keeps.
+
+        :param source: Page source as str or bytes, or a binary file object to read it from.
+        :return: Iterator of (element_name, {"xpath": locator}) records.
+        """
+        parser = ET.XMLPullParser(events=("start", "end"))
+        if isinstance(source, str):
+            source = source.encode("utf-8")
+
+        if isinstance(source, bytes):
+            chunks = (source[i:i + cls.CHUNK_SIZE] for i in range(0, len(source), cls.CHUNK_SIZE))
+        else:
+            chunks = iter(lambda: source.read(cls.CHUNK_SIZE), b"")
+
+        for chunk in chunks:
+            parser.feed(chunk)
+            for event, node in parser.read_events():
+                if event == "start":
+                    record = cls.build_element(node.tag, node.attrib)
+                    if record:
+                        yield record
+                else:
+                    node.clear()
+        parser.close()
+
+    def _extract_elements(self, node):
+        """Extract element locators from an already parsed node and its descendants."""
+        for child in node.iter():
+            record = self.build_element(child.tag, child.attrib)
+            if record:
+                self.elements[record[0]] = record[1]
 
     def save_to_json(self):
         """Save the extracted elements to a JSON file."""
         with open(self.output_file, "w", encoding="utf-8") as file:
             json.dump(self.elements, file, indent=4, ensure_ascii=False)
 
-    def extract(self):
-        """Main method to fetch the page source, parse it, and save results."""
-        self.save_page_source()
-        self.parse_screen_source()
+    def extract(self, save_page_source: bool = True):
+        """
+        Main method to fetch the page source, parse it, and save results.
+
+        The page source is parsed straight from memory; writing it to page_source_file is a
+        side output done in the background while the elements are extracted.
+
+        :param save_page_source: Also save the page source XML to page_source_file.
+        """
+        page_source = self.driver.page_source
+        if self.cache is not None and self._extract_cached(page_source, save_page_source):
+            return
+        pending_write = self.save_page_source(page_source, asynchronous=True) if save_page_source else None
+
+        try:
+            self.elements.update(self.iter_elements(page_source))
+        except ET.ParseError as e:
+            logging.warning(f"Error parsing screen source: {e}")
+        self.save_to_json()
+
+        if pending_write:
+            pending_write.result()  # Surface write errors and leave the file complete on return
+
+    def _extract_cached(self, page_source: str, save_page_source: bool) -> bool:
+        """
+        Extract through the cache. The files are left untouched when the screen is the version
+        they were written for.
+
+        :return: False when the page source cannot be parsed, leaving it to the streaming path.
+        """
+        fresh = not self.elements
+        try:
+            self.last_extraction = self.cache.extract(self.CACHE_KIND, page_source, self.build_element,
+                                                      screen=os.path.abspath(self.output_file))
+        except ET.ParseError as e:
+            logging.warning(f"Error parsing screen source: {e}")
+            return False
+        self.elements.update(record for record in self.last_extraction.records if record)
+        if (fresh and self.last_extraction.unchanged and os.path.exists(self.output_file)
+                and (not save_page_source or os.path.exists(self.page_source_file))):
+            return True
+        if save_page_source:
+            self.save_page_source(page_source)
         self.save_to_json()
+        return True
 
 
 # Example Usage
@@ -0,0 +1,189 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Pool key: (Appium server URL, device udid or None for "whatever the server picks", app path or None)
+SessionKey = Tuple[str, Optional[str], Optional[str]]
+
+
+class PooledSession:
+    def __init__(self, key: SessionKey, driver: Any):
+        """
+        A driver session owned by the pool.
+
+        :param key: The pool key the session was created for.
+        :param driver: The Appium WebDriver instance.
+        """
+        self.key = key
+        self.driver = driver
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.uses = 0
+        self.leased = False
+
+
+class SessionPool:
+    def __init__(self, create_session: Callable[[SessionKey], Any],
+                 reset_session: Optional[Callable[[Any], None]] = None,
+                 health_check: Optional[Callable[[Any], None]] = None,
+                 max_sessions_per_key: int = 1, max_idle_seconds: float = 240,
+                 max_uses: int = 500, lease_timeout: float = 600):
+        """
+        Thread-safe pool of driver sessions keyed by Appium server, device and app.
+
+        Creating a webdriver.Remote session takes 10-30 s, so sessions are leased out, returned
+        after each test and handed to the next lease after a cheap reset instead of being quit.
+
+        :param create_session: Creates a new driver for a key.
+        :param reset_session: Cheap reset run on a reused session before it is leased again.
+        :param health_check: Raises if a reused session is no longer usable; it is then evicted.
+        :param max_sessions_per_key: Concurrent sessions allowed per key (one per device by default).
+        :param max_idle_seconds: Idle sessions older than this are evicted (keep below newCommandTimeout).
+        :param max_uses: Sessions are recycled after this many leases.
+        :param lease_timeout: Seconds to wait for a busy key before giving up.
+        """
+        self.create_session = create_session
+        self.reset_session = reset_session
+        self.health_check = health_check
+        self.max_sessions_per_key = max_sessions_per_key
+        self.max_idle_seconds = max_idle_seconds
+        self.max_uses = max_uses
+        self.lease_timeout = lease_timeout
+        self._sessions: Dict[SessionKey, List[PooledSession]] = {}
+        self._pending: Dict[SessionKey, int] = {}  # Sessions being created, counted against the limit
+        self._condition = threading.Condition()
+
+    def lease(self, key: SessionKey) -> PooledSession:
+        """
+        Lease a session for a key, reusing an idle healthy one when possible.
+
+        :param key: (server URL, udid, app path) to lease a session for.
+        :return: The leased session; give it back with release().
+        """
+        deadline = time.monotonic() + self.lease_timeout
+        while True:
+            with self._condition:
+                session = self._take_idle(key)
+                if session is None:
+                    sessions = self._sessions.setdefault(key, [])
+                    if len(sessions) + self._pending.get(key, 0) < self.max_sessions_per_key:
+                        self._pending[key] = self._pending.get(key, 0) + 1
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise TimeoutError(f"No session available for {key} after {self.lease_timeout}s.")
+                        self._condition.wait(remaining)
+                        continue
+
+            if session is not None:
+                if self._prepare(session):
+                    return session
+                continue  # Evicted; try again
+
+            return self._create(key)
+
+    def _take_idle(self, key: SessionKey) -> Optional[PooledSession]:
+        """Mark and return an idle session for the key (caller holds the lock)."""
+        for session in self._sessions.get(key, []):
+            if not session.leased:
+                session.leased = True
+                return session
+        return None
+
+    def _create(self, key: SessionKey) -> PooledSession:
+        """Create a new session outside the lock and register it as leased."""
+        try:
+            driver = self.create_session(key)
+        except Exception:
+            with self._condition:
+                self._pending[key] -= 1
+                self._condition.notify_all()
+            raise
+
+        session = PooledSession(key, driver)
+        session.leased = True
+        session.uses = 1
+        with self._condition:
+            self._pending[key] -= 1
+            self._sessions[key].append(session)
+        logging.info(f"Created pooled session for {key}")
+        return session
+
+    def _prepare(self, session: PooledSession) -> bool:
+        """Check and reset a reused session; evict it and return False if it is unusable."""
+        idle = time.monotonic() - session.last_used
+        if idle > self.max_idle_seconds or session.uses >= self.max_uses:
+            self.evict(session)
+            return False
+        try:
+            if self.health_check:
+                self.health_check(session.driver)
+            if self.reset_session:
+                self.reset_session(session.driver)
+        except Exception as e:
+            logging.warning(f"Evicting unhealthy session for {session.key}: {e}")
+            self.evict(session)
+            return False
+        session.uses += 1
+        return True
+
+    def release(self, session: PooledSession, healthy: bool = True):
+        """
+        Return a leased session to the pool.
+
+        :param session: The session obtained from lease().
+        :param healthy: Pass False when the test left the session broken; it is then evicted.
+        """
+        if not healthy:
+            self.evict(session)
+            return
+        with self._condition:
+            session.leased = False
+            session.last_used = time.monotonic()
+            self._condition.notify_all()
+
+    def evict(self, session: PooledSession):
+        """Remove a session from the pool and quit it."""
+        with self._condition:
+            sessions = self._sessions.get(session.key, [])
+            if session in sessions:
+                sessions.remove(session)
+            self._condition.notify_all()
+        try:
+            session.driver.quit()
+        except Exception as e:
+            logging.debug(f"Ignoring error while quitting evicted session: {e}")
+
+    def evict_idle(self):
+        """Evict every idle session that exceeded max_idle_seconds."""
+        now = time.monotonic()
+        with self._condition:
+            stale = [session for sessions in self._sessions.values() for session in sessions
+                     if not session.leased and now - session.last_used > self.max_idle_seconds]
+        for session in stale:
+            self.evict(session)
+
+    def close_all(self):
+        """Quit every pooled session."""
+        with self._condition:
+            sessions = [session for sessions in self._sessions.values() for session in sessions]
+        for session in sessions:
+            self.evict(session)
+
+    def stats(self) -> Dict[SessionKey, Dict[str, int]]:
+        """Return the number of leased and idle sessions per key."""
+        with self._condition:
+            return {key: {"leased": sum(s.leased for s in sessions),
+                          "idle": sum(not s.leased for s in sessions)}
+                    for key, sessions in self._sessions.items()}
+
+
+def xdist_worker_index() -> int:
+    """Return the pytest-xdist worker number ('gw3' -> 3), or 0 outside xdist."""
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "gw0")
+    try:
+        return int(worker.lstrip("gw"))
+    except ValueError:
+        return 0
@@ -0,0 +1,162 @@
+import json
+import os
+import statistics
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+class DurationStore:
+    def __init__(self, directory: str = ".shard_durations", smoothing: float = 0.5):
+        """
+        Historical per-test durations, recorded between runs.
+
+        Each process writes its own file in the directory so parallel shards never overwrite
+        each other; loading merges all of them. Every entry carries the time it was recorded, and
+        the newest measurement of a test wins whichever file it is in.
+
+        :param directory: Directory holding the duration files.
+        :param smoothing: Weight of the newest run in the moving average.
+        """
+        self.directory = directory
+        self.smoothing = smoothing
+        self.durations: Dict[str, float] = {}
+        self.recorded_at: Dict[str, float] = {}
+        self._updates: Dict[str, Dict[str, float]] = {}
+
+    def load(self, not_after: Optional[float] = None) -> "DurationStore":
+        """
+        Load every duration file of the directory.
+
+        :param not_after: Ignore measurements recorded after this timestamp, so shards started
+                          together see the same history even if one of them finishes early.
+        """
+        if not os.path.isdir(self.directory):
+            return self
+        for file_name in sorted(os.listdir(self.directory)):
+            if not file_name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, file_name)
+            try:
+                with open(path, "r") as file:
+                    entries = json.load(file)
+                modified = os.path.getmtime(path)
+            except (OSError, json.JSONDecodeError):
+                continue  # A partial file from a crashed run only costs us its estimates
+            for node_id, entry in entries.items():
+                if not isinstance(entry, dict):
+                    entry = {"seconds": entry, "recorded": modified}  # Written before entries were timestamped
+                recorded = entry["recorded"]
+                if (not_after and recorded > not_after) or recorded < self.recorded_at.get(node_id, recorded):
+                    continue
+                self.durations[node_id] = entry["seconds"]
+                self.recorded_at[node_id] = recorded
+        return self
+
+    def estimate(self, node_id: str, default: float) -> float:
+        """Return the expected duration of a test, or the default when it has never run."""
+        return self.durations.get(node_id, default)
+
+    def default_estimate(self) -> float:
+        """Median of the known durations, used for tests without history."""
+        return statistics.median(self.durations.values()) if self.durations else 1.0
+
+    def record(self, node_id: str, seconds: float):
+        """Fold a new measurement into the test's moving average."""
+        previous = self.durations.get(node_id)
+        value = seconds if previous is None else self.smoothing * seconds + (1 - self.smoothing) * previous
+        self.durations[node_id] = value
+        self.recorded_at[node_id] = time.time()
+        self._updates[node_id] = {"seconds": value, "recorded": self.recorded_at[node_id]}
+
+    def save(self, name: str):
+        """Write this process's measurements to '<directory>/<name>.json'."""
+        if not self._updates:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{name}.json")
+        existing = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as file:
+                    existing = json.load(file)
+            except (OSError, json.JSONDecodeError):
+                existing = {}
+        existing.update(self._updates)
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(existing, file, indent=2, sort_keys=True)
+        os.replace(temporary, path)
+
+
+class Shard:
+    def __init__(self, index: int, device: Dict):
+        """
+        Tests assigned to one device.
+
+        :param index: Position of the device in the configured device list.
+        :param device: The device entry ({"udid", "appium_server"}).
+        """
+        self.index = index
+        self.device = device
+        self.groups: List[str] = []
+        self.node_ids: List[str] = []
+        self.expected_seconds = 0.0
+
+
+class ShardScheduler:
+    def __init__(self, devices: List[Dict], durations: DurationStore):
+        """
+        Balance tests across devices by their historical durations.
+
+        Tests are first grouped (tests sharing a page object stay together to avoid app
+        restarts), then groups are assigned longest-first to the least loaded device.
+
+        :param devices: Device entries, one shard per device.
+        :param durations: Historical durations used as weights.
+        """
+        if not devices:
+            raise ValueError("At least one device is needed to shard tests.")
+        self.devices = devices
+        self.durations = durations
+
+    def plan(self, node_ids: Iterable[str], group_of: Callable[[str], str]) -> List[Shard]:
+        """
+        Split the tests into one shard per device.
+
+        :param node_ids: Collected test node ids.
+        :param group_of: Returns the group key of a test (e.g. the page object it drives).
+        :return: Shards in device order.
+        """
+        default = self.durations.default_estimate()
+        groups: Dict[str, List[str]] = {}
+        for node_id in node_ids:
+            groups.setdefault(group_of(node_id), []).append(node_id)
+
+        weights = {group: sum(self.durations.estimate(node_id, default) for node_id in members)
+                   for group, members in groups.items()}
+        shards = [Shard(index, device) for index, device in enumerate(self.devices)]
+        # Longest processing time first; ties broken by name so every process builds the same plan
+        for group in sorted(groups, key=lambda name: (-weights[name], name)):
+            shard = min(shards, key=lambda candidate: (candidate.expected_seconds, candidate.index))
+            shard.groups.append(group)
+            shard.node_ids.extend(groups[group])
+            shard.expected_seconds += weights[group]
+        return shards
+
+    @staticmethod
+    def imbalance(shards: List[Shard]) -> Dict:
+        """
+        Summarize how evenly the plan spreads the work.
+
+        :return: Per-shard expected seconds plus the max/mean ratio (1.0 is perfectly balanced).
+        """
+        loads = [shard.expected_seconds for shard in shards]
+        mean = sum(loads) / len(loads) if loads else 0.0
+        return {
+            "shards": [{"index": shard.index, "udid": shard.device.get("udid"), "tests": len(shard.node_ids),
+                        "groups": len(shard.groups), "expected_seconds": round(shard.expected_seconds, 3)}
+                       for shard in shards],
+            "expected_wall_clock_seconds": round(max(loads, default=0.0), 3),
+            "total_seconds": round(sum(loads), 3),
+            "imbalance_ratio": round(max(loads) / mean, 3) if mean else 1.0,
+        }
@@ -1,11 +1,167 @@
+import csv
+import hashlib
 import json
-from typing import Dict, Any
+import logging
+import os
+import struct
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from Appium_FW.Utils.DependencyTracker import DependencyTracker
+from Appium_FW.Utils.ResourcePaths import ResourceNotFoundError, ResourcePaths
+
+
+class OffsetIndex:
+    """
+    On-disk hash table mapping test names to byte offsets in a JSONL/CSV data file.
+
+    A lookup reads a couple of fixed-size slots with seek(), so finding one case costs the same
+    for a hundred rows as for a million, and only the header is ever held in memory. The header
+    records the data file's size and mtime so a stale index is detected and rebuilt.
+    """
+    MAGIC = b"TDIDX1\0\0"
+    HEADER = struct.Struct("<8sQqQ")  # magic, data file size, data file mtime_ns, slot count
+    SLOT = struct.Struct("<QQ")  # name hash (0 = empty slot), offset + 1
+
+    def __init__(self, index_file: str, data_file: str):
+        """
+        :param index_file: Path of the index.
+        :param data_file: Path of the data file it indexes.
+        """
+        self.index_file = index_file
+        self.data_file = data_file
+
+    @staticmethod
+    def name_hash(name: str) -> int:
+        digest = hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little") or 1
+
+    def _data_signature(self) -> Tuple[int, int]:
+        stat = os.stat(self.data_file)
+        return stat.st_size, stat.st_mtime_ns
+
+    def is_current(self) -> bool:
+        """True if the index exists and was built from the data file as it is now."""
+        try:
+            with open(self.index_file, "rb") as file:
+                magic, size, mtime, _ = self.HEADER.unpack(file.read(self.HEADER.size))
+        except (OSError, struct.error):
+            return False
+        return magic == self.MAGIC and (size, mtime) == self._data_signature()
+
+    def build(self, entries: Iterable[Tuple[str, int]]):
+        """
+        Write the index for (name, offset) entries, replacing any previous one atomically.
+
+        :param entries: Test names and the byte offsets of their records.
+        """
+        signature = self._data_signature()
+        hashed = [(self.name_hash(name), offset) for name, offset in entries]
+        slots = 8
+        while slots < 2 * len(hashed):  # Load factor <= 0.5 keeps probe sequences short
+            slots *= 2
+        table = bytearray(slots * self.SLOT.size)
+        for name_hash, offset in hashed:
+            slot = name_hash & (slots - 1)
+            while self.SLOT.unpack_from(table, slot * self.SLOT.size)[0]:
+                slot = (slot + 1) & (slots - 1)
+            self.SLOT.pack_into(table, slot * self.SLOT.size, name_hash, offset + 1)
+
+        temporary = f"{self.index_file}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(self.HEADER.pack(self.MAGIC, signature[0], signature[1], slots))
+            file.write(table)
+        os.replace(temporary, self.index_file)
+
+    def offsets(self, name: str) -> Iterator[int]:
+        """Offsets of the records whose name hashes like `name` (the caller checks the name)."""
+        name_hash = self.name_hash(name)
+        with open(self.index_file, "rb") as file:
+            _, _, _, slots = self.HEADER.unpack(file.read(self.HEADER.size))
+            slot = name_hash & (slots - 1)
+            for _ in range(slots):
+                file.seek(self.HEADER.size + slot * self.SLOT.size)
+                stored_hash, offset = self.SLOT.unpack(file.read(self.SLOT.size))
+                if not stored_hash:
+                    return
+                if stored_hash == name_hash:
+                    yield offset - 1
+                slot = (slot + 1) & (slots - 1)
 
 
 class TestDataLoader:
-    def __init__(self, data_file: str = 'test_data.json'):
+    __test__ = False  # Not a test class, despite the name
+
+    # Loaders shared by the whole process: (abspath, key_field) -> (mtime_ns, loader)
+    _shared: Dict[Tuple[str, str], Tuple[int, "TestDataLoader"]] = {}
+    _shared_lock = threading.Lock()
+
+    FORMATS = {".json": "json", ".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv"}
+
+    def __init__(self, data_file: str = 'test_data.json', key_field: str = 'name', use_index: bool = True,
+                 test_data: Optional[Dict[str, Any]] = None):
+        """
+        Test data by test name, from a JSON object or from a JSONL/CSV dataset.
+
+        A JSON file maps test names to their data and is loaded at once. JSONL (one object per
+        line) and CSV (header row) files are never loaded whole: cases are streamed with
+        iter_cases() and get_test_data() seeks to a single record through an OffsetIndex kept
+        next to the data file (<data_file>.idx).
+
+        :param data_file: Path to the data file; the format follows the extension. A file not found
+                          from the working directory is looked up in the package's Resources/.
+        :param key_field: JSONL/CSV field holding the test name; it is left out of the returned data.
+        :param use_index: Look records up through the on-disk index instead of scanning the file.
+        :param test_data: Already parsed content of a JSON data file (e.g. from a ResourceBundle).
+        """
+        data_file = ResourcePaths.data_file(data_file)
         self.data_file = data_file
-        self.test_data = self._load_data()
+        self.key_field = key_field
+        self.use_index = use_index
+        self.format = self.FORMATS.get(os.path.splitext(data_file)[1].lower(), "json")
+        self._test_data: Optional[Dict[str, Any]] = None
+        self._index: Optional[OffsetIndex] = None
+        self._memory_offsets: Optional[Dict[str, int]] = None  # Used when the index cannot be written
+        self._header: Optional[List[str]] = None  # CSV column names
+        self._lock = threading.Lock()
+        if self.format == "json":
+            self._test_data = test_data if test_data is not None else self._load_data()
+        elif not os.path.exists(data_file):
+            raise ResourceNotFoundError(f"Test data file '{self.data_file}' not found.")
+
+    @classmethod
+    def shared(cls, data_file: str = 'test_data.json', key_field: str = 'name') -> "TestDataLoader":
+        """
+        Return the process-wide loader of a data file, creating it on first use.
+
+        The loader is rebuilt only when the file changes on disk, so tests can ask for it in
+        every setUp without re-reading the data.
+        """
+        ResourcePaths.install_bundle()
+        key = (os.path.abspath(ResourcePaths.data_file(data_file)), key_field)
+        try:
+            mtime = os.stat(key[0]).st_mtime_ns
+        except FileNotFoundError:
+            raise ResourceNotFoundError(f"Test data file '{data_file}' not found.")
+        cached = cls._shared.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with cls._shared_lock:
+            cached = cls._shared.get(key)
+            if not cached or cached[0] != mtime:
+                cached = cls._shared[key] = (mtime, cls(data_file, key_field))
+            return cached[1]
+
+    @classmethod
+    def preload(cls, data_file: str, mtime: int, test_data: Dict[str, Any], key_field: str = 'name'):
+        """
+        Make the shared loader of a JSON data file from its already parsed content.
+
+        The loader is served only while the file's mtime still matches.
+        """
+        with cls._shared_lock:
+            loader = cls(data_file, key_field, test_data=test_data)
+            cls._shared[(os.path.abspath(data_file), key_field)] = (mtime, loader)
 
     def _load_data(self) -> Dict[str, Any]:
         """Load test data from the JSON file."""
@@ -13,16 +169,111 @@ class TestDataLoader:
             with open(self.data_file, 'r') as file:
                 return json.load(file)
         except FileNotFoundError:
-            raise Exception(f"Test data file '{self.data_file}' not found.")
+            raise ResourceNotFoundError(f"Test data file '{self.data_file}' not found.")
         except json.JSONDecodeError:
             raise Exception(f"Error parsing JSON in the file '{self.data_file}'.")
 
+    @property
+    def test_data(self) -> Dict[str, Any]:
+        """All the test data as a dict; for JSONL/CSV this reads the whole file, prefer iter_cases()."""
+        if self._test_data is None:
+            self._test_data = dict(self.iter_cases())
+        return self._test_data
+
+    def iter_cases(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Lazily yield (test_name, data) in file order."""
+        if self.format == "json":
+            yield from self._test_data.items()
+            return
+        for _, name, data in self._scan():
+            yield name, data
+
+    def iter_names(self) -> Iterator[str]:
+        """Lazily yield the test names in file order."""
+        for name, _ in self.iter_cases():
+            yield name
+
     def get_test_data(self, test_name: str) -> Dict[str, str]:
         """Retrieve test data for the given test name."""
-        if test_name in self.test_data:
-            return self.test_data[test_name]
+        if DependencyTracker.enabled:
+            DependencyTracker.record_test_data(self.data_file, test_name, self.key_field)
+        if self.format == "json" or self._test_data is not None:
+            if test_name in self.test_data:
+                return self.test_data[test_name]
+        else:
+            for offset in self._offsets(test_name):
+                with open(self.data_file, 'rb') as file:
+                    file.seek(offset)
+                    name, data = self._parse(self._read_record(file))
+                if name == test_name:
+                    return data
+        raise KeyError(f"No test data found for test '{test_name}' in '{self.data_file}'.")
+
+    def _offsets(self, test_name: str) -> Iterator[int]:
+        """Candidate offsets of a test's record, from the index, the in-memory fallback or a scan."""
+        if not self.use_index:
+            return (offset for offset, name, _ in self._scan() if name == test_name)
+        with self._lock:
+            if self._memory_offsets is None and (self._index is None or not self._index.is_current()):
+                self._build_index()
+        if self._memory_offsets is not None:
+            offset = self._memory_offsets.get(test_name)
+            return iter([] if offset is None else [offset])
+        return self._index.offsets(test_name)
+
+    def _build_index(self):
+        entries = ((name, offset) for offset, name, _ in self._scan())
+        index = OffsetIndex(f"{self.data_file}.idx", self.data_file)
+        if index.is_current():
+            self._index = index
+            return
+        try:
+            index.build(entries)
+            self._index = index
+        except OSError as e:
+            logging.warning(f"Cannot write index for '{self.data_file}' ({e}); keeping offsets in memory.")
+            self._memory_offsets = {name: offset for offset, name, _ in self._scan()}
+
+    def _scan(self) -> Iterator[Tuple[int, str, Dict[str, Any]]]:
+        """Stream (offset, test_name, data) for every record of a JSONL/CSV file."""
+        with open(self.data_file, 'rb') as file:
+            if self.format == "csv":
+                self._header = self._read_header(file)
+            while True:
+                offset = file.tell()
+                raw = self._read_record(file)
+                if not raw:
+                    return
+                if raw.strip():
+                    name, data = self._parse(raw)
+                    yield offset, name, data
+
+    def _read_record(self, file) -> bytes:
+        """Read one record: a line, or for CSV as many lines as a quoted field spans."""
+        raw = file.readline()
+        if self.format == "csv":
+            while raw.count(b'"') % 2 and raw.endswith(b"\n"):
+                raw += file.readline()
+        return raw
+
+    def _read_header(self, file) -> List[str]:
+        return next(csv.reader([self._read_record(file).decode("utf-8-sig")]))
+
+    def _parse(self, raw: bytes) -> Tuple[str, Dict[str, Any]]:
+        if self.format == "csv":
+            if self._header is None:
+                with open(self.data_file, 'rb') as file:
+                    self._header = self._read_header(file)
+            data = dict(zip(self._header, next(csv.reader([raw.decode("utf-8")]))))
         else:
-            raise KeyError(f"No test data found for test '{test_name}' in '{self.data_file}'.")
+            try:
+                data = json.loads(raw)
+            except json.JSONDecodeError:
+                raise Exception(f"Error parsing JSON in the file '{self.data_file}'.")
+        if self.key_field not in data:
+            raise KeyError(f"Record without '{self.key_field}' in '{self.data_file}'.")
+        name = str(data.pop(self.key_field))
+        return name, data
 
 
 # Usage example
@@ -31,4 +282,4 @@ if __name__ == "__main__":
 
     # Replace 'test_login_valid_user' with the actual test name as needed
     test_data = loader.get_test_data('test_login_valid_user')
-    print(f"Username: {test_data['username']}, Password: {test_data['password']}")
\ No newline at end of file
+    print(f"Username: {test_data['username']}, Password: {test_data['password']}")
@@ -0,0 +1,269 @@
+import asyncio
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Type, TypeVar
+
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
+
+T = TypeVar("T")
+
+# File the shared engine's latency statistics persist to between runs; unset keeps them in memory
+STATS_ENV = "APPIUM_FW_LATENCY_STATS"
+
+
+class LatencyStats:
+    # Recent samples kept per locator to estimate its tail latency
+    MAX_SAMPLES = 50
+
+    def __init__(self, stats_file: Optional[str] = None):
+        """
+        Per-locator time-to-appear statistics, optionally persisted across runs.
+
+        Besides the latencies of successful waits, the longest wait that timed out is kept per
+        locator, so a learned timeout that proved too short is widened.
+
+        :param stats_file: JSON file the statistics are loaded from and saved to; None keeps them in memory.
+        """
+        self.stats_file = stats_file
+        self.samples: Dict[str, List[float]] = {}
+        self.timeouts: Dict[str, float] = {}  # Longest timed-out wait per locator
+        self._updated = set()
+        self._lock = threading.Lock()
+        self._load()
+
+    def _read(self) -> Tuple[Dict[str, List[float]], Dict[str, float]]:
+        with open(self.stats_file, "r") as file:
+            content = json.load(file)
+        if "samples" not in content:  # Files written before timeouts were recorded
+            return content, {}
+        return content["samples"], content.get("timeouts", {})
+
+    def _load(self):
+        if self.stats_file is None:
+            return
+        try:
+            samples, self.timeouts = self._read()
+            self.samples = {key: list(values)[-self.MAX_SAMPLES:] for key, values in samples.items()}
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            logging.warning(f"Ignoring unreadable latency stats '{self.stats_file}': {e}")
+            self.samples, self.timeouts = {}, {}
+
+    def record(self, key: str, seconds: float):
+        """Add a measured time-to-appear for a locator."""
+        with self._lock:
+            samples = self.samples.setdefault(key, [])
+            samples.append(round(seconds, 4))
+            del samples[:-self.MAX_SAMPLES]
+            self._updated.add(key)
+
+    def record_timeout(self, key: str, seconds: float):
+        """Note that waiting `seconds` for a locator was not enough."""
+        with self._lock:
+            self.timeouts[key] = max(self.timeouts.get(key, 0.0), round(seconds, 4))
+            self._updated.add(key)
+
+    def percentile(self, key: str, fraction: float = 0.95) -> Optional[float]:
+        """Return the given percentile of the recorded samples, or None without history."""
+        samples = self.samples.get(key)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def save(self):
+        """Merge this process's samples into the stats file (nothing to do when kept in memory)."""
+        with self._lock:
+            if self.stats_file is None or not self._updated:
+                return
+            samples, timeouts = {}, {}
+            try:
+                samples, timeouts = self._read()
+            except (OSError, ValueError, AttributeError):
+                pass
+            for key in self._updated:
+                if key in self.samples:
+                    samples[key] = self.samples[key]
+                if key in self.timeouts:
+                    timeouts[key] = max(timeouts.get(key, 0.0), self.timeouts[key])
+            directory = os.path.dirname(self.stats_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temporary = f"{self.stats_file}.tmp"
+            with open(temporary, "w") as file:
+                json.dump({"samples": samples, "timeouts": timeouts}, file, indent=2, sort_keys=True)
+            os.replace(temporary, self.stats_file)
+            self._updated.clear()
+
+
+class WaitEngine:
+    _shared: Optional["WaitEngine"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, stats: Optional[LatencyStats] = None, default_timeout: float = 10,
+                 initial_poll: float = 0.005, max_poll: float = 0.25, backoff: float = 1.6,
+                 min_samples: int = 5, safety_factor: float = 3.0, min_timeout: float = 1.0):
+        """
+        Polling waits with exponential backoff and timeouts learned from past runs.
+
+        Polling starts in the low milliseconds and backs off, so a condition that is already
+        true costs one check instead of up to a fixed 0.5 s poll.
+
+        :param stats: Latency history used to learn timeouts; None disables learning.
+        :param default_timeout: Timeout used when none is given and nothing has been learned yet.
+        :param initial_poll: First sleep between checks, in seconds.
+        :param max_poll: Upper bound of the sleep between checks.
+        :param backoff: Factor applied to the sleep after every failed check.
+        :param min_samples: Samples needed before a learned timeout is used.
+        :param safety_factor: Learned timeout = p95 latency * safety_factor (at least min_timeout); a
+                              locator whose wait timed out learns at least that wait * safety_factor.
+        :param min_timeout: Lower bound of learned timeouts.
+        """
+        self.stats = stats
+        self.default_timeout = default_timeout
+        self.initial_poll = initial_poll
+        self.max_poll = max_poll
+        self.backoff = backoff
+        self.min_samples = min_samples
+        self.safety_factor = safety_factor
+        self.min_timeout = min_timeout
+
+    @classmethod
+    def shared(cls) -> "WaitEngine":
+        """
+        Process-wide engine. It learns in memory, and persists what it learned when the interpreter
+        exits only if APPIUM_FW_LATENCY_STATS (or configure()) names a stats file.
+        """
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._install(cls(stats=LatencyStats(os.environ.get(STATS_ENV))))
+        return cls._shared
+
+    @classmethod
+    def configure(cls, stats_file: Optional[str] = None, **kwargs) -> "WaitEngine":
+        """Replace the shared engine, e.g. with one persisting its stats under an artifacts directory."""
+        with cls._shared_lock:
+            previous = cls._shared
+            cls._install(cls(stats=LatencyStats(stats_file), **kwargs))
+        if previous is not None and previous.stats is not None:
+            previous.stats.save()
+        return cls._shared
+
+    @classmethod
+    def _install(cls, engine: "WaitEngine"):
+        cls._shared = engine
+        atexit.register(engine.stats.save)
+
+    def timeout_for(self, key: Optional[str]) -> float:
+        """Return the learned timeout for a key, or the default timeout without enough history."""
+        if not self.stats or key is None or len(self.stats.samples.get(key, ())) < self.min_samples:
+            return self.default_timeout
+        learned = max(self.stats.percentile(key), self.stats.timeouts.get(key, 0.0)) * self.safety_factor
+        return min(self.default_timeout, max(self.min_timeout, learned))
+
+    def _timed_out(self, key: Optional[str], timeout: float):
+        """Widen the timeout learned for a key whose learned (or default) wait was not enough."""
+        if self.stats and key is not None:
+            self.stats.record_timeout(key, timeout)
+
+    def until(self, condition: Callable[[], T], key: Optional[str] = None, timeout: Optional[float] = None,
+              message: str = "",
+              ignored_exceptions: Tuple[Type[Exception], ...] = (NoSuchElementException,
+                                                                  StaleElementReferenceException)) -> T:
+        """
+        Call the condition until it returns a truthy value.
+
+        :param condition: Check to poll; exceptions in ignored_exceptions count as "not yet".
+        :param key: Statistics key (e.g. the locator name); its latency is recorded on success, and
+                    a timeout it learned that proves too short is recorded too.
+        :param timeout: Seconds to wait; None uses the learned or default timeout. A learned timeout
+                        that runs out is recorded, then the wait goes on up to the default timeout
+                        before failing, so a slow outlier costs time instead of a failed test.
+        :param message: Message of the TimeoutException.
+        :param ignored_exceptions: Exceptions meaning the condition is not met yet.
+        :return: The condition's result.
+        """
+        learned = timeout is None
+        if learned:
+            timeout = self.timeout_for(key)
+        start = time.monotonic()
+        deadline = start + timeout
+        poll = self.initial_poll
+        while True:
+            try:
+                result = condition()
+                if result:
+                    if self.stats and key is not None:
+                        self.stats.record(key, time.monotonic() - start)
+                    return result
+            except ignored_exceptions:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                if learned:
+                    self._timed_out(key, timeout)
+                    if timeout < self.default_timeout:  # Only the learned timeout ran out: allow the default
+                        learned, timeout, deadline = False, self.default_timeout, start + self.default_timeout
+                        continue
+                raise TimeoutException(message or f"Condition not met after {timeout:.2f}s")
+            time.sleep(min(poll, remaining))
+            poll = min(poll * self.backoff, self.max_poll)
+
+    async def until_async(self, condition: Callable[[], Awaitable[T]], key: Optional[str] = None,
+                          timeout: Optional[float] = None, message: str = "",
+                          ignored_exceptions: Tuple[Type[Exception], ...] = (NoSuchElementException,
+                                                                              StaleElementReferenceException)) -> T:
+        """
+        Coroutine counterpart of until(): same backoff, learned timeouts and statistics, but the
+        polling sleeps yield to the event loop so other sessions keep running.
+
+        :param condition: Coroutine function to poll.
+        """
+        learned = timeout is None
+        if learned:
+            timeout = self.timeout_for(key)
+        start = time.monotonic()
+        deadline = start + timeout
+        poll = self.initial_poll
+        while True:
+            try:
+                result = await condition()
+                if result:
+                    if self.stats and key is not None:
+                        self.stats.record(key, time.monotonic() - start)
+                    return result
+            except ignored_exceptions:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                if learned:
+                    self._timed_out(key, timeout)
+                    if timeout < self.default_timeout:  # Only the learned timeout ran out: allow the default
+                        learned, timeout, deadline = False, self.default_timeout, start + self.default_timeout
+                        continue
+                raise TimeoutException(message or f"Condition not met after {timeout:.2f}s")
+            await asyncio.sleep(min(poll, remaining))
+            poll = min(poll * self.backoff, self.max_poll)
+
+    def until_not(self, condition: Callable[[], object], timeout: float = 0) -> bool:
+        """
+        Fast negative check: return True as soon as the condition is falsy.
+
+        With the default timeout of 0 this is a single check, so an expected-absent element
+        costs one round trip instead of a full timeout.
+
+        :param condition: Check that is truthy while the thing is still there.
+        :param timeout: How long it may take to go away.
+        :return: True if the condition became falsy in time, False otherwise.
+        """
+        try:
+            self.until(lambda: not condition(), timeout=timeout, ignored_exceptions=())
+            return True
+        except TimeoutException:
+            return False
@@ -0,0 +1,56 @@
+import argparse
+import contextlib
+import tempfile
+from typing import Callable, Dict
+
+from Appium_FW.Utils.AppCrawler import AppCrawler
+from Appium_FW.testing.FakeAppiumServer import FakeAppiumServer, ScreenGraph
+from Appium_FW.testing.SampleApps import SHOP_PACKAGE, build_screen_graph, start_driver
+
+
+def crawl_session(server: FakeAppiumServer, reuse_transitions: bool, output_dir: str) -> Dict:
+    """Crawl the server's screen graph from a new session, which starts on the graph's start screen."""
+    driver = start_driver(server, app_package=SHOP_PACKAGE)
+    try:
+        return AppCrawler(driver, output_dir, max_states=2 * len(server.graph.screens), settle_ms=0,
+                          reuse_transitions=reuse_transitions).crawl()
+    finally:
+        driver.quit()
+
+
+def crawl(graph: ScreenGraph, latency: float, reuse_transitions: bool, output_dir: str) -> Dict:
+    with FakeAppiumServer(latency=latency, graph=graph) as server:
+        return crawl_session(server, reuse_transitions, output_dir)
+
+
+def suite_benchmarks(stack: contextlib.ExitStack, page_source: str, latency: float) -> Dict[str, Callable[[], object]]:
+    """A full crawl of a small shop app in both modes, for run_benchmarks."""
+    server = stack.enter_context(FakeAppiumServer(latency=latency, graph=build_screen_graph(sections=2, items=3)))
+    output_dir = stack.enter_context(tempfile.TemporaryDirectory(prefix="appium-fw-crawl-"))
+    return {
+        "app_crawler_tap_all": lambda: crawl_session(server, False, output_dir),
+        "app_crawler_reuse_transitions": lambda: crawl_session(server, True, output_dir),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure crawl throughput against a simulated screen graph.")
+    parser.add_argument("--sections", type=int, default=4)
+    parser.add_argument("--items", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.02, help="Injected seconds per command.")
+    args = parser.parse_args()
+
+    graph = build_screen_graph(args.sections, args.items)
+    print(f"Screen graph: {len(graph.screens)} screens, {args.latency * 1000:.0f} ms per command")
+    for reuse_transitions in (False, True):
+        with tempfile.TemporaryDirectory(prefix="appium-fw-crawl-") as output_dir:
+            result = crawl(graph, args.latency, reuse_transitions, output_dir)
+        label = "reuse_transitions" if reuse_transitions else "default (tap all)"
+        print(f"{label:20s} {result['states']} states in {result['seconds']:.2f}s = "
+              f"{result['states_per_minute']:.0f} states/min ({result['taps']} taps, {result['pulls']} pulls, "
+              f"{result['backs']} backs, {result['restarts']} restarts, {result['pruned']} pruned, "
+              f"{result['reused']} reused)")
+
+
+if __name__ == "__main__":
+    main()
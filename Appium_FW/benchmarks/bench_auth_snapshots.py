@@ -0,0 +1,107 @@
+import argparse
+import contextlib
+import tempfile
+import time
+from typing import Callable, Dict, Optional
+
+from Appium_FW.Utils.AuthSnapshots import AuthSnapshots
+from Appium_FW.Utils.WaitEngine import WaitEngine
+from Appium_FW.pages.LoginPage.login_page import LoginPage
+from Appium_FW.testing.FakeAppiumServer import FakeAppiumServer
+from Appium_FW.testing.SampleApps import LOGIN_DEEP_LINK, LOGIN_PACKAGE, login_app, start_driver
+
+
+def setup_per_test(latency: float, tests: int, snapshots: Optional[AuthSnapshots], new_session: bool) -> Dict:
+    """
+    Average setup of a test needing a logged-in user.
+
+    :param snapshots: None for a UI login in every test (the app data is cleared between tests).
+    :param new_session: Every test gets a new session, as after a pool eviction or on another worker.
+    """
+    with FakeAppiumServer(latency=latency, graph=login_app()) as server:
+        driver = start_driver(server)
+        times, calls = [], []
+        try:
+            for _ in range(tests):
+                if new_session:
+                    driver.quit()
+                    driver = start_driver(server)
+                elif snapshots is None:
+                    driver.execute_script("mobile: clearApp", {"appId": LOGIN_PACKAGE})
+                    driver.activate_app(LOGIN_PACKAGE)
+                else:
+                    driver.terminate_app(LOGIN_PACKAGE)  # The pool's reset between tests
+                    driver.activate_app(LOGIN_PACKAGE)
+                page = LoginPage(driver)
+                page.actions.waits = WaitEngine()
+                before = sum(server.command_counts.values())
+                start = time.perf_counter()
+                if snapshots is None:
+                    page.login("validUser", "validPassword123")
+                    assert page.is_logged_in()
+                else:
+                    page.ensure_logged_in("validUser", "validPassword123", snapshots)
+                times.append(time.perf_counter() - start)
+                calls.append(sum(server.command_counts.values()) - before)
+        finally:
+            driver.quit()
+    # The first test logs in through the UI either way; report the steady state after it
+    steady = times[1:] or times
+    return {"ms_per_test": 1000 * sum(steady) / len(steady),
+            "calls_per_test": sum(calls[1:]) / max(1, len(calls) - 1), "first_ms": 1000 * times[0]}
+
+
+def suite_benchmarks(stack: contextlib.ExitStack, page_source: str, latency: float) -> Dict[str, Callable[[], object]]:
+    """
+    Setup of a test needing a logged-in user, through the login form and by reusing the session,
+    for run_benchmarks. Each gets its own session of the login app.
+    """
+    def login_page() -> LoginPage:
+        server = stack.enter_context(FakeAppiumServer(latency=latency, graph=login_app()))
+        driver = start_driver(server)
+        stack.callback(driver.quit)
+        page = LoginPage(driver)
+        page.actions.waits = WaitEngine()
+        return page
+
+    ui_page, session_page = login_page(), login_page()
+    snapshots = AuthSnapshots(stack.enter_context(tempfile.TemporaryDirectory(prefix="appium-fw-auth-")),
+                              strategies=("session",))
+    session_page.ensure_logged_in("validUser", "validPassword123", snapshots)  # The UI login of the first test
+
+    def ui_login():
+        ui_page.driver.execute_script("mobile: clearApp", {"appId": LOGIN_PACKAGE})
+        ui_page.driver.activate_app(LOGIN_PACKAGE)
+        ui_page.login("validUser", "validPassword123")
+        assert ui_page.is_logged_in()
+
+    def session_reuse():
+        session_page.driver.terminate_app(LOGIN_PACKAGE)  # The pool's reset between tests
+        session_page.driver.activate_app(LOGIN_PACKAGE)
+        session_page.ensure_logged_in("validUser", "validPassword123", snapshots)
+
+    return {"auth_ui_login": ui_login, "auth_session_reuse": session_reuse}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare login setup per test with and without auth snapshots.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Injected seconds per command.")
+    parser.add_argument("--tests", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="appium-fw-auth-") as directory:
+        scenarios = {
+            "UI login every test": (None, False),
+            "session reuse": (AuthSnapshots(directory, strategies=("session",)), False),
+            "deep link": (AuthSnapshots(directory, strategies=("deep_link",), deep_link=LOGIN_DEEP_LINK), True),
+            "app data restore": (AuthSnapshots(directory, strategies=("app_data",)), True),
+        }
+        print(f"{args.tests} tests, {args.latency * 1000:.0f} ms per command")
+        for label, (snapshots, new_session) in scenarios.items():
+            result = setup_per_test(args.latency, args.tests, snapshots, new_session)
+            print(f"{label:22s} {result['ms_per_test']:7.1f} ms/test ({result['calls_per_test']:.1f} device calls), "
+                  f"first test {result['first_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import argparse
+import contextlib
+import os
+import time
+from typing import Callable, Dict
+
+from Appium_FW.Utils.ElementXpathExtractorBounds import ElementXpathExtractor
+from Appium_FW.testing.FakeAppiumServer import FakeAppiumServer
+from Appium_FW.testing.SampleApps import start_driver
+
+DEFAULT_SOURCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "Utils", "screen_source.xml")
+
+
+def run_mode(page_source: str, latency: float, use_page_source: bool):
+    """Run one extraction and return (elements, round trips, elapsed seconds)."""
+    with FakeAppiumServer(latency=latency, page_source=page_source) as server:
+        driver = start_driver(server)
+        try:
+            server.command_counts.clear()
+            extractor = ElementXpathExtractor(driver, use_page_source=use_page_source)
+            start = time.perf_counter()
+            elements = extractor.extract_elements_xpaths()
+            return elements, sum(server.command_counts.values()), time.perf_counter() - start
+        finally:
+            driver.quit()
+
+
+def suite_benchmarks(stack: contextlib.ExitStack, page_source: str, latency: float) -> Dict[str, Callable[[], object]]:
+    """Both extraction modes, for run_benchmarks; the session is closed with the stack."""
+    server = stack.enter_context(FakeAppiumServer(latency=latency, page_source=page_source))
+    driver = start_driver(server)
+    stack.callback(driver.quit)
+    return {
+        "element_xpath_extractor_per_element": lambda: ElementXpathExtractor(driver).extract_elements_xpaths(),
+        "element_xpath_extractor_page_source": lambda: ElementXpathExtractor(
+            driver, use_page_source=True).extract_elements_xpaths(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ElementXpathExtractor per-element and page source modes.")
+    parser.add_argument("--source", default=DEFAULT_SOURCE, help="Recorded hierarchy XML.")
+    parser.add_argument("--latency", type=float, default=0.005, help="Injected seconds per command.")
+    args = parser.parse_args()
+
+    with open(args.source, "r", encoding="utf-8") as file:
+        page_source = file.read()
+    per_element, per_element_calls, per_element_time = run_mode(page_source, args.latency, use_page_source=False)
+    by_source, page_source_calls, page_source_time = run_mode(page_source, args.latency, use_page_source=True)
+
+    if per_element != by_source:
+        raise SystemExit("Page source mode output differs from the per-element output.")
+
+    print(f"Elements extracted: {len(by_source)} (outputs identical)")
+    print(f"Per-element mode: {per_element_calls} round trips, {per_element_time:.3f}s")
+    print(f"Page source mode: {page_source_calls} round trips, {page_source_time:.3f}s")
+    print(f"Speedup: {per_element_time / max(page_source_time, 1e-9):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
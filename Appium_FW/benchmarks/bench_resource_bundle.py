@@ -0,0 +1,100 @@
+import argparse
+import contextlib
+import json
+import os
+import tempfile
+import time
+from typing import Callable, Dict
+
+from Appium_FW.Utils.LocatorLoader import LocatorRegistry
+from Appium_FW.Utils.ResourceBundle import ResourceBundle
+from Appium_FW.Utils.ResourcePaths import ResourcePaths
+
+
+def write_pages(directory: str, pages: int, locators: int) -> Dict[str, str]:
+    """Locator files of synthetic pages, each with a mix of id, accessibility id and xpath locators."""
+    files = {}
+    types = ["id", "accessibility_id", "xpath"]
+    for page in range(pages):
+        entries = {
+            f"element_{index}": {
+                "android_locator": {"type": types[index % 3], "value": f"com.example:id/page_{page}_{index}"},
+                "ios_locator": {"type": types[(index + 1) % 3], "value": f"page_{page}_{index}"},
+            } for index in range(locators)}
+        path = os.path.join(directory, f"page_{page}_locators.json")
+        with open(path, "w") as file:
+            json.dump(entries, file)
+        files[f"page_{page}"] = path
+    return files
+
+
+def load_all(files: Dict[str, str]):
+    """First lookup of each page, as the first LocatorLoader of every page does."""
+    for path in files.values():
+        LocatorRegistry.compiled(path, "android")
+
+
+def measure(pages: int, locators: int, used: int) -> Dict[str, float]:
+    """Time to a loader for `used` pages of a suite of `pages`, from JSON and from a bundle."""
+    with tempfile.TemporaryDirectory(prefix="appium-fw-bundle-") as directory:
+        files = write_pages(directory, pages, locators)
+        used_files = dict(list(files.items())[:used])
+        bundle_path = os.path.join(directory, "resources.bundle")
+        ResourceBundle.build(bundle_path, locator_files=files)
+
+        LocatorRegistry.clear()
+        ResourcePaths._bundle_checked = True  # Measure plain JSON parsing
+        start = time.perf_counter()
+        load_all(used_files)
+        parsed = time.perf_counter() - start
+
+        LocatorRegistry.clear()
+        ResourcePaths._bundle_checked = True
+        start = time.perf_counter()
+        ResourceBundle.load(bundle_path).install()
+        load_all(used_files)
+        bundled = time.perf_counter() - start
+        LocatorRegistry.clear()
+        ResourcePaths.clear()
+    return {"parsed_ms": parsed * 1000, "bundled_ms": bundled * 1000}
+
+
+def suite_benchmarks(stack: contextlib.ExitStack, page_source: str, latency: float) -> Dict[str, Callable[[], object]]:
+    """First lookups of 10 pages out of 200, from JSON and from a bundle, for run_benchmarks."""
+    directory = stack.enter_context(tempfile.TemporaryDirectory(prefix="appium-fw-bundle-"))
+    files = write_pages(directory, pages=200, locators=40)
+    used_files = dict(list(files.items())[:10])
+    bundle_path = ResourceBundle.build(os.path.join(directory, "resources.bundle"), locator_files=files)
+    ResourcePaths._bundle_checked = True  # Only the bundle installed by the benchmark
+
+    def parsed():
+        LocatorRegistry.clear()
+        load_all(used_files)
+
+    def bundled():
+        LocatorRegistry.clear()
+        ResourceBundle.load(bundle_path).install()
+        load_all(used_files)
+
+    def cleanup():  # The bundle replaced the page index
+        LocatorRegistry.clear()
+        ResourcePaths.clear()
+
+    stack.callback(cleanup)
+    return {"locator_files_parsed_10_of_200": parsed, "resource_bundle_10_of_200": bundled}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare loading every page's locators from JSON and from a bundle.")
+    parser.add_argument("--locators", type=int, default=40, help="Locators per page.")
+    parser.add_argument("--used", type=int, default=10, help="Pages a test run actually uses.")
+    args = parser.parse_args()
+    for pages in (50, 200, 800):
+        for used in (args.used, pages):
+            result = measure(pages, args.locators, used)
+            print(f"{pages:4d} pages, {used:4d} used: JSON {result['parsed_ms']:7.1f} ms, "
+                  f"bundle {result['bundled_ms']:7.1f} ms ({result['parsed_ms'] / result['bundled_ms']:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
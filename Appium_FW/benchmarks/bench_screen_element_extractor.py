@@ -0,0 +1,59 @@
+import argparse
+import contextlib
+import os
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from typing import Callable, Dict
+
+from Appium_FW.Utils.ScreenElementExtractor import ScreenElementExtractor
+
+DEFAULT_SOURCE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "Utils", "screen_source.xml")
+
+
+def scale_page_source(page_source: str, factor: int) -> bytes:
+    """Return a hierarchy holding `factor` copies of the recorded screen's content."""
+    root = ET.fromstring(page_source)
+    children = list(root)
+    for _ in range(factor - 1):
+        root.extend(children)
+    return ET.tostring(root, encoding="utf-8")
+
+
+def measure(source: bytes):
+    """Stream the source once and return (records, elapsed seconds, peak traced bytes)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    records = sum(1 for _ in ScreenElementExtractor.iter_elements(source))
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return records, elapsed, peak
+
+
+def suite_benchmarks(stack: contextlib.ExitStack, page_source: str, latency: float) -> Dict[str, Callable[[], object]]:
+    """Streaming a hierarchy ten times the recorded screen, for run_benchmarks (no device involved)."""
+    source = scale_page_source(page_source, 10)
+    return {"screen_element_extractor_stream_x10": lambda: sum(1 for _ in ScreenElementExtractor.iter_elements(source))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure ScreenElementExtractor streaming cost as the hierarchy grows.")
+    parser.add_argument("--source", default=DEFAULT_SOURCE, help="Recorded hierarchy XML.")
+    parser.add_argument("--factors", type=int, nargs="+", default=[1, 10, 100], help="Size multipliers to run.")
+    args = parser.parse_args()
+
+    with open(args.source, "r", encoding="utf-8") as file:
+        page_source = file.read()
+
+    print(f"{'factor':>6} {'bytes':>10} {'records':>8} {'time(ms)':>9} {'us/record':>9} {'peak(KiB)':>10}")
+    for factor in args.factors:
+        source = scale_page_source(page_source, factor)
+        records, elapsed, peak = measure(source)
+        print(f"{factor:>6} {len(source):>10} {records:>8} {elapsed * 1000:>9.1f} "
+              f"{elapsed * 1e6 / max(records, 1):>9.2f} {peak / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Offline benchmark suite: measures the framework's own overhead against a local FakeAppiumServer
+replaying a recorded hierarchy, and fails when results regress against stored baselines.
+
+    python -m Appium_FW.benchmarks.run_benchmarks                     # run and compare
+    python -m Appium_FW.benchmarks.run_benchmarks --update-baselines  # store new baselines
+
+The standalone bench_*.py scripts contribute their measurements to the suite through their
+suite_benchmarks() function.
+
+Baselines are machine specific. The committed baselines.json was recorded on a development
+machine with the default options and is only a local reference. CI records its own baselines on
+the runner (kept between runs, e.g. in the CI cache) and compares against those:
+
+    export APPIUM_FW_BENCH_BASELINES=$CI_CACHE/bench_baselines.json
+    python -m Appium_FW.benchmarks.run_benchmarks --update-baselines   # on the main branch
+    python -m Appium_FW.benchmarks.run_benchmarks --require-baselines  # on changes: a missing baseline fails too
+
+--require-baselines refuses to compare against the committed file.
+"""
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from Appium_FW.Utils.AppiumActions import AppiumActions
+from Appium_FW.Utils.DriverManager import DriverManager
+from Appium_FW.Utils.LocatorLoader import LocatorLoader, LocatorRegistry
+from Appium_FW.Utils.ScreenElementExtractor import ScreenElementExtractor
+from Appium_FW.Utils.WaitEngine import WaitEngine
+from Appium_FW.benchmarks import (bench_app_crawler, bench_auth_snapshots, bench_element_xpath_extractor,
+                                  bench_resource_bundle, bench_screen_element_extractor)
+from Appium_FW.testing.FakeAppiumServer import FakeAppiumServer
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SOURCE = os.path.join(PACKAGE_DIR, "Utils", "screen_source.xml")
+DEFAULT_BASELINES = os.path.join(PACKAGE_DIR, "benchmarks", "baselines.json")
+BASELINES_ENV = "APPIUM_FW_BENCH_BASELINES"
+
+# Standalone benchmarks run by the suite; the resource bundle goes last as it replaces the page index
+SUITE_MODULES = (bench_element_xpath_extractor, bench_screen_element_extractor, bench_app_crawler,
+                 bench_auth_snapshots, bench_resource_bundle)
+
+# Locators resolving on the recorded screen, used by the action benchmarks
+BENCH_LOCATORS = {
+    "menu_button": {"android_locator": {"type": "accessibility_id", "value": "test-Menu"}},
+    "item_title": {"android_locator": {"type": "xpath",
+                                       "value": "//android.widget.TextView[@content-desc='test-Item title']"}},
+    "cart_button": {"android_locator": {"type": "xpath", "value": "//android.view.ViewGroup[@content-desc='test-Cart']"}},
+}
+
+
+def measure(operation: Callable[[], object], duration: float, min_iterations: int = 5) -> Dict[str, float]:
+    """
+    Run an operation repeatedly for about `duration` seconds.
+
+    :return: ops/sec and latency percentiles in milliseconds.
+    """
+    latencies: List[float] = []
+    deadline = time.perf_counter() + duration
+    while len(latencies) < min_iterations or time.perf_counter() < deadline:
+        start = time.perf_counter()
+        operation()
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        "iterations": len(latencies),
+        "ops_per_sec": round(len(latencies) / sum(latencies), 2),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] * 1000, 3),
+    }
+
+
+def prepare_workdir(workdir: str, server_url: str):
+    """Write the config and locator files the framework reads from the working directory."""
+    with open(os.path.join(PACKAGE_DIR, "Utils", "config.json"), "r") as file:
+        config = json.load(file)
+    config["appium_server"] = server_url
+    config["devices"] = []
+    with open(os.path.join(workdir, "config.json"), "w") as file:
+        json.dump(config, file)
+    with open(os.path.join(workdir, "bench_locators.json"), "w") as file:
+        json.dump(BENCH_LOCATORS, file)
+    shutil.copy(os.path.join(PACKAGE_DIR, "pages", "LoginPage", "login_locators.json"), workdir)
+
+
+def run_suite(page_source: str, latency: float, duration: float, only: List[str]) -> Dict[str, Dict[str, float]]:
+    results = {}
+    workdir = tempfile.mkdtemp(prefix="appium-fw-bench-")
+    previous_cwd = os.getcwd()
+    with FakeAppiumServer(latency=latency, page_source=page_source) as server, contextlib.ExitStack() as stack:
+        try:
+            os.chdir(workdir)
+            prepare_workdir(workdir, server.url)
+            DriverManager._config = {}
+            DriverManager.load_config()
+            LocatorRegistry.clear()
+
+            def pooled_init():
+                DriverManager.init_driver()
+                DriverManager.quit_driver()
+
+            def cold_init():
+                DriverManager.init_driver()
+                DriverManager.quit_driver(healthy=False)  # Forces a brand new session next time
+
+            driver = DriverManager.init_driver()
+            actions = AppiumActions(driver, LocatorLoader(page="bench"), wait_engine=WaitEngine())
+            snapshot_actions = AppiumActions(driver, LocatorLoader(page="bench"), use_snapshot=True,
+                                             wait_engine=WaitEngine())
+
+            benchmarks = {
+                "locator_loader_construction": lambda: LocatorLoader(page="login"),
+                "driver_manager_init_cold": cold_init,
+                "driver_manager_init_pooled": pooled_init,
+                "actions_find_element_accessibility_id": lambda: actions.find_element("menu_button"),
+                "actions_find_element_xpath": lambda: actions.find_element("item_title"),
+                "actions_click": lambda: actions.click("cart_button"),
+                "actions_input_text": lambda: actions.input_text("item_title", "benchmark"),
+                "actions_get_text": lambda: actions.get_text("item_title"),
+                "actions_get_texts_snapshot": lambda: (snapshot_actions.invalidate_snapshot(),
+                                                       snapshot_actions.get_texts(["menu_button", "item_title",
+                                                                                   "cart_button"])),
+                "screen_element_extractor": lambda: ScreenElementExtractor(
+                    driver, output_file=os.path.join(workdir, "elements.json")).extract(save_page_source=False),
+            }
+            for module in SUITE_MODULES:
+                benchmarks.update(module.suite_benchmarks(stack, page_source, latency))
+            for name, operation in benchmarks.items():
+                if only and name not in only:
+                    continue
+                # Pool benchmarks need the bench session returned first
+                if name.startswith("driver_manager"):
+                    DriverManager.quit_driver()
+                results[name] = measure(operation, duration)
+                if name.startswith("driver_manager"):
+                    driver = DriverManager.init_driver()
+                    actions.driver = snapshot_actions.driver = driver
+                print(f"{name:45s} {results[name]['ops_per_sec']:>10.1f} ops/s  "
+                      f"p50 {results[name]['p50_ms']:>8.2f} ms  p95 {results[name]['p95_ms']:>8.2f} ms")
+        finally:
+            DriverManager.shutdown()
+            os.chdir(previous_cwd)
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baselines: Dict[str, Dict[str, float]],
+            tolerance: float) -> List[str]:
+    """Return a message per benchmark whose throughput dropped more than `tolerance` below its baseline."""
+    regressions = []
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        if not baseline:
+            continue
+        floor = baseline["ops_per_sec"] * (1 - tolerance)
+        if result["ops_per_sec"] < floor:
+            regressions.append(f"{name}: {result['ops_per_sec']:.1f} ops/s < {floor:.1f} "
+                               f"(baseline {baseline['ops_per_sec']:.1f}, tolerance {tolerance:.0%})")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the framework against a local fake Appium server.")
+    parser.add_argument("--source", default=DEFAULT_SOURCE, help="Recorded hierarchy XML served by the fake server.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Injected seconds per command.")
+    parser.add_argument("--duration", type=float, default=1.0, help="Seconds spent on each benchmark.")
+    parser.add_argument("--baselines", default=os.environ.get(BASELINES_ENV, DEFAULT_BASELINES),
+                        help=f"Baseline results JSON (${BASELINES_ENV}, else the committed baselines.json).")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed throughput drop before failing.")
+    parser.add_argument("--update-baselines", action="store_true", help="Store these results as the new baselines.")
+    parser.add_argument("--require-baselines", action="store_true",
+                        help="Fail when a benchmark has no baseline (for CI), instead of only reporting it. "
+                             "The baselines must have been recorded on this machine, not the committed ones.")
+    parser.add_argument("--output", default=None, help="Also write the results to this JSON file.")
+    parser.add_argument("--only", nargs="*", default=[], help="Run only these benchmarks.")
+    args = parser.parse_args(argv)
+    if args.require_baselines and os.path.abspath(args.baselines) == DEFAULT_BASELINES:
+        parser.error(f"--require-baselines compares against baselines recorded on this machine: set "
+                     f"${BASELINES_ENV} or pass --baselines (record them with --update-baselines first)")
+
+    with open(args.source, "r", encoding="utf-8") as file:
+        page_source = file.read()
+    results = run_suite(page_source, args.latency, args.duration, args.only)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    baselines = {}
+    if os.path.exists(args.baselines):
+        with open(args.baselines, "r") as file:
+            baselines = json.load(file)
+
+    if args.update_baselines:
+        baselines.update(results)
+        with open(args.baselines, "w") as file:
+            json.dump(baselines, file, indent=2, sort_keys=True)
+        print(f"Baselines written to {args.baselines}")
+        return 0
+
+    missing = [name for name in results if name not in baselines]
+    if missing:
+        print(f"{'MISSING BASELINE' if args.require_baselines else 'No baseline yet'} for: {', '.join(missing)} "
+              f"(run with --update-baselines)")
+    regressions = compare(results, baselines, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions or (missing and args.require_baselines) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,21 +1,75 @@
+from selenium.common.exceptions import TimeoutException
+
 from Appium_FW.Utils.LocatorLoader import LocatorLoader
 from Appium_FW.Utils.AppiumActions import AppiumActions
+from Appium_FW.Utils.DriverManager import DriverManager
 
 
 class LoginPage:
-    def __init__(self, driver):
+    def __init__(self, driver, actions=None):
+        """
+        :param driver: Appium WebDriver instance (may be None when actions are given).
+        :param actions: Actions backend to use instead of AppiumActions, e.g. a SyncActionsAdapter
+                        over AsyncAppiumActions; it must use the login locators.
+        """
         self.driver = driver
         self.locator_loader = LocatorLoader(page='login') # Initialize LocatorLoader
-        self.actions = AppiumActions(driver, self.locator_loader)  # Initialize AppiumActions with LocatorLoader
+        # Initialize AppiumActions with LocatorLoader, unless another backend was given
+        self.actions = actions or AppiumActions(driver, self.locator_loader)
+
+    def login(self, username: str, password: str, wait_until_stable: bool = False, batched: bool = False):
+        """
+        Performs the login action using provided username and password.
+
+        :param wait_until_stable: Return only once the screen shown after login has settled.
+        :param batched: Run the steps as an ActionBatch (fewer round trips; the fields are set with
+                        mobile: replaceElementValue on Android instead of being typed into).
+        """
+
+        if batched:
+            self.actions.batch("login").fill("username_field", username) \
+                .fill("password_field", password).tap("login_button").run()
+        else:
+            # Enter username
+            self.actions.input_text("username_field", username)
+
+            # Enter password
+            self.actions.input_text("password_field", password)
+
+            # Click login button
+            self.actions.click("login_button")
+
+        if wait_until_stable:
+            self.actions.wait_until_stable()
+
+    def is_logged_in(self, timeout: float = 5) -> bool:
+        """
+        True once the home screen shows, False once the login form does.
 
-    def login(self, username: str, password: str):
-        """Performs the login action using provided username and password."""
+        A screen showing neither (splash, loading, crash dialog) is waited out rather than taken
+        for a login. When the home screen is already there this is a single find_elements round trip.
+        The checks go through the actions backend, so this also works on the async one.
 
-        # Enter username
-        self.actions.input_text("username_field", username)
+        :param timeout: How long to wait for either screen before answering False.
+        """
+        try:
+            return self.actions.waits.until(
+                lambda: ("home" if self.actions.is_element_present("home_screen")
+                         else "login" if self.actions.is_element_present("login_button") else None),
+                timeout=timeout) == "home"
+        except TimeoutException:
+            return False
 
-        # Enter password
-        self.actions.input_text("password_field", password)
+    def ensure_logged_in(self, username: str, password: str, snapshots=None) -> str:
+        """
+        Be logged in as a user, going through the login form only when no snapshot of that
+        user's logged-in state can be restored (see AuthSnapshots).
 
-        # Click login button
-        self.actions.click("login_button")
\ No newline at end of file
+        :param snapshots: AuthSnapshots to use; the DriverManager's shared ones by default.
+        :return: How the state was obtained ("session", "deep_link", "app_data" or "ui_login").
+        """
+        if self.driver is None:
+            raise ValueError("ensure_logged_in restores snapshots through a WebDriver; "
+                             "on the async backend call login() and is_logged_in() instead.")
+        snapshots = snapshots or DriverManager.auth_snapshots()
+        return snapshots.ensure(self.driver, username, lambda: self.login(username, password), self.is_logged_in)
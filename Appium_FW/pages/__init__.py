@@ -1,7 +1,80 @@
-# __init__.py in Appium_FW/Pages
+"""
+Page objects, imported on first use:
 
-# Import specific pages to make them accessible from the Pages package
-from .LoginPage import login_page
+    from Appium_FW.pages import PageRegistry
+    login = PageRegistry.get("login")(driver)  # or PageRegistry.get("LoginPage")
 
-# List all classes available for import when using "from Pages import *"
-__all__ = ["login_page.py"]
\ No newline at end of file
+Importing the package imports no page module, so collecting a suite costs the same whatever the
+number of pages. Each page lives in its own folder (pages/LoginPage/login_page.py) and defines
+the class named after the folder; page modules are also reachable as attributes
+(``from Appium_FW.pages import login_page``) and are imported on that first access too.
+"""
+import importlib
+import os
+import threading
+from typing import Dict, List, Tuple
+
+_PAGES_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class PageRegistry:
+    """Lazy index of the page objects: folders are listed once, a page module is imported on first use."""
+    _index: Dict[str, Tuple[str, str]] = {}  # Page or class name -> (module name, class name)
+    _modules: Dict[str, str] = {}  # Module attribute name -> module name
+    _lock = threading.Lock()
+
+    @classmethod
+    def _scan(cls):
+        if cls._modules:
+            return
+        with cls._lock:
+            if cls._modules:
+                return
+            index, modules = {}, {}
+            for folder in os.scandir(_PAGES_DIR):
+                if not folder.is_dir() or folder.name.startswith(("_", ".")):
+                    continue
+                for entry in os.scandir(folder.path):
+                    if entry.name.endswith("_page.py"):
+                        module = f"{__name__}.{folder.name}.{entry.name[:-3]}"
+                        index[folder.name] = index[entry.name[:-len("_page.py")]] = (module, folder.name)
+                        modules[entry.name[:-3]] = module
+            cls._index, cls._modules = index, modules
+
+    @classmethod
+    def names(cls) -> List[str]:
+        """Class names of the known page objects."""
+        cls._scan()
+        return sorted({class_name for _, class_name in cls._index.values()})
+
+    @classmethod
+    def get(cls, name: str) -> type:
+        """
+        Return a page object class, importing its module if needed.
+
+        :param name: Class name ("LoginPage") or page name ("login", as given to LocatorLoader).
+        """
+        cls._scan()
+        try:
+            module_name, class_name = cls._index[name]
+        except KeyError:
+            raise KeyError(f"No page object named '{name}' in '{_PAGES_DIR}'.") from None
+        return getattr(importlib.import_module(module_name), class_name)
+
+    @classmethod
+    def module(cls, name: str):
+        """Return a page module ("login_page"), importing it if needed."""
+        cls._scan()
+        return importlib.import_module(cls._modules[name])
+
+
+def __getattr__(name):
+    if name == "__all__":
+        PageRegistry._scan()
+        return ["PageRegistry", *sorted(PageRegistry._modules)]
+    try:
+        module = PageRegistry.module(name)
+    except KeyError:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'") from None
+    globals()[name] = module  # Later lookups skip __getattr__
+    return module
@@ -0,0 +1,3 @@
+# __init__.py in Appium_FW/plugins
+
+# pytest plugins of the framework, enabled per run with "-p Appium_FW.plugins.<name>"
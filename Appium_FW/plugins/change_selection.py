@@ -0,0 +1,237 @@
+"""
+Change-aware test selection:
+
+    pytest -p Appium_FW.plugins.change_selection              # run everything, record dependencies
+    pytest -p Appium_FW.plugins.change_selection --changed-only
+
+Every test run with the plugin records what it depended on: the page objects it built, each
+locator name it resolved through LocatorLoader, each test data key it read through
+TestDataLoader, its own test module, the conftest.py files above it and the config file (device
+type, capabilities). With ``--changed-only``, a test is only run when one of those changed since
+it last passed (a single locator entry or data case, not the whole file), when the framework code
+under Utils/ or plugins/ changed, when it is new or when it failed or was skipped last time (a
+skip proves nothing about the code it would have run). A random sample of the remaining tests
+(``--changed-sample``) runs anyway as a safety net for dependencies the recording cannot see.
+
+Under pytest-xdist the workers record and the controller merges their records into the file.
+Saving merges per test with what is already in the file, so concurrent runs (e.g. one process
+per device shard) do not drop each other's records.
+"""
+import json
+import math
+import os
+import random
+import tempfile
+
+import pytest
+
+from Appium_FW.Utils.DependencyTracker import DependencyTracker
+from Appium_FW.Utils.ResourcePaths import ResourcePaths
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves still merge, without a lock
+    fcntl = None
+
+# Position of the file path in the dependencies that carry one
+PATH_ARGUMENT = {"locator": 1, "data": 1, "file": 1}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("change selection")
+    group.addoption("--changed-only", action="store_true", default=False,
+                    help="Run only the tests whose recorded dependencies changed, plus a safety sample.")
+    group.addoption("--changed-sample", type=float, default=0.05,
+                    help="Fraction of the unchanged tests to run anyway (rounded up; 0 disables).")
+    group.addoption("--changed-seed", type=int, default=None,
+                    help="Seed of the safety sample, to reproduce a selection.")
+    group.addoption("--changed-deps", default=".test_dependencies.json",
+                    help="File where the dependencies of each test are recorded between runs.")
+
+
+def pytest_configure(config):
+    config.pluginmanager.register(ChangeSelectionPlugin(config), "change-selection")
+
+
+class ChangeSelectionPlugin:
+    def __init__(self, config):
+        """
+        Per-session state of the change selection plugin.
+
+        :param config: The pytest config.
+        """
+        self.config = config
+        self.root = str(config.rootpath)
+        self.deps_file = os.path.join(self.root, config.getoption("--changed-deps"))
+        self.records = self._load()
+        self.framework = DependencyTracker.framework_hash()
+        self.selection = None  # reason -> count, when --changed-only is on
+        self.workerinput = getattr(config, "workerinput", None)  # Set on pytest-xdist workers
+        # Every xdist worker must deselect the same tests: they share the controller's seed
+        self.seed = config.getoption("--changed-seed")
+        if self.workerinput is not None:
+            self.seed = self.workerinput.get("changed_seed", self.seed)
+        elif self.seed is None:
+            self.seed = random.randrange(2 ** 32)
+        self._updated = set()  # Tests recorded by this session
+        self._hashes = {}
+        self._failed = set()
+        self._skipped = set()
+        self._conftests = {}
+        DependencyTracker.enabled = True
+
+    # Dependency file ------------------------------------------------------------------------
+
+    def _load(self):
+        try:
+            with open(self.deps_file, "r", encoding="utf-8") as file:
+                return json.load(file).get("tests", {})
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        """Write the tests recorded by this session over the file's current records of them."""
+        directory = os.path.dirname(self.deps_file) or "."
+        with open(self.deps_file + ".lock", "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            records = self._load()
+            records.update({node_id: self.records[node_id] for node_id in self._updated})
+            with tempfile.NamedTemporaryFile("w", dir=directory, suffix=".tmp", delete=False,
+                                             encoding="utf-8") as file:
+                json.dump({"version": 1, "tests": records}, file, indent=1, sort_keys=True)
+            os.replace(file.name, self.deps_file)
+
+    def _portable(self, dependency):
+        """Dependency with its file path relative to the rootdir, as stored in the file."""
+        index = PATH_ARGUMENT.get(dependency[0])
+        if index is None:
+            return list(dependency)
+        return [*dependency[:index], os.path.relpath(dependency[index], self.root), *dependency[index + 1:]]
+
+    def _local(self, stored):
+        index = PATH_ARGUMENT.get(stored[0])
+        if index is None:
+            return tuple(stored)
+        return (*stored[:index], os.path.join(self.root, stored[index]), *stored[index + 1:])
+
+    def _hash(self, dependency):
+        if dependency not in self._hashes:
+            self._hashes[dependency] = DependencyTracker.hash(dependency)
+        return self._hashes[dependency]
+
+    # Selection ------------------------------------------------------------------------------
+
+    def _reason(self, item):
+        """Why the test has to run, or None when nothing it depends on changed."""
+        record = self.records.get(item.nodeid)
+        if record is None:
+            return "new"
+        if record.get("outcome") != "passed":
+            return "failed"
+        if record.get("framework") != self.framework:
+            return "framework"
+        for stored in record.get("dependencies", []):
+            if self._hash(self._local(stored[:-1])) != stored[-1]:
+                return "changed"
+        return None
+
+    def pytest_collection_modifyitems(self, config, items):
+        if not config.getoption("--changed-only"):
+            return
+        self.selection = {"new": 0, "failed": 0, "framework": 0, "changed": 0, "sampled": 0, "deselected": 0}
+        selected, unchanged = set(), []
+        for item in items:
+            reason = self._reason(item)
+            if reason is None:
+                unchanged.append(item)
+            else:
+                selected.add(item.nodeid)
+                self.selection[reason] += 1
+
+        fraction = min(max(config.getoption("--changed-sample"), 0.0), 1.0)
+        sample = random.Random(self.seed).sample(
+            unchanged, min(len(unchanged), math.ceil(len(unchanged) * fraction)))
+        selected.update(item.nodeid for item in sample)
+        self.selection["sampled"] = len(sample)
+
+        deselected = [item for item in items if item.nodeid not in selected]
+        self.selection["deselected"] = len(deselected)
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = [item for item in items if item.nodeid in selected]
+
+    # Recording ------------------------------------------------------------------------------
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        DependencyTracker.start()
+        outcome = yield
+        dependencies = DependencyTracker.stop()
+        if outcome.excinfo is not None:  # The run was interrupted; leave the test's record as it was
+            return
+        dependencies.add(("file", str(item.path)))
+        dependencies.add(("file", os.path.abspath(ResourcePaths.config_file())))
+        dependencies.update(("file", path) for path in self._conftest_files(item.path.parent))
+        self._record(item.nodeid, dependencies)
+
+    def _conftest_files(self, directory):
+        """
+        conftest.py files that apply to tests in a directory, up to the rootdir. Missing ones are
+        included too, so adding a conftest.py later counts as a change.
+        """
+        key = str(directory)
+        if key not in self._conftests:
+            found = [os.path.join(key, "conftest.py")]
+            parent = os.path.dirname(key)
+            if os.path.commonpath([self.root, key]) == self.root and key != self.root and parent != key:
+                found.extend(self._conftest_files(parent))
+            self._conftests[key] = found
+        return self._conftests[key]
+
+    def pytest_runtest_logreport(self, report):
+        if report.failed:
+            self._failed.add(report.nodeid)
+        elif report.skipped:
+            self._skipped.add(report.nodeid)
+
+    def _record(self, node_id, dependencies):
+        self._updated.add(node_id)
+        self.records[node_id] = {
+            "outcome": ("failed" if node_id in self._failed else "skipped" if node_id in self._skipped
+                        else "passed"),
+            "framework": self.framework,
+            "dependencies": sorted(self._portable(dependency) + [DependencyTracker.hash(dependency)]
+                                   for dependency in dependencies),
+        }
+
+    # pytest-xdist ----------------------------------------------------------------------------
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_configure_node(self, node):
+        node.workerinput["changed_seed"] = self.seed
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):
+        records = getattr(node, "workeroutput", {}).get("change_selection", {})
+        self.records.update(records)
+        self._updated.update(records)
+
+    def pytest_sessionfinish(self, session):
+        DependencyTracker.enabled = False
+        if self.workerinput is not None:  # The controller saves what every worker recorded
+            self.config.workeroutput["change_selection"] = {node_id: self.records[node_id]
+                                                            for node_id in self._updated}
+        elif self._updated:
+            self._save()
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.selection is None:
+            return
+        selection = self.selection
+        terminalreporter.section("change selection")
+        terminalreporter.write_line(
+            f"{sum(selection.values()) - selection['deselected'] - selection['sampled']} tests selected "
+            f"({selection['new']} new, {selection['failed']} failed or skipped last run, {selection['changed']} with changed "
+            f"dependencies, {selection['framework']} after framework changes), {selection['sampled']} sampled, "
+            f"{selection['deselected']} deselected")
@@ -0,0 +1,63 @@
+"""
+Per-command timing of the framework, enabled with:
+
+    pytest -p Appium_FW.plugins.command_timing --appium-timings=timings
+
+At the end of the session the step and command histograms are written to
+``timings/timings.json`` and ``timings/timings.csv`` and the slowest locators/steps are listed
+in the terminal summary, followed by the round trips saved by every batched flow. Without the
+option nothing is wrapped and the overhead is a flag check.
+"""
+import os
+
+from Appium_FW.Utils.Instrumentation import Instrumentation
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("appium timings")
+    group.addoption("--appium-timings", default=None, metavar="DIR",
+                    help="Record per-command timings and export them to this directory.")
+    group.addoption("--appium-timings-top", type=int, default=10,
+                    help="Number of slowest locators/steps to list in the summary.")
+
+
+def pytest_configure(config):
+    if config.getoption("--appium-timings"):
+        Instrumentation.reset()
+        Instrumentation.enable()
+
+
+def pytest_sessionfinish(session):
+    directory = session.config.getoption("--appium-timings")
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    Instrumentation.export_json(os.path.join(directory, "timings.json"))
+    Instrumentation.export_csv(os.path.join(directory, "timings.csv"))
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not config.getoption("--appium-timings"):
+        return
+    slowest = Instrumentation.slowest(config.getoption("--appium-timings-top"))
+    if slowest:
+        _write_slowest(terminalreporter, slowest)
+    flows = Instrumentation.report()["flows"]
+    if flows:
+        terminalreporter.section("batched flows")
+        for flow in flows:
+            saved = flow["saved_calls"] / flow["unbatched_calls"] if flow["unbatched_calls"] else 0.0
+            terminalreporter.write_line(
+                f"{flow['flow'] or '(unnamed)'}: {flow['count']} runs, {flow['device_calls']} device calls "
+                f"instead of {flow['unbatched_calls']} ({saved:.0%} fewer), mean {flow['mean_ms']:.0f}ms")
+
+
+def _write_slowest(terminalreporter, slowest):
+    terminalreporter.section("slowest locators/steps")
+    for step in slowest:
+        total, device, wait = step["total"], step["device"], step["wait"]
+        name = f"{step['action']} {step['locator']}".strip()
+        strategy = f" [{step['strategy']}]" if step["strategy"] else ""
+        terminalreporter.write_line(
+            f"{total['total_ms'] / 1000:8.2f}s  {name}{strategy}: {total['count']} calls, "
+            f"p95 {total['p95_ms']:.0f}ms, device {device['total_ms'] / 1000:.2f}s, wait {wait['total_ms'] / 1000:.2f}s")
@@ -0,0 +1,49 @@
+"""
+Data-driven tests parametrized straight from a JSON, JSONL or CSV dataset:
+
+    pytest -p Appium_FW.plugins.data_driven
+
+    @pytest.mark.data_driven("login_users.jsonl")
+    def test_login(test_case):
+        LoginPage(driver).login(test_case["username"], test_case["password"])
+
+Collection streams only the test names out of the file (they become the test ids); each case's
+data is read through the loader's offset index when its test runs, so a 100k-row dataset never
+sits in memory as 100k dicts. ``--data-driven-limit N`` keeps the first N cases of every dataset.
+"""
+import itertools
+
+import pytest
+
+from Appium_FW.Utils.TestDataLoader import TestDataLoader
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("data driven")
+    group.addoption("--data-driven-limit", type=int, default=None,
+                    help="Run only the first N cases of every dataset.")
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "data_driven(data_file, key_field='name'): run the test once per case of the dataset, "
+                   "passing the case's data as the test_case fixture")
+
+
+def _loader(marker) -> TestDataLoader:
+    return TestDataLoader.shared(marker.args[0], marker.kwargs.get("key_field", "name"))
+
+
+def pytest_generate_tests(metafunc):
+    marker = metafunc.definition.get_closest_marker("data_driven")
+    if marker is None or "test_case" not in metafunc.fixturenames:
+        return
+    names = itertools.islice(_loader(marker).iter_names(), metafunc.config.getoption("--data-driven-limit"))
+    names = list(names)  # pytest needs the ids up front; the case data stays on disk
+    metafunc.parametrize("test_case", names, ids=names, indirect=True)
+
+
+@pytest.fixture
+def test_case(request):
+    """Data of the current dataset case, looked up by its name."""
+    return _loader(request.node.get_closest_marker("data_driven")).get_test_data(request.param)
@@ -0,0 +1,132 @@
+"""
+Device-aware sharding for the test suite.
+
+Run one pytest process per configured device, each executing only its shard:
+
+    python -m Appium_FW.plugins.device_sharding [pytest args]
+
+or start the shards yourself with ``pytest -p Appium_FW.plugins.device_sharding --shard-device N``.
+Shards are balanced with the per-test durations recorded by previous runs, and tests that drive
+the same page object (``@pytest.mark.page_object("login")``, or the same test module by default)
+stay on the same device.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from Appium_FW.Utils.DriverManager import DriverManager
+from Appium_FW.Utils.ShardScheduler import DurationStore, ShardScheduler
+
+DEVICE_INDEX_ENV = "APPIUM_FW_DEVICE_INDEX"
+EPOCH_ENV = "APPIUM_FW_SHARD_EPOCH"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("device sharding")
+    group.addoption("--shard-device", default=os.environ.get(DEVICE_INDEX_ENV),
+                    help="Index or udid of the configured device whose shard this process runs.")
+    group.addoption("--shard-durations", default=".shard_durations",
+                    help="Directory where per-test durations are recorded between runs.")
+    group.addoption("--shard-report", default=None,
+                    help="Write the shard plan and imbalance report to this JSON file.")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "page_object(name): group tests driving the same page object on one device")
+    config.pluginmanager.register(DeviceShardingPlugin(config), "device-sharding")
+
+
+class DeviceShardingPlugin:
+    def __init__(self, config):
+        """
+        Per-session state of the sharding plugin.
+
+        :param config: The pytest config.
+        """
+        self.config = config
+        self.device = config.getoption("--shard-device")
+        self.durations = DurationStore(config.getoption("--shard-durations")).load(
+            not_after=float(os.environ[EPOCH_ENV]) if EPOCH_ENV in os.environ else None)
+        self.shards = None
+        self._totals = {}
+
+    @staticmethod
+    def _device_index(selector, devices):
+        if selector is None:
+            return None
+        for index, device in enumerate(devices):
+            if device.get("udid") == selector:
+                return index
+        return int(selector)
+
+    @staticmethod
+    def _group_of(items_by_id):
+        def group_of(node_id):
+            marker = items_by_id[node_id].get_closest_marker("page_object")
+            if marker and marker.args:
+                return f"page:{marker.args[0]}"
+            return f"module:{node_id.split('::', 1)[0]}"
+        return group_of
+
+    def pytest_collection_modifyitems(self, config, items):
+        devices = DriverManager.get_devices()
+        items_by_id = {item.nodeid: item for item in items}
+        self.shards = ShardScheduler(devices, self.durations).plan(list(items_by_id), self._group_of(items_by_id))
+
+        index = self._device_index(self.device, devices)
+        if index is None:
+            return
+        os.environ[DEVICE_INDEX_ENV] = str(index)  # DriverManager leases sessions on this device
+        selected = set(self.shards[index].node_ids)
+        deselected = [item for item in items if item.nodeid not in selected]
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = [item for item in items if item.nodeid in selected]
+
+    def pytest_runtest_logreport(self, report):
+        self._totals[report.nodeid] = self._totals.get(report.nodeid, 0.0) + report.duration
+        if report.when == "teardown":
+            self.durations.record(report.nodeid, self._totals.pop(report.nodeid))
+
+    def pytest_sessionfinish(self, session):
+        self.durations.save(f"shard-{self.device if self.device is not None else 'all'}")
+        report_path = self.config.getoption("--shard-report")
+        if report_path and self.shards:
+            with open(report_path, "w") as file:
+                json.dump(ShardScheduler.imbalance(self.shards), file, indent=2)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.shards:
+            return
+        report = ShardScheduler.imbalance(self.shards)
+        terminalreporter.section("device shards")
+        for shard in report["shards"]:
+            terminalreporter.write_line(
+                f"device {shard['index']} ({shard['udid'] or 'default'}): {shard['tests']} tests in "
+                f"{shard['groups']} groups, expected {shard['expected_seconds']:.1f}s")
+        terminalreporter.write_line(
+            f"expected wall clock {report['expected_wall_clock_seconds']:.1f}s for "
+            f"{report['total_seconds']:.1f}s of tests, imbalance ratio {report['imbalance_ratio']:.2f}")
+
+
+def main(pytest_args):
+    """Run every shard in parallel, one pytest process per configured device."""
+    devices = DriverManager.get_devices()
+    environment = dict(os.environ, **{EPOCH_ENV: str(time.time())})
+    processes = [
+        subprocess.Popen([sys.executable, "-m", "pytest", "-p", "Appium_FW.plugins.device_sharding",
+                          "--shard-device", str(index), *pytest_args],
+                         env=dict(environment, **{DEVICE_INDEX_ENV: str(index)}))
+        for index in range(len(devices))
+    ]
+    # A device whose shard came out empty exits with "no tests collected"; that is not a failure
+    return max((code if code != pytest.ExitCode.NO_TESTS_COLLECTED else 0)
+               for code in (process.wait() for process in processes))
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
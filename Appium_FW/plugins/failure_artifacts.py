@@ -0,0 +1,80 @@
+"""
+Screenshot and page source of failing tests, captured in the background:
+
+    pytest -p Appium_FW.plugins.failure_artifacts --appium-artifacts=artifacts
+
+Artifacts are gzip-compressed and stored once per distinct content under
+``artifacts/objects/``; ``artifacts/manifest.jsonl`` lists which test produced which object.
+A failing test only waits for the device round trips (run in parallel) before its teardown
+releases the driver; compression and writes overlap with the following tests and are flushed at
+the end of the session. ``--appium-artifacts-sample`` also captures a fraction of passing tests.
+"""
+import pytest
+
+from Appium_FW.Utils.ArtifactPipeline import ArtifactPipeline
+from Appium_FW.Utils.DriverManager import DriverManager
+
+_FETCHES = pytest.StashKey[dict]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("appium artifacts")
+    group.addoption("--appium-artifacts", default=None, metavar="DIR",
+                    help="Capture screenshot and page source of failing tests into this directory.")
+    group.addoption("--appium-artifacts-sample", type=float, default=0.0,
+                    help="Fraction of passing tests to capture as well.")
+    group.addoption("--appium-artifacts-timeout", type=float, default=30.0,
+                    help="Seconds a failing test's teardown waits for the device to answer.")
+
+
+def pytest_configure(config):
+    directory = config.getoption("--appium-artifacts")
+    if directory:
+        ArtifactPipeline.configure(directory, sample_rate=config.getoption("--appium-artifacts-sample"))
+
+
+def _current_driver():
+    try:
+        return DriverManager.get_driver()
+    except Exception:
+        return None  # The test never started a session
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if not item.config.getoption("--appium-artifacts") or report.when != "call" or report.skipped:
+        return
+    pipeline = ArtifactPipeline.shared()
+    if not pipeline.should_capture(report.failed):
+        return
+    driver = _current_driver()
+    if driver is not None:
+        item.stash[_FETCHES] = pipeline.capture(driver, item.nodeid, metadata={"outcome": report.outcome})
+
+
+@pytest.hookimpl(hookwrapper=True, tryfirst=True)
+def pytest_runtest_teardown(item):
+    # The fixtures about to run may hand the driver back to the pool (and reset the app)
+    fetches = item.stash.get(_FETCHES, None)
+    if fetches:
+        ArtifactPipeline.wait_for_fetches(fetches, timeout=item.config.getoption("--appium-artifacts-timeout"))
+    yield
+
+
+def pytest_sessionfinish(session):
+    if session.config.getoption("--appium-artifacts"):
+        ArtifactPipeline.shared().flush()
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not config.getoption("--appium-artifacts"):
+        return
+    stats = ArtifactPipeline.shared().stats
+    if stats["captures"] or stats["errors"]:
+        terminalreporter.section("appium artifacts")
+        terminalreporter.write_line(
+            f"{stats['captures']} artifacts: {stats['objects_written']} stored, {stats['deduplicated']} deduplicated, "
+            f"{stats['bytes_in'] / 1024:.0f} KiB -> {stats['bytes_stored'] / 1024:.0f} KiB on disk, "
+            f"{stats['errors']} errors ({config.getoption('--appium-artifacts')}/manifest.jsonl)")
@@ -0,0 +1,603 @@
+import base64
+import io
+import json
+import re
+import threading
+import time
+import uuid
+import xml.etree.ElementTree as ET
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from appium.webdriver.common.appiumby import AppiumBy
+
+from Appium_FW.Utils.ElementStore import ElementStore
+from Appium_FW.Utils.HierarchySnapshot import HierarchySnapshot, UnsupportedLocatorError
+
+# W3C key under which element references are exchanged
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+# Smallest valid PNG (1x1 transparent pixel) returned as the screenshot
+SCREENSHOT_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg==")
+# Names accepted by get_attribute on UiAutomator2 -> page source attribute
+ATTRIBUTE_ALIASES = {"className": "class", "resourceId": "resource-id", "contentDescription": "content-desc"}
+# App data file where a ScreenGraph app remembers the screen it relaunches on
+STATE_FILE = "shared_prefs/fake_app.xml"
+
+
+class ScreenGraph:
+    def __init__(self, screens: Dict[str, str], links: Dict[str, Dict[str, str]], start: str,
+                 remembered: Iterable[str] = (), deep_links: Optional[Dict[str, str]] = None):
+        """
+        An app simulated as recorded screens connected by taps, e.g. to crawl it without a device.
+
+        :param screens: Screen name -> page source.
+        :param links: Screen name -> {element key: name of the screen a tap on it opens}; the key
+                      is the element's resource-id, content-desc or text.
+        :param start: Screen shown when the app starts.
+        :param remembered: Screens the app relaunches on once reached (e.g. the home screen shown
+                           after a login), until its data is cleared. The app keeps this in a file
+                           of its data directory, so the state can be pulled and pushed back.
+        :param deep_links: URL -> screen it opens (mobile: deepLink); remembered like a tap would.
+        """
+        self.screens = screens
+        self.links = links
+        self.start = start
+        self.remembered = set(remembered)
+        self.deep_links = deep_links or {}
+
+    def target(self, screen: str, node: ET.Element) -> Optional[str]:
+        """Screen opened by tapping the node, or None if the tap does nothing."""
+        links = self.links.get(screen, {})
+        for attribute in ("resource-id", "content-desc", "text"):
+            value = node.attrib.get(attribute)
+            if value and value in links:
+                return links[value]
+        return None
+
+
+class FakeSession:
+    def __init__(self, session_id: str, capabilities: Dict, page_source: Optional[str] = None,
+                 graph: Optional[ScreenGraph] = None, scroll_pages: Optional[List[str]] = None):
+        """
+        State of one session on the fake server.
+
+        :param session_id: The W3C session id.
+        :param capabilities: Capabilities the session was created with ("appium:" prefixes removed).
+        :param page_source: Recorded hierarchy the session replays, if any.
+        :param graph: Screens to navigate between instead of a single page source.
+        :param scroll_pages: Page sources of a scrollable list, first to last, instead of a single page source.
+        """
+        self.session_id = session_id
+        self.capabilities = capabilities
+        self.app_state = 4  # Running in foreground
+        self.window_rect = {"x": 0, "y": 0, "width": 1080, "height": 2340}
+        self.context = "NATIVE_APP"
+        self.actions_performed = 0
+        self.last_actions: List[Dict] = []  # Input sources of the last W3C actions call
+        self.hierarchy: Optional[HierarchySnapshot] = None
+        self._nodes: List[ET.Element] = []
+        self._positions: Dict[int, int] = {}
+        self._page_source: Optional[str] = None
+        self._element_store: Optional[ElementStore] = None
+        self.graph = graph
+        self.screen: Optional[str] = None
+        self.history: List[str] = []  # Screens below the current one on the back stack
+        self.app_data: Dict[str, bytes] = {}  # Files of the app's data directory by device path
+        self.data_dir = f"/data/data/{capabilities.get('appPackage') or 'com.example.app'}/"
+        self.scroll_pages = list(scroll_pages or [])
+        self.scroll_position = 0
+        self.scrolls = 0  # Pages moved, by gestures and UiScrollable searches
+        if graph is not None:
+            self.open_screen(graph.start)
+        elif self.scroll_pages:
+            self.load_page_source(self.scroll_pages[0])
+        elif page_source is not None:
+            self.load_page_source(page_source)
+
+    def load_page_source(self, page_source: str):
+        """Show a new screen; references to elements of the previous one become stale."""
+        self.hierarchy = HierarchySnapshot(page_source)
+        self._page_source = page_source
+        self._nodes = list(self.hierarchy.root.iter())
+        self._positions = {id(node): position for position, node in enumerate(self._nodes)}
+        self._element_store = None
+
+    def open_screen(self, screen: str, push: bool = False):
+        """Show a screen of the graph; push keeps the current one on the back stack."""
+        if push and self.screen is not None:
+            self.history.append(self.screen)
+        self.screen = screen
+        self.load_page_source(self.graph.screens[screen])
+        if screen in self.graph.remembered:
+            self.app_data[self.data_dir + STATE_FILE] = screen.encode("utf-8")
+
+    def restart(self):
+        """Relaunch the app on the graph's start screen, or on the screen its data remembers."""
+        if self.graph is not None:
+            self.history = []
+            remembered = self.app_data.get(self.data_dir + STATE_FILE, b"").decode("utf-8")
+            self.open_screen(remembered if remembered in self.graph.screens else self.graph.start)
+
+    def device_path(self, path: str) -> str:
+        """
+        Resolve Appium's "@<package>/<path>" form (run-as in the app's data directory). The data
+        directory itself is not readable by adb on a non-rooted device, so direct paths into it fail.
+        """
+        if path.startswith("@"):
+            package, _, relative = path[1:].partition("/")
+            return f"/data/data/{package}/{relative}"
+        if path.startswith("/data/data/"):
+            raise FakeCommandError(500, "unknown error", f"Permission denied: '{path}' (use '@<package>/...').")
+        return path
+
+    def pull_folder(self, path: str) -> str:
+        """Files under a device folder, zipped and base64-encoded like Appium's pullFolder."""
+        prefix = self.device_path(path).rstrip("/") + "/"
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            for file_path, content in sorted(self.app_data.items()):
+                if file_path.startswith(prefix):
+                    archive.writestr(file_path[len(prefix):], content)
+        return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+    def open_deep_link(self, url: str):
+        if self.graph is None or url not in self.graph.deep_links:
+            raise FakeCommandError(400, "invalid argument", f"No activity handles the URL '{url}'.")
+        self.history = []
+        self.app_state = 4
+        self.open_screen(self.graph.deep_links[url])
+
+    def clear_app(self):
+        """Delete the app's data and stop it, like pm clear."""
+        self.app_data = {path: content for path, content in self.app_data.items()
+                         if not path.startswith(self.data_dir)}
+        self.app_state = 1
+
+    def can_scroll(self, forward: bool) -> bool:
+        position = self.scroll_position + (1 if forward else -1)
+        return 0 <= position < len(self.scroll_pages)
+
+    def scroll(self, forward: bool) -> bool:
+        """Show the next (or previous) page of the list; False when already at that end."""
+        if not self.can_scroll(forward):
+            return False
+        self.scroll_position += 1 if forward else -1
+        self.scrolls += 1
+        self.load_page_source(self.scroll_pages[self.scroll_position])
+        return True
+
+    def scroll_into_view(self, matches: Callable[[ET.Element], bool], max_swipes: int) -> List[ET.Element]:
+        """UiScrollable.scrollIntoView: check the page, rewind the list, then search it forward."""
+        def found():
+            return [node for node in self.hierarchy.root.iter() if matches(node)]
+
+        if found():
+            return found()
+        for _ in range(max_swipes):
+            if not self.scroll(forward=False):
+                break
+        if found():
+            return found()
+        for _ in range(max_swipes):
+            scrolled = self.scroll(forward=True)
+            if found() or not scrolled:
+                return found()
+        return []
+
+    def go_back(self):
+        if self.graph is None:
+            return
+        if self.history:
+            self.open_screen(self.history.pop())
+        else:
+            self.app_state = 1  # Back on the first screen leaves the app
+
+    def activate(self, node: ET.Element):
+        """Tap or click on a node: follow its link in the screen graph, if any."""
+        target = self.graph.target(self.screen, node) if self.graph is not None else None
+        if target is not None:
+            self.open_screen(target, push=True)
+
+    def tap(self, x: int, y: int):
+        if self.hierarchy is None:
+            return
+        if self._element_store is None:
+            self._element_store = ElementStore(self.hierarchy)
+        for record in reversed(self._element_store.elements_at(x, y)):
+            if self.graph is None or self.graph.target(self.screen, record.node) is not None:
+                self.activate(record.node)
+                return
+
+    @property
+    def page_source(self) -> str:
+        if self.hierarchy is None:
+            raise FakeCommandError(500, "unknown error", "No page source is loaded on the fake server.")
+        if self._page_source is None:
+            # Regenerated after an element's text changed
+            body = ET.tostring(self.hierarchy.root, encoding="unicode")
+            self._page_source = "<?xml version='1.0' encoding='UTF-8' standalone='yes' ?>" + body
+        return self._page_source
+
+    def element_reference(self, node: ET.Element) -> Dict[str, str]:
+        element_id = f"{id(self.hierarchy)}-{self._positions[id(node)]}"
+        return {ELEMENT_KEY: element_id, "ELEMENT": element_id}
+
+    def node(self, element_id: str) -> ET.Element:
+        snapshot_id, _, position = element_id.rpartition("-")
+        if self.hierarchy is None or snapshot_id != str(id(self.hierarchy)):
+            raise FakeCommandError(404, "stale element reference", f"Element '{element_id}' is no longer on screen.")
+        return self._nodes[int(position)]
+
+    def set_text(self, node: ET.Element, text: str):
+        node.attrib["text"] = text
+        self._page_source = None
+
+
+class FakeAppiumServer:
+    """
+    Local stand-in for an Appium server speaking the W3C WebDriver protocol over HTTP.
+
+    It answers session management and the commands the framework uses so pools, drivers and
+    benchmarks can be exercised without a device. Every command can be given an injected latency.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 session_latency: float = 0.0, page_source: Optional[str] = None,
+                 command_latency: Optional[Dict[str, float]] = None, graph: Optional[ScreenGraph] = None,
+                 scroll_pages: Optional[List[str]] = None):
+        """
+        :param host: Interface to bind.
+        :param port: Port to bind; 0 picks a free port.
+        :param latency: Seconds added to every command.
+        :param session_latency: Seconds added to session creation (real servers take 10-30 s).
+        :param page_source: Recorded hierarchy (e.g. Utils/screen_source.xml) replayed by every session.
+        :param command_latency: Extra seconds per command name, e.g. {"GET /session/:session_id/source": 0.3}.
+        :param graph: Screens every session navigates between (taps, clicks, back and app
+                      restarts), instead of a single page_source.
+        :param scroll_pages: Page sources of one scrollable list, first to last, that every session
+                             moves through with mobile: scrollGesture and UiScrollable searches.
+        """
+        self.latency = latency
+        self.page_source = page_source
+        self.graph = graph
+        self.scroll_pages = scroll_pages
+        self.command_latency = command_latency or {}
+        self.session_latency = session_latency
+        self.sessions: Dict[str, FakeSession] = {}
+        self.sessions_created = 0
+        self.command_counts: Dict[str, int] = {}
+        self.commands: List[str] = []  # Every command received, in order
+        self._lock = threading.Lock()
+        self._routes: List[Tuple[str, re.Pattern, str, Callable]] = []
+        self._register_routes()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeAppiumServer":
+        """Serve on a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-appium", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the port."""
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def route(self, method: str, pattern: str):
+        """Register a handler for a method and a path regex (named groups are passed as kwargs)."""
+        # Readable command name for counters, e.g. "GET /session/:session_id/source"
+        name = f"{method} " + re.sub(r"[(][?]P<(\w+)>[^)]*[)]", r":\1", pattern)
+
+        def decorator(handler: Callable):
+            self._routes.append((method, re.compile(f"^{pattern}$"), name, handler))
+            return handler
+        return decorator
+
+    def _register_routes(self):
+        session = r"/session/(?P<session_id>[^/]+)"
+        self.route("GET", r"/status")(lambda body: {"ready": True, "message": "Fake Appium server"})
+        self.route("POST", r"/session")(self._new_session)
+        self.route("DELETE", session)(self._delete_session)
+        self.route("GET", session + r"/window/rect")(lambda session, body: session.window_rect)
+        self.route("GET", session + r"/window/size")(
+            lambda session, body: {k: session.window_rect[k] for k in ("width", "height")})
+        self.route("POST", session + r"/appium/device/terminate_app")(self._terminate_app)
+        self.route("POST", session + r"/appium/device/activate_app")(self._activate_app)
+        self.route("POST", session + r"/appium/device/app_state")(lambda session, body: session.app_state)
+        self.route("POST", session + r"/execute/sync")(self._execute_script)
+        self.route("POST", session + r"/timeouts")(lambda session, body: None)
+        self.route("GET", session + r"/contexts")(lambda session, body: ["NATIVE_APP"])
+        self.route("GET", session + r"/context")(lambda session, body: session.context)
+        self.route("POST", session + r"/context")(self._set_context)
+        self.route("GET", session + r"/source")(lambda session, body: session.page_source)
+        self.route("GET", session + r"/screenshot")(
+            lambda session, body: base64.b64encode(SCREENSHOT_PNG).decode("ascii"))
+        self.route("POST", session + r"/actions")(self._perform_actions)
+        self.route("POST", session + r"/back")(lambda session, body: session.go_back())
+        self.route("DELETE", session + r"/actions")(lambda session, body: None)
+        self.route("POST", session + r"/element")(self._find_element)
+        self.route("POST", session + r"/elements")(self._find_elements)
+        element = session + r"/element/(?P<element_id>[^/]+)"
+        self.route("GET", element + r"/attribute/(?P<name>[^/]+)")(self._element_attribute)
+        self.route("GET", element + r"/text")(
+            lambda session, element_id, body: session.hierarchy.text(session.node(element_id)))
+        self.route("GET", element + r"/rect")(self._element_rect)
+        self.route("GET", element + r"/displayed")(
+            lambda session, element_id, body: session.node(element_id).attrib.get("displayed", "true") == "true")
+        self.route("GET", element + r"/enabled")(
+            lambda session, element_id, body: session.node(element_id).attrib.get("enabled", "true") == "true")
+        self.route("POST", element + r"/click")(self._click_element)
+        self.route("POST", element + r"/clear")(
+            lambda session, element_id, body: session.set_text(session.node(element_id), ""))
+        self.route("POST", element + r"/value")(self._send_keys)
+
+    # Session commands
+
+    def _new_session(self, body: Dict):
+        if self.session_latency:
+            time.sleep(self.session_latency)
+        requested = body.get("capabilities", {})
+        capabilities = dict(requested.get("alwaysMatch", {}))
+        for match in requested.get("firstMatch", [{}])[:1]:
+            capabilities.update(match)
+        capabilities = {key.split(":", 1)[-1]: value for key, value in capabilities.items()}
+        session = FakeSession(uuid.uuid4().hex, capabilities, self.page_source, self.graph, self.scroll_pages)
+        with self._lock:
+            self.sessions[session.session_id] = session
+            self.sessions_created += 1
+        return {"sessionId": session.session_id, "capabilities": capabilities}
+
+    def _delete_session(self, session: FakeSession, body: Dict):
+        with self._lock:
+            self.sessions.pop(session.session_id, None)
+        return None
+
+    def _terminate_app(self, session: FakeSession, body: Dict):
+        session.app_state = 1  # Not running
+        return True
+
+    def _activate_app(self, session: FakeSession, body: Dict):
+        if session.app_state != 4:
+            session.restart()
+        session.app_state = 4
+        return None
+
+    def _execute_script(self, session: FakeSession, body: Dict):
+        script = body.get("script", "")
+        handlers = {
+            "mobile: terminateApp": self._terminate_app,
+            "mobile: activateApp": self._activate_app,
+            "mobile: queryAppState": lambda session, body: session.app_state,
+            "mobile: scrollGesture": self._scroll_gesture,
+            "mobile: scroll": lambda session, body: None,
+            "mobile: replaceElementValue": lambda session, body: session.set_text(
+                session.node(body.get("elementId", "")), body.get("text", "")),
+            "mobile: pullFolder": lambda session, body: session.pull_folder(body.get("remotePath", "")),
+            "mobile: pushFile": lambda session, body: session.app_data.__setitem__(
+                session.device_path(body.get("remotePath", "")), base64.b64decode(body.get("payload", ""))),
+            "mobile: deepLink": lambda session, body: session.open_deep_link(body.get("url", "")),
+            "mobile: clearApp": lambda session, body: session.clear_app(),
+        }
+        if script not in handlers:
+            raise FakeCommandError(404, "unknown command", f"Script '{script}' is not supported.")
+        args = body.get("args") or [{}]
+        return handlers[script](session, args[0])
+
+    @staticmethod
+    def _scroll_gesture(session: FakeSession, body: Dict) -> bool:
+        """Move the list (a recorded single screen cannot scroll); True while it can scroll further."""
+        forward = body.get("direction") in ("down", "right")
+        return session.scroll(forward) and session.can_scroll(forward)
+
+    def _set_context(self, session: FakeSession, body: Dict):
+        if body.get("name") != "NATIVE_APP":
+            raise FakeCommandError(404, "no such context", f"Context '{body.get('name')}' does not exist.")
+        session.context = body["name"]
+        return None
+
+    def _perform_actions(self, session: FakeSession, body: Dict):
+        session.actions_performed += 1
+        session.last_actions = body.get("actions", [])
+        for source in session.last_actions:
+            if source.get("type") != "pointer":
+                continue
+            # Taps are a press and release without a move in between; swipes do not activate anything
+            x = y = 0
+            down, moved = False, False
+            for action in source.get("actions", []):
+                if action.get("type") == "pointerMove":
+                    x, y = action.get("x", x), action.get("y", y)
+                    moved = moved or down
+                elif action.get("type") == "pointerDown":
+                    down, moved = True, False
+                elif action.get("type") == "pointerUp" and down:
+                    down = False
+                    if not moved:
+                        session.tap(int(x), int(y))
+        return None
+
+    # Element commands
+
+    @staticmethod
+    def _locator(body: Dict) -> Tuple[str, str]:
+        using, value = body.get("using"), body.get("value", "")
+        if using == "css selector":
+            # Selenium rewrites By.ID / By.NAME into CSS attribute selectors
+            match = re.fullmatch(r'\[(id|name)="(.*)"\]', value)
+            if match:
+                return (AppiumBy.ID if match.group(1) == "id" else AppiumBy.ACCESSIBILITY_ID), match.group(2)
+        return using, value
+
+    def _match(self, session: FakeSession, body: Dict) -> List[ET.Element]:
+        if session.hierarchy is None:
+            return []
+        using, value = self._locator(body)
+        if using == AppiumBy.ANDROID_UIAUTOMATOR and value.replace(" ", "") == "newUiSelector()":
+            # The match-everything selector used by ElementXpathExtractor
+            return [node for node in session.hierarchy.root.iter() if node is not session.hierarchy.root]
+        if using == AppiumBy.ANDROID_UIAUTOMATOR and value.startswith("new UiScrollable("):
+            match = re.search(r"\.scrollIntoView\((.*)\)$", value)
+            if not match:
+                raise FakeCommandError(400, "invalid selector", f"Unsupported UiScrollable expression '{value}'.")
+            max_swipes = re.search(r"\.setMaxSearchSwipes\((\d+)\)", value)
+            return session.scroll_into_view(self._uiselector(match.group(1)),
+                                            int(max_swipes.group(1)) if max_swipes else 30)
+        if using == AppiumBy.ANDROID_UIAUTOMATOR and value.startswith("new UiSelector()"):
+            matches = self._uiselector(value)
+            nodes = [node for node in session.hierarchy.root.iter()
+                     if node is not session.hierarchy.root and matches(node)]
+            instance = re.search(r"\.instance\((\d+)\)", value)
+            return nodes[int(instance.group(1)):int(instance.group(1)) + 1] if instance else nodes
+        try:
+            return session.hierarchy.find_all(using, value)
+        except UnsupportedLocatorError as e:
+            raise FakeCommandError(400, "invalid selector", str(e))
+
+    @staticmethod
+    def _uiselector(selector: str) -> Callable[[ET.Element], bool]:
+        """Node predicate of a UiSelector made of resourceId/resourceIdMatches/description/text/className calls."""
+        attributes = {"resourceId": "resource-id", "resourceIdMatches": "resource-id", "description": "content-desc",
+                      "text": "text", "className": "class"}
+        conditions = []
+        for method, quoted in re.findall(r'\.(\w+)\("((?:[^"\\]|\\.)*)"\)', selector):
+            if method not in attributes:
+                raise FakeCommandError(400, "invalid selector", f"UiSelector method '{method}' is not supported.")
+            conditions.append((method, attributes[method], re.sub(r"\\(.)", r"\1", quoted)))
+
+        def matches(node: ET.Element) -> bool:
+            for method, attribute, expected in conditions:
+                actual = node.attrib.get(attribute, "")
+                if not (re.fullmatch(expected, actual) if method.endswith("Matches") else actual == expected):
+                    return False
+            return True
+        return matches
+
+    def _find_element(self, session: FakeSession, body: Dict):
+        nodes = self._match(session, body)
+        if not nodes:
+            raise FakeCommandError(404, "no such element",
+                                   f"No element matches {body.get('using')}='{body.get('value')}'.")
+        return session.element_reference(nodes[0])
+
+    def _find_elements(self, session: FakeSession, body: Dict):
+        return [session.element_reference(node) for node in self._match(session, body)]
+
+    def _element_attribute(self, session: FakeSession, element_id: str, name: str, body: Dict):
+        return session.node(element_id).attrib.get(ATTRIBUTE_ALIASES.get(name, name))
+
+    def _element_rect(self, session: FakeSession, element_id: str, body: Dict):
+        bounds = HierarchySnapshot.parse_bounds(session.node(element_id).attrib.get("bounds"))
+        if not bounds:
+            return {"x": 0, "y": 0, "width": 0, "height": 0}
+        x1, y1, x2, y2 = bounds
+        return {"x": x1, "y": y1, "width": x2 - x1, "height": y2 - y1}
+
+    def _click_element(self, session: FakeSession, element_id: str, body: Dict):
+        session.activate(session.node(element_id))
+        return None
+
+    def _send_keys(self, session: FakeSession, element_id: str, body: Dict):
+        node = session.node(element_id)
+        text = body.get("text") or "".join(body.get("value", []))
+        session.set_text(node, node.attrib.get("text", "") + text)
+        return None
+
+    # HTTP plumbing
+
+    def dispatch(self, method: str, path: str, body: Dict) -> Tuple[int, Dict]:
+        """Run the handler for a request and return (status, W3C response body)."""
+        path = path.split("?", 1)[0].rstrip("/") or "/"
+        path = re.sub(r"^/wd/hub", "", path)
+        for route_method, pattern, command, handler in self._routes:
+            match = pattern.match(path)
+            if route_method != method or not match:
+                continue
+            with self._lock:
+                self.command_counts[command] = self.command_counts.get(command, 0) + 1
+                self.commands.append(command)
+            delay = self.latency + self.command_latency.get(command, 0.0)
+            if delay:
+                time.sleep(delay)
+            kwargs = match.groupdict()
+            try:
+                if "session_id" in kwargs:
+                    session = self.sessions.get(kwargs.pop("session_id"))
+                    if session is None:
+                        raise FakeCommandError(404, "invalid session id", "The session is not active.")
+                    kwargs["session"] = session
+                return 200, {"value": handler(body=body, **kwargs)}
+            except FakeCommandError as e:
+                return e.status, {"value": {"error": e.error, "message": e.message, "stacktrace": ""}}
+        return 404, {"value": {"error": "unknown command", "message": f"{method} {path}", "stacktrace": ""}}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like a real Appium server
+            disable_nagle_algorithm = True  # Headers and body are separate writes; do not delay the body
+
+            def _handle(self, method: str):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                body = json.loads(raw) if raw else {}
+                status, payload = server.dispatch(method, self.path, body)
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def do_DELETE(self):
+                self._handle("DELETE")
+
+            def log_message(self, format, *args):
+                pass  # Keep test output clean
+
+        return Handler
+
+
+class FakeCommandError(Exception):
+    def __init__(self, status: int, error: str, message: str):
+        """W3C error returned by a fake command handler."""
+        super().__init__(message)
+        self.status = status
+        self.error = error
+        self.message = message
+
+
+# Example usage
+if __name__ == "__main__":
+    with open("screen_source.xml", "r", encoding="utf-8") as source:
+        recorded_source = source.read()
+    with FakeAppiumServer(port=4723, latency=0.01, page_source=recorded_source) as fake_server:
+        print(f"Fake Appium server listening on {fake_server.url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,84 @@
+"""
+Simulated apps (ScreenGraphs for the FakeAppiumServer) shared by the tests and the benchmarks.
+"""
+from typing import Dict, List, Tuple
+
+from appium import webdriver
+from appium.options.common import AppiumOptions
+
+from Appium_FW.testing.FakeAppiumServer import FakeAppiumServer, ScreenGraph
+
+SHOP_PACKAGE = "com.example.shop"
+LOGIN_PACKAGE = "com.example.android"  # The package LoginPage's locators are written for
+LOGIN_DEEP_LINK = "example://debug/login?user={user}"
+LOGIN_SCREEN = """<hierarchy>
+  <android.widget.EditText class="android.widget.EditText" content-desc="username" text="" bounds="[0,0][1000,100]"/>
+  <android.widget.EditText class="android.widget.EditText" content-desc="password" text="" bounds="[0,100][1000,200]"/>
+  <android.widget.Button class="android.widget.Button" resource-id="com.example.android:id/login_button" bounds="[0,200][1000,300]" clickable="true"/>
+</hierarchy>"""
+HOME_SCREEN = """<hierarchy>
+  <android.widget.TextView class="android.widget.TextView" resource-id="com.example.android:id/welcome" text="Welcome" bounds="[0,0][1000,100]"/>
+</hierarchy>"""
+
+
+def _screen(screen_id: str, buttons: List[Tuple[str, str]], tabs: List[str]) -> str:
+    """A screen with a column of buttons (resource id, text) and a tab bar at the bottom."""
+    rows = "".join(
+        f'<android.widget.Button class="android.widget.Button" resource-id="{SHOP_PACKAGE}:id/{button_id}" '
+        f'text="{text}" clickable="true" bounds="[0,{200 + 150 * index}][1080,{330 + 150 * index}]"/>'
+        for index, (button_id, text) in enumerate(buttons))
+    width = 1080 // max(1, len(tabs))
+    tab_bar = "".join(
+        f'<android.widget.TextView class="android.widget.TextView" content-desc="{tab}" clickable="true" '
+        f'bounds="[{width * index},2200][{width * (index + 1)},2340]"/>'
+        for index, tab in enumerate(tabs))
+    return (f'<hierarchy><android.widget.FrameLayout class="android.widget.FrameLayout" '
+            f'resource-id="{SHOP_PACKAGE}:id/{screen_id}" bounds="[0,0][1080,2340]">'
+            f'<android.widget.TextView class="android.widget.TextView" text="{screen_id}" bounds="[0,0][1080,150]"/>'
+            f'{rows}{tab_bar}</android.widget.FrameLayout></hierarchy>')
+
+
+def build_screen_graph(sections: int = 4, items: int = 5) -> ScreenGraph:
+    """
+    A shop-like app: a home screen, one screen per section reached from a tab bar shown on every
+    screen, and one detail screen per item. Details link to the next item ("related") and have
+    a button that does nothing ("favorite"), so the crawler meets known screens and no-op taps.
+    """
+    tabs = ["home"] + [f"section_{section}" for section in range(sections)]
+    screens: Dict[str, str] = {}
+    links: Dict[str, Dict[str, str]] = {}
+    tab_links = {tab: tab for tab in tabs}
+
+    screens["home"] = _screen("home", [("banner", "Welcome")], tabs)
+    links["home"] = dict(tab_links)
+    for section in range(sections):
+        name = f"section_{section}"
+        details = [f"{name}_item_{item}" for item in range(items)]
+        screens[name] = _screen(name, [(f"item_{item}", f"Item {section}.{item}") for item in range(items)], tabs)
+        links[name] = dict(tab_links, **{f"{SHOP_PACKAGE}:id/item_{item}": detail
+                                         for item, detail in enumerate(details)})
+        for item, detail in enumerate(details):
+            screens[detail] = _screen(detail, [("favorite", "Favorite"), ("related", "Related")], tabs)
+            links[detail] = dict(tab_links, **{f"{SHOP_PACKAGE}:id/related": details[(item + 1) % items]})
+    return ScreenGraph(screens, links, start="home")
+
+
+def login_app(users=("validUser",)) -> ScreenGraph:
+    """A login screen leading to a home screen the app reopens on until its data is cleared."""
+    return ScreenGraph({"login": LOGIN_SCREEN, "home": HOME_SCREEN},
+                       {"login": {f"{LOGIN_PACKAGE}:id/login_button": "home"}}, start="login",
+                       remembered={"home"}, deep_links={LOGIN_DEEP_LINK.format(user=user): "home" for user in users})
+
+
+def start_driver(server: FakeAppiumServer, platform: str = "Android", app_package: str = LOGIN_PACKAGE):
+    """
+    A session on the fake server, of the login app by default.
+
+    :param platform: platformName of the session ("Android" or "iOS").
+    :param app_package: Package of the app under test on Android.
+    """
+    options = AppiumOptions()
+    options.set_capability("platformName", platform)
+    if platform.lower() == "android":
+        options.set_capability("appium:appPackage", app_package)
+    return webdriver.Remote(server.url, options=options)
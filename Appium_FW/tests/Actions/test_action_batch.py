@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from Appium_FW.Utils.AppiumActions import AppiumActions
+from Appium_FW.Utils.Instrumentation import Instrumentation
+from Appium_FW.Utils.LocatorLoader import LocatorLoader
+from Appium_FW.Utils.WaitEngine import WaitEngine
+from Appium_FW.pages.LoginPage.login_page import LoginPage
+
+LOGIN_SCREEN = """<hierarchy>
+  <android.widget.EditText class="android.widget.EditText" content-desc="username" text="old" bounds="[0,0][1000,100]"/>
+  <android.widget.EditText class="android.widget.EditText" content-desc="password" text="" bounds="[0,100][1000,200]"/>
+  <android.widget.Button class="android.widget.Button" resource-id="com.example.android:id/login_button" bounds="[0,200][1000,300]" clickable="true"/>
+</hierarchy>"""
+KEYPAD_SCREEN = """<hierarchy>
+  <android.widget.Button class="android.widget.Button" content-desc="1" bounds="[0,0][100,100]" clickable="true"/>
+  <android.widget.Button class="android.widget.Button" content-desc="2" bounds="[100,0][200,100]" clickable="true"/>
+  <android.widget.Button class="android.widget.Button" content-desc="3" bounds="[200,0][300,100]" clickable="true"/>
+</hierarchy>"""
+
+
+@pytest.fixture
+def workdir(login_workdir):
+    (login_workdir / "keypad_locators.json").write_text(json.dumps({
+        key: {"android_locator": {"type": "accessibility_id", "value": key[-1]}}
+        for key in ("key_1", "key_2", "key_3", "key_4")}))
+    return login_workdir
+
+
+@pytest.mark.parametrize("platform, device_calls", [("Android", 6), ("iOS", 8)])
+def test_login_sets_each_field_with_one_command(workdir, fake_device, platform, device_calls):
+    server, driver = fake_device(platform, page_source=LOGIN_SCREEN)
+    page = LoginPage(driver)
+    page.actions.waits = WaitEngine()
+    server.command_counts.clear()
+    page.login("validUser", "validPassword123", batched=True)
+
+    session = next(iter(server.sessions.values()))
+    texts = [node.attrib.get("text") for node in session.hierarchy.root]
+    assert texts[:2] == ["validUser", "validPassword123"]
+    assert sum(server.command_counts.values()) == device_calls
+    assert ("POST /session/:session_id/element/:element_id/clear" in server.command_counts) == (platform == "iOS")
+
+
+def test_login_types_into_the_fields_unless_batched(workdir, fake_device):
+    server, driver = fake_device(page_source=LOGIN_SCREEN)
+    page = LoginPage(driver)
+    page.actions.waits = WaitEngine()
+    server.command_counts.clear()
+    page.login("validUser", "validPassword123")
+
+    session = next(iter(server.sessions.values()))
+    assert [node.attrib.get("text") for node in session.hierarchy.root][:2] == ["validUser", "validPassword123"]
+    assert server.command_counts["POST /session/:session_id/element/:element_id/value"] == 2
+    assert "POST /session/:session_id/execute/sync" not in server.command_counts
+
+
+def test_consecutive_gestures_go_out_as_one_actions_call(workdir, fake_device):
+    Instrumentation.reset()
+    Instrumentation.enable()
+    try:
+        server, driver = fake_device(page_source=KEYPAD_SCREEN)
+        actions = AppiumActions(driver, LocatorLoader(page="keypad"), wait_engine=WaitEngine())
+        server.command_counts.clear()
+        result = actions.batch("pin").tap("key_1").tap("key_2").tap("key_3").swipe("up").run()
+
+        session = next(iter(server.sessions.values()))
+        assert session.actions_performed == 1
+        taps = [action for action in session.last_actions[0]["actions"] if action["type"] == "pointerDown"]
+        assert len(taps) == 4  # Three taps and the swipe
+        # Page source, window size and the actions call
+        assert result["device_calls"] == sum(server.command_counts.values()) == 3
+        assert result["unbatched_calls"] == 7
+
+        # A target missing from the screen splits the run and is found on the device instead
+        with pytest.raises(Exception, match="key_4"):
+            actions.batch("pin").tap("key_1").tap("key_4").run(timeout=0)
+        assert session.actions_performed == 2
+        flows = Instrumentation.report()["flows"]
+        assert [(flow["flow"], flow["count"], flow["saved_calls"]) for flow in flows] == [("pin", 1, 4)]
+    finally:
+        Instrumentation.disable()
+        Instrumentation.reset()
+
+
+@pytest.mark.parametrize("gestures", [
+    lambda batch: batch.swipe("up"),
+    lambda batch: batch.tap("username_field").tap("password_field"),  # Tap points resolved from the snapshot
+], ids=["swipe", "taps"])
+def test_gestures_queued_before_a_fill_are_sent_first(workdir, fake_device, gestures):
+    server, driver = fake_device(page_source=LOGIN_SCREEN)
+    actions = AppiumActions(driver, LocatorLoader(page="login"), wait_engine=WaitEngine())
+    server.commands.clear()
+    gestures(actions.batch()).fill("username_field", "hello").run()
+
+    order = [command for command in server.commands if command in (
+        "POST /session/:session_id/actions", "POST /session/:session_id/element",
+        "POST /session/:session_id/execute/sync")]
+    assert order == ["POST /session/:session_id/actions", "POST /session/:session_id/element",
+                     "POST /session/:session_id/execute/sync"]
+
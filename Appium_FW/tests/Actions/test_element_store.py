@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from Appium_FW.Utils.AppiumActions import AppiumActions
+from Appium_FW.Utils.ElementStore import ElementStore
+from Appium_FW.Utils.LocatorLoader import LocatorLoader
+from Appium_FW.Utils.WaitEngine import WaitEngine
+
+# A list with two buttons, the second one half covered by a clickable banner drawn on top
+SCREEN = """<hierarchy>
+  <android.widget.FrameLayout class="android.widget.FrameLayout" bounds="[0,0][1000,2000]" clickable="false">
+    <android.view.ViewGroup class="android.view.ViewGroup" bounds="[0,0][1000,1800]" clickable="false">
+      <android.widget.Button class="android.widget.Button" content-desc="first" bounds="[100,100][500,300]" clickable="true">
+        <android.widget.TextView class="android.widget.TextView" text="First" bounds="[150,150][450,250]" clickable="false"/>
+      </android.widget.Button>
+      <android.widget.Button class="android.widget.Button" content-desc="second" bounds="[100,1500][500,1700]" clickable="true"/>
+    </android.view.ViewGroup>
+    <android.view.ViewGroup class="android.view.ViewGroup" content-desc="banner" bounds="[0,1600][1000,2000]" clickable="true"/>
+  </android.widget.FrameLayout>
+</hierarchy>"""
+
+
+@pytest.fixture
+def store():
+    return ElementStore(SCREEN, cell_size=64)
+
+
+def by_name(store, name):
+    return next(record for record in store.records if record.name == name)
+
+
+def test_point_queries_return_the_topmost_element(store):
+    assert store.element_at(200, 200).name == "First"
+    assert store.topmost_clickable_at(200, 200).name == "first"
+    assert store.topmost_clickable_at(200, 1650).name == "banner"
+    assert [record.name for record in store.elements_at(200, 200)] == ["", "", "first", "First"]
+
+
+def test_region_queries(store):
+    assert [record.name for record in store.within((0, 0, 600, 400))] == ["first", "First"]
+    assert [record.name for record in store.within((0, 1650, 1000, 1700), fully=False)] == ["", "", "second", "banner"]
+
+
+def test_occlusion_and_tap_point(store):
+    first, second = by_name(store, "first"), by_name(store, "second")
+    assert store.visible_fraction(first) == 1.0
+    assert store.occluders(second) == [by_name(store, "banner")]
+    assert store.visible_fraction(second) == pytest.approx(0.5)
+
+    x, y = store.tap_point(second)
+    assert y < 1600 and store.topmost_clickable_at(x, y) is second
+
+
+def test_tap_sends_a_single_action(workdir, fake_device):
+    (workdir / "list_locators.json").write_text(json.dumps({
+        "second": {"android_locator": {"type": "accessibility_id", "value": "second"}}}))
+    server, driver = fake_device(page_source=SCREEN)
+    actions = AppiumActions(driver, LocatorLoader(page="list"), use_snapshot=True, wait_engine=WaitEngine())
+    server.command_counts.clear()
+    assert actions.tap("second")[1] < 1600
+    session = next(iter(server.sessions.values()))
+    assert session.actions_performed == 1
+    assert set(server.command_counts) == {"GET /session/:session_id/source", "POST /session/:session_id/actions"}
+
+    # Without snapshot mode a tap is a plain click, with no page source pulled
+    actions.use_snapshot = False
+    server.command_counts.clear()
+    assert actions.tap("second") is None
+    assert set(server.command_counts) == {"POST /session/:session_id/element",
+                                          "POST /session/:session_id/element/:element_id/click"}
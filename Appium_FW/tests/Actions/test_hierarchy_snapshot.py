@@ -0,0 +1,39 @@
+import os
+
+import pytest
+from appium.webdriver.common.appiumby import AppiumBy
+
+from Appium_FW.Utils.HierarchySnapshot import HierarchySnapshot, UnsupportedLocatorError
+
+SCREEN_SOURCE = os.path.join(os.path.dirname(__file__), "..", "..", "Utils", "screen_source.xml")
+
+
+@pytest.fixture(scope="module")
+def snapshot():
+    with open(SCREEN_SOURCE, "r", encoding="utf-8") as file:
+        return HierarchySnapshot(file.read())
+
+
+def test_xpath_is_evaluated_locally(snapshot):
+    nodes = snapshot.find_all(AppiumBy.XPATH, "//android.widget.TextView[@content-desc='test-Item title']")
+    assert [snapshot.text(node) for node in nodes] == ["Sauce Labs Backpack", "Sauce Labs Bike Light"]
+
+
+def test_id_without_package_prefix(snapshot):
+    assert snapshot.find(AppiumBy.ID, "action_bar_root") is not None
+
+
+def test_device_locator_prefers_unique_accessibility_id(snapshot):
+    node = snapshot.find(AppiumBy.XPATH, "//*[@content-desc='test-Menu']")
+    assert snapshot.device_locator(node) == (AppiumBy.ACCESSIBILITY_ID, "test-Menu")
+
+
+def test_device_locator_falls_back_to_a_uiselector_instance(snapshot):
+    node = snapshot.find(AppiumBy.ACCESSIBILITY_ID, "test-Item")
+    assert snapshot.device_locator(node) == (AppiumBy.ANDROID_UIAUTOMATOR,
+                                             'new UiSelector().description("test-Item").instance(0)')
+
+
+def test_unsupported_xpath_is_reported(snapshot):
+    with pytest.raises(UnsupportedLocatorError):
+        snapshot.find_all(AppiumBy.XPATH, "//*[contains(@text,'Backpack')]")
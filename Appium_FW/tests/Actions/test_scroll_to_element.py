@@ -0,0 +1,82 @@
+import json
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from Appium_FW.Utils.AppiumActions import AppiumActions
+from Appium_FW.Utils.LocatorLoader import LocatorLoader
+from Appium_FW.Utils.WaitEngine import WaitEngine
+
+SOURCE = "GET /session/:session_id/source"
+
+
+def list_page(first: int) -> str:
+    items = "".join(f'<android.widget.TextView class="android.widget.TextView" content-desc="item_{number}" '
+                    f'bounds="[0,{100 * row}][1000,{100 * row + 100}]"/>'
+                    for row, number in enumerate(range(first, first + 3)))
+    return (f'<hierarchy><android.widget.ScrollView class="android.widget.ScrollView" scrollable="true" '
+            f'bounds="[0,0][1000,300]">{items}</android.widget.ScrollView></hierarchy>')
+
+
+PAGES = [list_page(first) for first in (0, 3, 6)]  # item_0 .. item_8 over three pages
+
+
+@pytest.fixture
+def actions(workdir, fake_device):
+    locators = {name: {"android_locator": {"type": "accessibility_id", "value": name}}
+                for name in ("item_1", "item_7", "item_9")}
+    # Not expressible as a UiSelector: always searched step by step
+    locators["nested_item_7"] = {"android_locator": {
+        "type": "xpath", "value": "//android.widget.ScrollView/android.widget.TextView[@content-desc='item_7']"}}
+    locators["nested_item_9"] = {"android_locator": {
+        "type": "xpath", "value": "//android.widget.ScrollView/android.widget.TextView[@content-desc='item_9']"}}
+    (workdir / "list_locators.json").write_text(json.dumps(locators))
+    server, driver = fake_device(scroll_pages=PAGES)
+    server.command_counts.clear()
+    return AppiumActions(driver, LocatorLoader(page="list"), wait_engine=WaitEngine()), server
+
+
+def session(server):
+    return next(iter(server.sessions.values()))
+
+
+def test_forward_search_is_a_single_uiscrollable_command(actions):
+    actions, server = actions
+    element = actions.scroll_to_element("item_7", direction="up")
+    assert element.get_attribute("content-desc") == "item_7"
+    assert session(server).scroll_position == 2
+    assert SOURCE not in server.command_counts  # No step by step fallback
+
+
+def test_forward_miss_does_not_search_again_step_by_step(actions):
+    actions, server = actions
+    with pytest.raises(TimeoutException, match="item_9"):
+        actions.scroll_to_element("item_9", max_swipes=5, direction="up")
+    assert session(server).scrolls == 2  # To the end of the list once
+    assert SOURCE not in server.command_counts
+
+
+def test_native_search_honours_max_swipes(actions):
+    actions, server = actions
+    with pytest.raises(TimeoutException):
+        actions.scroll_to_element("item_7", max_swipes=1, direction="up")
+    assert session(server).scroll_position == 1
+
+
+def test_step_by_step_search_scrolls_the_way_it_was_asked(actions):
+    actions, server = actions
+    element = actions.scroll_to_element("nested_item_7", direction="up")
+    assert element.get_attribute("content-desc") == "item_7"
+    assert session(server).scrolls == 2
+
+    # Swiping down goes back toward the start of the list
+    assert actions.scroll_to_element("item_1", direction="down").get_attribute("content-desc") == "item_1"
+    assert session(server).scroll_position == 0
+
+
+def test_step_by_step_search_stops_at_the_end_of_the_list(actions):
+    actions, server = actions
+    with pytest.raises(TimeoutException, match="after 2 swipes"):
+        actions.scroll_to_element("nested_item_9", max_swipes=10, direction="up")
+    assert session(server).scrolls == 2
+    assert server.command_counts[SOURCE] == 3  # One page source per page, none after the end
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+from appium.webdriver.common.appiumby import AppiumBy
+
+from Appium_FW.Utils.AppiumActions import AppiumActions
+from Appium_FW.Utils.LocatorLoader import LocatorLoader
+from Appium_FW.Utils.WaitEngine import WaitEngine
+
+SOURCE = "GET /session/:session_id/source"
+FIND = "POST /session/:session_id/element"
+
+SCREEN = """<hierarchy>
+  <android.widget.FrameLayout class="android.widget.FrameLayout" bounds="[0,0][1000,2000]">
+    <android.widget.TextView class="android.widget.TextView" resource-id="app:id/title" text="Products"
+        bounds="[0,0][1000,100]"/>
+    <android.widget.EditText class="android.widget.EditText" resource-id="app:id/search" text=""
+        bounds="[0,100][1000,200]"/>
+    <android.widget.TextView class="android.widget.TextView" content-desc="price" text="$9.99"
+        bounds="[0,200][1000,300]"/>
+    <android.widget.TextView class="android.widget.TextView" content-desc="price" text="$29.99"
+        bounds="[0,300][1000,400]"/>
+  </android.widget.FrameLayout>
+</hierarchy>"""
+
+LOCATORS = {
+    "title": {"android_locator": {"type": "id", "value": "app:id/title"}},
+    "search": {"android_locator": {"type": "id", "value": "app:id/search"}},
+    "second_price": {"android_locator": {
+        "type": "xpath", "value": "//android.widget.TextView[@text='$29.99']"}},
+    # Not evaluated locally: read on the device
+    "first_price": {"android_locator": {"type": "android_uiautomator", "value": 'new UiSelector().text("$9.99")'}},
+}
+
+
+@pytest.fixture
+def actions(workdir, fake_device):
+    (workdir / "shop_locators.json").write_text(json.dumps(LOCATORS))
+    server, driver = fake_device(page_source=SCREEN)
+    actions = AppiumActions(driver, LocatorLoader(page="shop"), use_snapshot=True, wait_engine=WaitEngine())
+    server.command_counts.clear()
+    return actions, server
+
+
+@pytest.mark.parametrize("action", [
+    lambda actions: actions.click("title"),
+    lambda actions: actions.input_text("search", "bike"),
+    lambda actions: actions.swipe("up"),
+    lambda actions: actions.switch_to_context("NATIVE_APP"),
+], ids=["click", "input_text", "swipe", "switch_to_context"])
+def test_actions_changing_the_screen_drop_the_snapshot(actions, action):
+    actions, server = actions
+    assert actions.get_text("title") == "Products"
+    assert actions.get_text("title") == "Products"
+    assert server.command_counts[SOURCE] == 1  # Both reads answered by the same snapshot
+
+    action(actions)
+    assert actions._snapshot is None
+    actions.get_text("title")
+    assert server.command_counts[SOURCE] == 2
+
+
+def test_get_texts_reads_one_snapshot_and_only_misses_on_the_device(actions):
+    actions, server = actions
+    texts = actions.get_texts(["second_price", "title", "first_price"])
+    assert texts == {"second_price": "$29.99", "title": "Products", "first_price": "$9.99"}
+    assert list(texts) == ["second_price", "title", "first_price"]
+    assert server.command_counts[SOURCE] == 1
+    assert server.command_counts[FIND] == 1  # first_price only
+
+
+def test_duplicates_are_found_on_the_device_by_uiselector_instance(actions):
+    actions, server = actions
+    node = actions.find_in_snapshot("second_price")
+    assert actions.snapshot.device_locator(node) == (
+        AppiumBy.ANDROID_UIAUTOMATOR, 'new UiSelector().description("price").instance(1)')
+    element = actions.find_element("second_price")
+    assert element.text == "$29.99"
+    assert server.command_counts[FIND] == 1
@@ -0,0 +1,108 @@
+import json
+import os
+import time
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+
+from Appium_FW.Utils.WaitEngine import STATS_ENV, LatencyStats, WaitEngine
+
+
+def test_condition_already_met_returns_without_sleeping():
+    start = time.monotonic()
+    assert WaitEngine().until(lambda: "element") == "element"
+    assert time.monotonic() - start < 0.05
+
+
+def test_polling_starts_fast_and_backs_off():
+    calls = []
+
+    def condition():
+        calls.append(time.monotonic())
+        if len(calls) < 4:
+            raise NoSuchElementException()
+        return True
+
+    WaitEngine(initial_poll=0.005, backoff=2).until(condition, timeout=1)
+
+    assert calls[-1] - calls[0] < 0.2
+
+
+def test_timeout_is_learned_from_history(tmp_path):
+    stats = LatencyStats(str(tmp_path / "latency.json"))
+    engine = WaitEngine(stats=stats, default_timeout=10, min_samples=3, safety_factor=3, min_timeout=1)
+    assert engine.timeout_for("login:username_field") == 10
+
+    for _ in range(3):
+        engine.until(lambda: True, key="login:username_field")
+    stats.samples["login:username_field"] = [0.4, 0.5, 0.6]
+
+    assert engine.timeout_for("login:username_field") == pytest.approx(1.8)
+
+
+def test_stats_persist_between_runs(tmp_path):
+    stats = LatencyStats(str(tmp_path / "latency.json"))
+    stats.record("login:login_button", 0.25)
+    stats.save()
+
+    assert LatencyStats(str(tmp_path / "latency.json")).samples == {"login:login_button": [0.25]}
+
+
+def test_a_timed_out_learned_wait_widens_the_timeout(tmp_path):
+    stats = LatencyStats(str(tmp_path / "latency.json"))
+    engine = WaitEngine(stats=stats, default_timeout=0.2, min_samples=3, safety_factor=3, min_timeout=0.01)
+    stats.samples["login:username_field"] = [0.01, 0.01, 0.01]
+    assert engine.timeout_for("login:username_field") == pytest.approx(0.03)
+
+    start = time.monotonic()
+    with pytest.raises(TimeoutException):
+        engine.until(lambda: False, key="login:username_field")
+    assert time.monotonic() - start >= 0.2  # Failed only after the default timeout
+    assert engine.timeout_for("login:username_field") == pytest.approx(0.09)
+
+    # A wait given an explicit timeout says nothing about the learned one
+    with pytest.raises(TimeoutException):
+        engine.until(lambda: False, key="login:username_field", timeout=0.5)
+    assert engine.timeout_for("login:username_field") == pytest.approx(0.09)
+
+    stats.save()
+    assert LatencyStats(str(tmp_path / "latency.json")).timeouts == {"login:username_field": 0.03}
+
+
+def test_a_too_short_learned_timeout_falls_back_to_the_default(tmp_path):
+    stats = LatencyStats(str(tmp_path / "latency.json"))
+    engine = WaitEngine(stats=stats, default_timeout=2, min_samples=3, safety_factor=3, min_timeout=0.01)
+    stats.samples["cart:checkout"] = [0.01, 0.01, 0.01]
+    appears_at = time.monotonic() + 0.1  # Well past the learned 0.03 s
+
+    assert engine.until(lambda: time.monotonic() >= appears_at, key="cart:checkout") is True
+    assert stats.timeouts == {"cart:checkout": 0.03}
+    assert stats.samples["cart:checkout"][-1] >= 0.1
+
+
+def test_stats_files_without_timeouts_still_load(tmp_path):
+    (tmp_path / "latency.json").write_text(json.dumps({"login:login_button": [0.25]}))
+    assert LatencyStats(str(tmp_path / "latency.json")).samples == {"login:login_button": [0.25]}
+
+
+def test_shared_engine_persists_only_when_asked(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv(STATS_ENV, raising=False)
+    monkeypatch.setattr(WaitEngine, "_shared", None)
+    WaitEngine.shared().until(lambda: True, key="login:login_button")
+    WaitEngine.shared().stats.save()
+    assert os.listdir(tmp_path) == []
+
+    engine = WaitEngine.configure(str(tmp_path / "artifacts" / "latency.json"))
+    engine.until(lambda: True, key="login:login_button")
+    engine.stats.save()
+    assert os.listdir(tmp_path / "artifacts") == ["latency.json"]
+
+
+def test_negative_check_does_not_wait_for_the_timeout():
+    start = time.monotonic()
+    assert WaitEngine().until_not(lambda: ["still there"]) is False
+    assert time.monotonic() - start < 0.05
+
+    with pytest.raises(TimeoutException):
+        WaitEngine().until(lambda: False, timeout=0)
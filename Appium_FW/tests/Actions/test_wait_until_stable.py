@@ -0,0 +1,56 @@
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from Appium_FW.Utils.AppiumActions import AppiumActions
+from Appium_FW.Utils.HierarchySnapshot import HierarchySnapshot
+from Appium_FW.Utils.WaitEngine import WaitEngine
+
+SCREEN = ('<hierarchy><node text="{text}" focused="{focused}" resource-id="app:id/title"/>'
+          '<node text="{clock}" resource-id="app:id/clock"/></hierarchy>')
+
+
+class ScriptedDriver:
+    """Serves the given page sources in order, then keeps serving the last one."""
+
+    def __init__(self, page_sources):
+        self.page_sources = list(page_sources)
+        self.pulls = 0
+
+    @property
+    def page_source(self):
+        self.pulls += 1
+        return self.page_sources[min(self.pulls, len(self.page_sources)) - 1]
+
+
+def screen(text="Products", focused="false", clock="9:41"):
+    return SCREEN.format(text=text, focused=focused, clock=clock)
+
+
+def actions_for(driver):
+    return AppiumActions(driver, locator_loader=None, wait_engine=WaitEngine(initial_poll=0.001))
+
+
+def test_returns_once_the_render_has_settled():
+    driver = ScriptedDriver([screen("Loading"), screen("Loading."), screen("Products")])
+    fingerprint = actions_for(driver).wait_until_stable(consecutive=3, timeout=1)
+    assert driver.pulls == 5
+    assert fingerprint == HierarchySnapshot.fast_fingerprint(screen("Products"))
+
+
+def test_focus_changes_and_ticking_clock_do_not_count_as_changes():
+    driver = ScriptedDriver([screen(focused="true", clock="9:41"), screen(focused="false", clock="9:42")])
+    actions_for(driver).wait_until_stable(timeout=1)
+    assert driver.pulls == 2
+
+
+def test_clock_like_values_count_outside_displayed_texts():
+    assert HierarchySnapshot.fast_fingerprint('<node text="Ends 9:41"/>') == \
+        HierarchySnapshot.fast_fingerprint('<node text="Ends 9:42"/>')
+    assert HierarchySnapshot.fast_fingerprint('<node resource-id="app:id/slot" tag="9:41"/>') != \
+        HierarchySnapshot.fast_fingerprint('<node resource-id="app:id/slot" tag="9:42"/>')
+
+
+def test_screen_that_keeps_changing_times_out():
+    driver = ScriptedDriver([screen(text=str(i)) for i in range(10000)])
+    with pytest.raises(TimeoutException):
+        actions_for(driver).wait_until_stable(timeout=0.05)
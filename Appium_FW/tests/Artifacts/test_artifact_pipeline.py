@@ -0,0 +1,111 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+
+import pytest
+from appium import webdriver
+from appium.options.common import AppiumOptions
+
+from Appium_FW.Utils.AppiumActions import AppiumActions
+from Appium_FW.Utils.ArtifactPipeline import ArtifactPipeline, ArtifactStore
+from Appium_FW.Utils.WaitEngine import WaitEngine
+from Appium_FW.testing.FakeAppiumServer import FakeAppiumServer
+
+SCREEN_SOURCE = os.path.join(os.path.dirname(__file__), "..", "..", "Utils", "screen_source.xml")
+
+
+@pytest.fixture(scope="module")
+def driver():
+    with open(SCREEN_SOURCE, "r", encoding="utf-8") as file:
+        page_source = file.read()
+    with FakeAppiumServer(page_source=page_source) as server:
+        options = AppiumOptions()
+        options.set_capability("platformName", "Android")
+        driver = webdriver.Remote(server.url, options=options)
+        yield driver
+        driver.quit()
+
+
+def read_manifest(directory):
+    with open(os.path.join(directory, "manifest.jsonl"), "r", encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+
+def test_identical_screens_are_stored_once(tmp_path, driver):
+    pipeline = ArtifactPipeline(ArtifactStore(str(tmp_path)))
+    for test in ("test_a", "test_b"):
+        pipeline.capture(driver, test)
+    pipeline.flush()
+
+    manifest = read_manifest(str(tmp_path))
+    assert sorted((entry["test"], entry["kind"]) for entry in manifest) == [
+        ("test_a", "page_source"), ("test_a", "screenshot"), ("test_b", "page_source"), ("test_b", "screenshot")]
+    assert pipeline.stats["objects_written"] == 2 and pipeline.stats["deduplicated"] == 2
+
+    source = next(entry for entry in manifest if entry["kind"] == "page_source")
+    path = pipeline.store.object_path(source["sha256"], "xml")
+    with gzip.open(path, "rb") as file:
+        assert file.read() == driver.page_source.encode("utf-8")
+
+
+def test_a_failed_write_is_not_taken_for_a_stored_object(tmp_path, monkeypatch):
+    store = ArtifactStore(str(tmp_path))
+    replace = os.replace
+
+    def full_disk(source, destination):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(os, "replace", full_disk)
+    with pytest.raises(OSError):
+        store.put(b"screen", "png")
+    assert not os.listdir(os.path.dirname(store.object_path(hashlib.sha256(b"screen").hexdigest(), "png")))
+
+    monkeypatch.setattr(os, "replace", replace)
+    stored = store.put(b"screen", "png")
+    assert not stored["deduplicated"] and store.read(stored["sha256"], "png") == b"screen"
+    assert store.put(b"screen", "png")["deduplicated"]
+
+
+def test_sampling_only_adds_passing_tests(tmp_path):
+    assert ArtifactPipeline(ArtifactStore(str(tmp_path))).should_capture(failed=True)
+    never = ArtifactPipeline(ArtifactStore(str(tmp_path)), sample_rate=0.0)
+    assert not any(never.should_capture(failed=False) for _ in range(100))
+    sampled = ArtifactPipeline(ArtifactStore(str(tmp_path)), sample_rate=0.5, seed=1)
+    assert 30 < sum(sampled.should_capture(failed=False) for _ in range(100)) < 70
+
+
+def test_failed_fetch_is_counted_not_raised(tmp_path):
+    class BrokenDriver:
+        page_source = property(lambda self: (_ for _ in ()).throw(RuntimeError("session gone")))
+
+        def get_screenshot_as_png(self):
+            raise RuntimeError("session gone")
+
+    pipeline = ArtifactPipeline(ArtifactStore(str(tmp_path)))
+    pipeline.capture(BrokenDriver(), "test_broken")
+    pipeline.flush()
+    assert pipeline.stats["errors"] == 2
+    assert not os.path.exists(os.path.join(str(tmp_path), "manifest.jsonl"))
+
+
+def test_screenshot_is_taken_before_returning(tmp_path, driver, monkeypatch):
+    screens = iter([b"screen at the call", b"a later screen", b"the last screen"])
+    monkeypatch.setattr(driver, "get_screenshot_as_png", lambda: next(screens))
+    pipeline = ArtifactPipeline.configure(str(tmp_path), max_workers=1)
+    release = threading.Event()
+    pipeline.run(release.wait)  # Keeps the only worker busy: the write cannot start yet
+    actions = AppiumActions(driver, locator_loader=None, wait_engine=WaitEngine())
+
+    file_path = str(tmp_path / "screen.png")
+    pending = actions.capture_screenshot(file_path)
+    assert not pending.done()
+    driver.get_screenshot_as_png()  # The screen moves on before the write runs
+    release.set()
+    pipeline.flush()
+    with open(file_path, "rb") as file:
+        assert file.read() == b"screen at the call"
+
+    actions.capture_screenshot(str(tmp_path / "now.png"), asynchronous=False)
+    assert os.path.exists(str(tmp_path / "now.png"))
@@ -0,0 +1,53 @@
+import json
+import os
+
+from Appium_FW.Utils.AppCrawler import AppCrawler
+from Appium_FW.Utils.LocatorLoader import LocatorLoader
+from Appium_FW.testing.FakeAppiumServer import FakeAppiumServer
+from Appium_FW.testing.SampleApps import SHOP_PACKAGE, build_screen_graph, start_driver
+
+
+def crawl(graph, output_dir, **kwargs):
+    with FakeAppiumServer(graph=graph) as server:
+        driver = start_driver(server, app_package=SHOP_PACKAGE)
+        try:
+            return AppCrawler(driver, output_dir, max_states=2 * len(graph.screens), settle_ms=0, **kwargs).crawl()
+        finally:
+            driver.quit()
+
+
+def test_every_element_is_tapped_by_default(tmp_path):
+    graph = build_screen_graph(sections=2, items=3)
+    result = crawl(graph, str(tmp_path))
+
+    assert result["states"] == len(graph.screens) == 9
+    assert result["reused"] == 0
+    # Every element of every screen was tapped: 3 tabs each, plus 1, 3 and 2 buttons on home, sections and details
+    assert result["transitions"] + result["pruned"] == 9 * 3 + 1 + 2 * 3 + 6 * 2
+
+
+def test_crawl_discovers_every_screen_once(tmp_path):
+    graph = build_screen_graph(sections=2, items=3)
+    result = crawl(graph, str(tmp_path), reuse_transitions=True)
+
+    assert result["states"] == len(graph.screens) == 9
+    assert result["pruned"] >= 1  # "favorite" does nothing
+    assert result["reused"] > 0  # The tab bar is only tapped on the first screens
+    assert result["states_per_minute"] > 0
+
+    crawl_map = json.loads((tmp_path / "crawl_map.json").read_text())
+    fingerprints = [state["fingerprint"] for state in crawl_map["states"]]
+    assert len(set(fingerprints)) == len(fingerprints)
+    assert [state["depth"] for state in crawl_map["states"]][:3] == [0, 1, 1]  # Breadth first
+    assert {"from": "screen_000", "action": "section_0", "to": "screen_001"}.items() <= \
+        crawl_map["transitions"][0].items()
+
+
+def test_every_screen_gets_a_loadable_locator_file(workdir):
+    crawl(build_screen_graph(sections=1, items=2), str(workdir))
+
+    names = sorted(name for name in os.listdir(workdir) if name.endswith("_locators.json"))
+    assert names == ["screen_000_locators.json", "screen_001_locators.json",
+                     "screen_002_locators.json", "screen_003_locators.json"]
+    locators = LocatorLoader(page="screen_001")
+    assert locators.get_locator("item_0_0") == {"type": "id", "value": "com.example.shop:id/item_0"}
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from selenium.common.exceptions import NoSuchElementException
+
+from Appium_FW.Utils.AsyncAppiumActions import AsyncAppiumActions, AsyncRunner, SyncActionsAdapter
+from Appium_FW.Utils.AsyncAppiumClient import AsyncAppiumClient
+from Appium_FW.Utils.LocatorLoader import LocatorLoader
+from Appium_FW.Utils.WaitEngine import WaitEngine
+from Appium_FW.pages.LoginPage.login_page import LoginPage
+from Appium_FW.testing.FakeAppiumServer import FakeAppiumServer
+from Appium_FW.testing.SampleApps import LOGIN_SCREEN
+
+CAPABILITIES = {"platformName": "Android", "appium:automationName": "UiAutomator2"}
+
+
+def test_one_loop_drives_many_sessions_concurrently(login_workdir):
+    async def flow(client, server, index):
+        session = await client.create_session(server.url, CAPABILITIES)
+        actions = AsyncAppiumActions(session, LocatorLoader(page="login"), wait_engine=WaitEngine())
+        await actions.input_text("username_field", f"user{index}")
+        await actions.click("login_button")
+        texts = await actions.get_texts(["username_field", "password_field"])
+        await session.quit()
+        return texts
+
+    async def main(server):
+        async with AsyncAppiumClient(limit=8) as client:
+            return await asyncio.gather(*(flow(client, server, index) for index in range(20)))
+
+    with FakeAppiumServer(page_source=LOGIN_SCREEN, latency=0.02) as server:
+        results = asyncio.run(main(server))
+        assert server.sessions_created == 20 and not server.sessions
+    assert results[7] == {"username_field": "user7", "password_field": ""}
+
+
+def test_w3c_errors_raise_selenium_exceptions(login_workdir):
+    async def main(server):
+        async with AsyncAppiumClient() as client:
+            session = await client.create_session(server.url, CAPABILITIES)
+            with pytest.raises(NoSuchElementException):
+                await session.find_element("accessibility id", "missing")
+
+    with FakeAppiumServer(page_source=LOGIN_SCREEN) as server:
+        asyncio.run(main(server))
+
+
+def test_login_page_runs_on_the_async_backend(login_workdir):
+    runner = AsyncRunner()
+    client = AsyncAppiumClient()
+    try:
+        with FakeAppiumServer(page_source=LOGIN_SCREEN) as server:
+            session = runner.run(client.create_session(server.url, CAPABILITIES))
+            actions = SyncActionsAdapter(AsyncAppiumActions(session, LocatorLoader(page="login"),
+                                                            wait_engine=WaitEngine()), runner)
+            LoginPage(None, actions=actions).login("validUser", "validPassword123", wait_until_stable=True)
+
+            assert actions.get_text("password_field") == "validPassword123"
+            assert server.command_counts["POST /session/:session_id/element/:element_id/click"] == 1
+            assert server.command_counts["GET /session/:session_id/source"] >= 2  # Waited for the screen to settle
+    finally:
+        runner.run(client.close())
+        runner.close()
+
+
+def test_login_page_checks_and_limits_on_the_async_backend(login_workdir):
+    runner = AsyncRunner()
+    client = AsyncAppiumClient()
+    try:
+        with FakeAppiumServer(page_source=LOGIN_SCREEN) as server:
+            session = runner.run(client.create_session(server.url, CAPABILITIES))
+            actions = SyncActionsAdapter(AsyncAppiumActions(session, LocatorLoader(page="login"),
+                                                            wait_engine=WaitEngine()), runner)
+            page = LoginPage(None, actions=actions)
+
+            assert page.is_logged_in(timeout=1) is False  # The login form shows
+            with pytest.raises(NotImplementedError, match="Batched actions"):
+                page.login("validUser", "validPassword123", batched=True)
+            assert "POST /session/:session_id/element/:element_id/value" not in server.command_counts
+            with pytest.raises(ValueError, match="WebDriver"):
+                page.ensure_logged_in("validUser", "validPassword123")
+    finally:
+        runner.run(client.close())
+        runner.close()
@@ -0,0 +1,135 @@
+import os
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from Appium_FW.Utils.AuthSnapshots import AuthSnapshots
+from Appium_FW.Utils.WaitEngine import WaitEngine
+from Appium_FW.pages.LoginPage.login_page import LoginPage
+from Appium_FW.testing.FakeAppiumServer import FakeAppiumServer, ScreenGraph
+from Appium_FW.testing.SampleApps import HOME_SCREEN, LOGIN_DEEP_LINK, LOGIN_PACKAGE, login_app, start_driver
+
+
+@pytest.fixture
+def server():
+    with FakeAppiumServer(graph=login_app(users=("alice",))) as fake_server:
+        yield fake_server
+
+
+def ensure(driver, user, snapshots):
+    page = LoginPage(driver)
+    page.actions.waits = WaitEngine()
+    return page.ensure_logged_in(user, "secret", snapshots)
+
+
+def test_logged_in_session_is_reused_after_an_app_restart(server, tmp_path):
+    snapshots = AuthSnapshots(str(tmp_path))
+    driver = start_driver(server)
+    try:
+        assert ensure(driver, "alice", snapshots) == "ui_login"
+        driver.terminate_app(LOGIN_PACKAGE)
+        driver.activate_app(LOGIN_PACKAGE)
+        server.command_counts.clear()
+        assert ensure(driver, "alice", snapshots) == "session"
+        assert sum(server.command_counts.values()) == 1  # Only the logged-in check
+
+        # Another user is never handed the session of the first one
+        assert ensure(driver, "bob", snapshots) == "ui_login"
+    finally:
+        driver.quit()
+
+
+def test_app_data_is_restored_in_a_new_session_of_the_same_build(server, tmp_path):
+    snapshots = AuthSnapshots(str(tmp_path), strategies=("app_data",), build="1.0")
+    for expected in ("ui_login", "app_data"):
+        driver = start_driver(server)
+        try:
+            assert ensure(driver, "alice", snapshots) == expected
+        finally:
+            driver.quit()
+    assert len(os.listdir(tmp_path)) == 1
+
+    snapshots.build = "1.1"
+    driver = start_driver(server)
+    try:
+        assert ensure(driver, "alice", snapshots) == "ui_login"  # A new build never gets old data
+    finally:
+        driver.quit()
+    assert os.listdir(tmp_path) == [f"{snapshots.cache_key('alice', '1.1')}.json"]  # The stale one is gone
+
+
+def test_deep_link_logs_in_without_the_form(server, tmp_path):
+    snapshots = AuthSnapshots(str(tmp_path), strategies=("deep_link",), deep_link=LOGIN_DEEP_LINK)
+    driver = start_driver(server)
+    try:
+        assert ensure(driver, "alice", snapshots) == "deep_link"
+        assert ensure(driver, "bob", snapshots) == "ui_login"  # No deep link for bob in the fake app
+    finally:
+        driver.quit()
+
+
+def record_scripts(driver, monkeypatch, failing=()):
+    scripts = []
+    execute_script = driver.execute_script
+
+    def recording(script, *args):
+        scripts.append(script)
+        if script in failing:
+            raise WebDriverException(f"{script} is not allowed")
+        return execute_script(script, *args)
+    monkeypatch.setattr(driver, "execute_script", recording)
+    return scripts
+
+
+def test_app_data_uses_the_app_container_paths(server, tmp_path, monkeypatch):
+    snapshots = AuthSnapshots(str(tmp_path), strategies=("app_data",), build="1.0")
+    driver = start_driver(server)
+    try:
+        scripts = record_scripts(driver, monkeypatch)
+        assert ensure(driver, "alice", snapshots) == "ui_login"
+        assert "mobile: pullFolder" in scripts  # The fake refuses direct /data/data/ paths
+    finally:
+        driver.quit()
+    assert snapshots._app_data_supported
+
+
+def test_failing_clear_app_falls_back_to_the_ui_login(server, tmp_path, monkeypatch):
+    snapshots = AuthSnapshots(str(tmp_path), strategies=("app_data",), build="1.0")
+    driver = start_driver(server)
+    try:
+        assert ensure(driver, "alice", snapshots) == "ui_login"
+    finally:
+        driver.quit()
+
+    driver = start_driver(server)
+    try:
+        record_scripts(driver, monkeypatch, failing=("mobile: clearApp",))
+        assert ensure(driver, "alice", snapshots) == "ui_login"
+    finally:
+        driver.quit()
+
+
+def test_deep_link_clears_the_login_of_another_user(tmp_path, monkeypatch):
+    with FakeAppiumServer(graph=login_app(users=("alice", "bob"))) as server:
+        snapshots = AuthSnapshots(str(tmp_path), strategies=("deep_link",), deep_link=LOGIN_DEEP_LINK)
+        driver = start_driver(server)
+        try:
+            scripts = record_scripts(driver, monkeypatch)
+            assert ensure(driver, "alice", snapshots) == "deep_link"
+            assert "mobile: clearApp" not in scripts
+            assert ensure(driver, "bob", snapshots) == "deep_link"
+            assert scripts[-3:] == ["mobile: clearApp", "mobile: activateApp", "mobile: deepLink"]
+        finally:
+            driver.quit()
+
+
+def test_a_screen_without_the_home_marker_is_not_logged_in():
+    splash = HOME_SCREEN.replace("welcome", "splash")
+    with FakeAppiumServer(graph=ScreenGraph({"splash": splash}, {}, start="splash")) as server:
+        driver = start_driver(server)
+        try:
+            page = LoginPage(driver)
+            page.actions.waits = WaitEngine()
+            assert not page.is_logged_in(timeout=0.05)  # No login form either, yet not logged in
+        finally:
+            driver.quit()
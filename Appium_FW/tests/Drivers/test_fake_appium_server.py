@@ -0,0 +1,43 @@
+import os
+
+import pytest
+from appium import webdriver
+from appium.options.common import AppiumOptions
+from appium.webdriver.common.appiumby import AppiumBy
+from selenium.common.exceptions import NoSuchElementException
+
+from Appium_FW.testing.FakeAppiumServer import FakeAppiumServer
+
+SCREEN_SOURCE = os.path.join(os.path.dirname(__file__), "..", "..", "Utils", "screen_source.xml")
+
+
+@pytest.fixture(scope="module")
+def driver():
+    with open(SCREEN_SOURCE, "r", encoding="utf-8") as file:
+        page_source = file.read()
+    with FakeAppiumServer(page_source=page_source) as server:
+        options = AppiumOptions()
+        options.set_capability("platformName", "Android")
+        driver = webdriver.Remote(server.url, options=options)
+        yield driver
+        driver.quit()
+
+
+def test_recorded_elements_are_served(driver):
+    titles = driver.find_elements(AppiumBy.XPATH, "//android.widget.TextView[@content-desc='test-Item title']")
+    assert [title.text for title in titles] == ["Sauce Labs Backpack", "Sauce Labs Bike Light"]
+    assert driver.find_element(AppiumBy.ACCESSIBILITY_ID, "test-Menu").get_attribute("className") == \
+        "android.view.ViewGroup"
+
+
+def test_typed_text_shows_in_page_source(driver):
+    element = driver.find_element(AppiumBy.ACCESSIBILITY_ID, "test-Price")
+    element.clear()
+    element.send_keys("typed")
+    assert element.text == "typed"
+    assert 'text="typed"' in driver.page_source
+
+
+def test_missing_element_raises(driver):
+    with pytest.raises(NoSuchElementException):
+        driver.find_element(AppiumBy.ID, "does_not_exist")
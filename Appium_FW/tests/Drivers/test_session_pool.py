@@ -0,0 +1,103 @@
+import threading
+
+import pytest
+
+from Appium_FW.Utils.DriverManager import DriverManager
+from Appium_FW.Utils.SessionPool import SessionPool
+from Appium_FW.testing.FakeAppiumServer import FakeAppiumServer
+
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_called = False
+        self.resets = 0
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def fake_server():
+    with FakeAppiumServer() as server:
+        yield server
+
+
+@pytest.fixture
+def driver_manager(fake_server, monkeypatch):
+    monkeypatch.setattr(DriverManager, "_config", {
+        "device_type": "android",
+        "appium_server": fake_server.url,
+        "devices": [{"udid": "device-1"}, {"udid": "device-2"}],
+        "android": {"platformName": "Android", "automationName": "UiAutomator2",
+                    "appPackage": "com.swaglabsmobileapp"},
+    })
+    monkeypatch.setattr(DriverManager, "_pool", None)
+    yield DriverManager
+    DriverManager.shutdown()
+
+
+def test_released_session_is_reused_after_reset():
+    created = []
+    pool = SessionPool(create_session=lambda key: created.append(FakeDriver()) or created[-1],
+                       reset_session=lambda driver: setattr(driver, "resets", driver.resets + 1))
+    key = ("http://localhost:4723", "device-1", None)
+
+    first = pool.lease(key)
+    pool.release(first)
+    second = pool.lease(key)
+
+    assert second is first
+    assert len(created) == 1
+    assert second.driver.resets == 1
+
+
+def test_unhealthy_session_is_evicted():
+    def health_check(driver):
+        raise ConnectionError("session gone")
+
+    pool = SessionPool(create_session=lambda key: FakeDriver(), health_check=health_check)
+    key = ("http://localhost:4723", "device-1", None)
+    first = pool.lease(key)
+    pool.release(first)
+
+    second = pool.lease(key)
+
+    assert second is not first
+    assert first.driver.quit_called
+
+
+def test_lease_waits_for_busy_device():
+    pool = SessionPool(create_session=lambda key: FakeDriver(), lease_timeout=5)
+    key = ("http://localhost:4723", "device-1", None)
+    first = pool.lease(key)
+    threading.Timer(0.05, pool.release, args=(first,)).start()
+
+    assert pool.lease(key) is first
+
+
+def test_driver_manager_reuses_sessions_on_fake_server(driver_manager, fake_server):
+    driver = driver_manager.init_driver(device={"udid": "device-1", "appium_server": fake_server.url})
+    driver_manager.quit_driver()
+    again = driver_manager.init_driver(device={"udid": "device-1", "appium_server": fake_server.url})
+    driver_manager.quit_driver()
+
+    assert again is driver
+    assert fake_server.sessions_created == 1
+
+
+def test_driver_manager_runs_devices_in_parallel(driver_manager, fake_server):
+    drivers = {}
+
+    def run(device):
+        drivers[device["udid"]] = driver_manager.init_driver(device=device)
+        driver_manager.quit_driver()
+
+    threads = [threading.Thread(target=run, args=(device,)) for device in driver_manager.get_devices()]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert set(drivers) == {"device-1", "device-2"}
+    assert drivers["device-1"] is not drivers["device-2"]
+    assert fake_server.sessions_created == 2
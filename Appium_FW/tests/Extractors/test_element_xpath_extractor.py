@@ -0,0 +1,23 @@
+import os
+
+from Appium_FW.Utils.ElementXpathExtractorBounds import ElementXpathExtractor
+
+SCREEN_SOURCE = os.path.join(os.path.dirname(__file__), "..", "..", "Utils", "screen_source.xml")
+
+
+def test_page_source_mode_matches_per_element_mode(fake_device):
+    """Both modes must produce the same records, in the same order."""
+    with open(SCREEN_SOURCE, "r", encoding="utf-8") as file:
+        server, driver = fake_device(page_source=file.read())
+    per_element = ElementXpathExtractor(driver).extract_elements_xpaths()
+
+    server.command_counts.clear()
+    page_source = ElementXpathExtractor(driver, use_page_source=True).extract_elements_xpaths()
+
+    assert page_source == per_element
+    assert sum(server.command_counts.values()) == 1
+
+
+def test_nodes_without_a_class_are_named_after_their_tag():
+    record = ElementXpathExtractor.build_record("XCUIElementTypeButton", {"bounds": "[0,0][10,10]"})
+    assert record["element_name"] == record["class_name"] == "XCUIElementTypeButton"
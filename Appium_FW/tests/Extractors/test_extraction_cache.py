@@ -0,0 +1,93 @@
+import os
+import time
+
+from Appium_FW.Utils.ElementXpathExtractorBounds import ElementXpathExtractor
+from Appium_FW.Utils.ExtractionCache import ExtractionCache
+from Appium_FW.Utils.ScreenElementExtractor import ScreenElementExtractor
+
+SCREEN_SOURCE = os.path.join(os.path.dirname(__file__), "..", "..", "Utils", "screen_source.xml")
+SCREEN = """<hierarchy>
+  <android.widget.FrameLayout class="android.widget.FrameLayout" bounds="[0,0][1080,2340]">
+    <android.widget.TextView class="android.widget.TextView" text="Title" bounds="[0,0][1080,100]"/>
+    <android.widget.Button class="android.widget.Button" text="Buy" bounds="[0,200][540,300]"/>
+    <android.widget.Button class="android.widget.Button" text="Back" bounds="[540,200][1080,300]"/>
+  </android.widget.FrameLayout>
+</hierarchy>"""
+
+
+def test_unchanged_screen_is_served_from_the_cache(tmp_path, fake_device):
+    with open(SCREEN_SOURCE, "r", encoding="utf-8") as file:
+        _, driver = fake_device(page_source=file.read())
+    cache = ExtractionCache(str(tmp_path / "cache"))
+    output_file = str(tmp_path / "xpaths.json")
+    expected = ElementXpathExtractor(driver, use_page_source=True).extract_elements_xpaths()
+
+    first = ElementXpathExtractor(driver, output_file=output_file, cache=cache)
+    first.extract_and_save()
+    assert first.elements == expected and not first.last_extraction.hit
+
+    written = os.path.getmtime(output_file)
+    second = ElementXpathExtractor(driver, output_file=output_file, cache=cache)
+    second.extract_and_save()
+    assert second.elements == expected
+    assert second.last_extraction.hit and second.last_extraction.unchanged
+    assert os.path.getmtime(output_file) == written
+
+
+def test_changed_screen_is_diffed_against_its_previous_version(tmp_path):
+    cache = ExtractionCache(str(tmp_path / "cache"))
+    output_file = str(tmp_path / "elements.json")
+
+    class Driver:
+        page_source = SCREEN
+
+    ScreenElementExtractor(Driver(), output_file, str(tmp_path / "source.xml"), cache=cache).extract()
+    # Title removed, "Buy" moved, "Help" added and the focus of "Back" changed
+    Driver.page_source = (SCREEN.replace('<android.widget.TextView class="android.widget.TextView" text="Title" '
+                                         'bounds="[0,0][1080,100]"/>', '')
+                          .replace("[0,200][540,300]", "[0,400][540,500]")
+                          .replace('text="Back"', 'text="Back" focused="true"')
+                          .replace("</android.widget.FrameLayout>",
+                                   '<android.widget.Button class="android.widget.Button" text="Help" '
+                                   'bounds="[0,600][540,700]"/></android.widget.FrameLayout>'))
+    extractor = ScreenElementExtractor(Driver(), output_file, str(tmp_path / "source.xml"), cache=cache)
+    extractor.extract()
+
+    extraction = extractor.last_extraction
+    assert extraction.diff.summary() == {"added": 1, "removed": 1, "moved": 1}
+    assert extraction.diff.moved[0]["old_bounds"] == "[0,200][540,300]"
+    assert extraction.built == 3  # Help, Buy, and Back whose focus attribute changed
+    assert extractor.elements == dict(ScreenElementExtractor.iter_elements(Driver.page_source))
+    assert "Title" not in extractor.elements
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ExtractionCache(str(tmp_path / "cache"))
+    screens = [SCREEN.replace("Title", f"Title {index}") for index in range(4)]
+    for index, screen in enumerate(screens):
+        cache.extract("test", screen, lambda tag, attrib: attrib.get("text"))
+        path = cache._entry_path("test", cache.structural_hash(screen))
+        os.utime(path, (time.time() - 100 + index, time.time() - 100 + index))
+    entry_size = cache.size() // 4
+
+    cache.extract("test", screens[0], lambda tag, attrib: None)  # A hit makes it the most recent
+    cache.max_bytes = entry_size * 2 + entry_size // 2
+    assert cache.evict() == 2
+    kept = [cache.get("test", cache.structural_hash(screen)) is not None for screen in screens]
+    assert kept == [True, False, False, True]
+
+
+def test_cache_is_walked_only_when_over_its_cap(tmp_path, monkeypatch):
+    cache = ExtractionCache(str(tmp_path / "cache"))
+    walks = []
+    entries = cache._entries
+    monkeypatch.setattr(cache, "_entries", lambda: walks.append(1) or entries())
+    screens = [SCREEN.replace("Title", f"Title {index}") for index in range(4)]
+    for screen in screens[:3]:
+        cache.extract("test", screen, lambda tag, attrib: attrib.get("text"))
+    assert len(walks) == 1  # Counted on the first write, then kept up to date
+    assert cache._size == sum(size for _, size, _ in entries())
+
+    cache.max_bytes = cache._size  # The next entry goes over the cap
+    cache.extract("test", screens[3], lambda tag, attrib: attrib.get("text"))
+    assert len(walks) == 2 and cache._size <= cache.max_bytes
@@ -0,0 +1,62 @@
+import json
+import os
+import sys
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from Appium_FW.Utils.ScreenElementExtractor import ScreenElementExtractor
+
+SCREEN_SOURCE = os.path.join(os.path.dirname(__file__), "..", "..", "Utils", "screen_source.xml")
+
+
+def recursive_records(node, records):
+    """The extraction as it was before streaming: one recursive call per node."""
+    record = ScreenElementExtractor.build_element(node.tag, node.attrib)
+    if record:
+        records.append(record)
+    for child in list(node):
+        recursive_records(child, records)
+    return records
+
+
+def nested(depth: int) -> str:
+    opening = "".join(f'<android.view.ViewGroup class="android.view.ViewGroup" resource-id="app:id/level_{level}">'
+                      for level in range(depth))
+    return f"<hierarchy>{opening}{'</android.view.ViewGroup>' * depth}</hierarchy>"
+
+
+def test_streamed_records_match_the_recursive_extraction():
+    with open(SCREEN_SOURCE, "rb") as file:
+        source = file.read()
+    expected = recursive_records(ET.fromstring(source), [])
+    assert list(ScreenElementExtractor.iter_elements(source)) == expected
+    assert list(ScreenElementExtractor.iter_elements(source.decode("utf-8"))) == expected
+    with open(SCREEN_SOURCE, "rb") as file:
+        assert list(ScreenElementExtractor.iter_elements(file)) == expected
+
+
+def test_deep_hierarchies_do_not_hit_the_recursion_limit(tmp_path):
+    depth = sys.getrecursionlimit() * 2
+    source = nested(depth)
+    with pytest.raises(RecursionError):
+        recursive_records(ET.fromstring(source), [])
+
+    class Driver:
+        page_source = source
+
+    extractor = ScreenElementExtractor(Driver(), str(tmp_path / "elements.json"), str(tmp_path / "source.xml"))
+    extractor.extract()
+    elements = json.loads((tmp_path / "elements.json").read_text())
+    assert len(elements) == depth
+    assert elements[f"app:id/level_{depth - 1}"] == {"xpath": f"//*[@resource-id='app:id/level_{depth - 1}']"}
+
+
+def test_unparsable_sources_are_logged(tmp_path, caplog):
+    class Driver:
+        page_source = "<hierarchy><android.widget.Button"
+
+    extractor = ScreenElementExtractor(Driver(), str(tmp_path / "elements.json"), str(tmp_path / "source.xml"))
+    extractor.extract()
+    assert "Error parsing screen source" in caplog.text
+    assert json.loads((tmp_path / "elements.json").read_text()) == {}
@@ -0,0 +1,53 @@
+import os
+
+from Appium_FW.Utils.LocatorOptimizer import LocatorOptimizer
+
+SCREEN_SOURCE = os.path.join(os.path.dirname(__file__), "..", "..", "Utils", "screen_source.xml")
+
+
+def optimizer():
+    return LocatorOptimizer.from_file(SCREEN_SOURCE)
+
+
+def xpath(value):
+    return {"android_locator": {"type": "xpath", "value": value}}
+
+
+def test_slow_xpaths_are_rewritten_to_the_cheapest_unique_strategy():
+    locators = {
+        "menu": xpath("//*[contains(@content-desc,'test-Menu')]"),
+        "products": xpath("//*[contains(@text,'PRODUCTS')]"),
+        "root": {"android_locator": {"type": "id", "value": "android:id/content"},
+                 "ios_locator": {"type": "accessibility_id", "value": "root"}},
+    }
+    rewritten, report = optimizer().optimize(locators)
+
+    assert rewritten["menu"]["android_locator"] == {"type": "accessibility_id", "value": "test-Menu"}
+    assert rewritten["products"]["android_locator"]["type"] == "android_uiautomator"
+    assert rewritten["root"] == locators["root"]  # Already optimal, other platforms untouched
+    assert report["statuses"] == {"optimized": 2, "kept": 1}
+    assert report["expected_speedup"] > 1
+
+
+def test_ambiguous_and_missing_locators_are_left_alone():
+    locators = {"add_to_cart": xpath("//*[contains(@text,'ADD TO CART')]"), "gone": xpath("//*[@text='nope']")}
+    rewritten, report = optimizer().optimize(locators)
+    assert rewritten == locators
+    assert [entry["status"] for entry in report["locators"]] == ["ambiguous", "missing"]
+
+
+def test_every_candidate_is_checked_for_uniqueness():
+    optimizer_ = optimizer()
+    node = optimizer_.snapshot.find_all("xpath", "//android.widget.TextView[@text='ADD TO CART']")[0]
+    candidates = optimizer_.candidates(node)
+    assert candidates[0].unique
+    assert optimizer_.match(candidates[0].locator_type, candidates[0].value) == [node]
+    assert any(not candidate.unique for candidate in candidates)  # Same text on every product card
+
+
+def test_generated_locators_have_unique_names_that_resolve():
+    optimizer_ = optimizer()
+    locators, _ = optimizer_.locators_for_screen()
+    assert "test_item" in locators and "test_item_2" in locators
+    for name, info in locators.items():
+        assert len(optimizer_.match(info["android_locator"]["type"], info["android_locator"]["value"])) == 1, name
@@ -0,0 +1,42 @@
+import json
+import os
+
+import pytest
+from appium.webdriver.common.appiumby import AppiumBy
+
+from Appium_FW.Utils.LocatorLoader import LocatorLoader
+
+
+def write_locators(path, value, mtime_ns=None):
+    path.write_text(json.dumps({"button": {"android_locator": {"type": "id", "value": value}}}))
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_changed_files_are_reloaded(workdir):
+    path = workdir / "shop_locators.json"
+    write_locators(path, "app:id/buy", mtime_ns=1_000_000_000)
+    assert LocatorLoader(page="shop").get_by("button") == (AppiumBy.ID, "app:id/buy")
+    assert LocatorLoader(page="shop").locators is LocatorLoader(page="shop").locators  # Parsed once
+
+    write_locators(path, "app:id/checkout", mtime_ns=2_000_000_000)
+    assert LocatorLoader(page="shop").get_by("button") == (AppiumBy.ID, "app:id/checkout")
+
+
+def test_invalid_locator_types_fail_on_load(workdir):
+    (workdir / "shop_locators.json").write_text(json.dumps({
+        "button": {"android_locator": {"type": "css_class", "value": "buy"}}}))
+    with pytest.raises(ValueError, match="Locator 'button' .*Invalid locator type: css_class"):
+        LocatorLoader(page="shop")
+
+
+def test_shared_locators_cannot_be_changed(workdir):
+    write_locators(workdir / "shop_locators.json", "app:id/buy")
+    loader = LocatorLoader(page="shop")
+    with pytest.raises(TypeError):
+        loader.compiled_locators["button"] = (AppiumBy.ID, "app:id/other")
+    with pytest.raises(TypeError):
+        loader.locators["button"] = {}
+    with pytest.raises(TypeError):
+        loader.get_locator("button")["value"] = "app:id/other"
+    assert LocatorLoader(page="shop").get_by("button") == (AppiumBy.ID, "app:id/buy")
@@ -0,0 +1,108 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from Appium_FW.Utils.LocatorLoader import LocatorLoader, LocatorRegistry
+from Appium_FW.Utils.ResourceBundle import BUNDLE_ENV, ResourceBundle
+from Appium_FW.Utils.ResourcePaths import PACKAGE_DIR, ResourcePaths
+from Appium_FW.Utils.TestDataLoader import TestDataLoader
+
+
+@pytest.fixture(autouse=True)
+def no_default_bundle(fresh_registries, monkeypatch):
+    # No resource files in the working directory and no bundle unless the test builds one
+    monkeypatch.setenv(BUNDLE_ENV, str(fresh_registries / "missing.bundle"))
+
+
+def test_packaged_resources_are_found_from_any_directory():
+    loader = LocatorLoader(page="login")
+    assert os.path.samefile(loader.locator_path, os.path.join(PACKAGE_DIR, "pages", "LoginPage", "login_locators.json"))
+    assert loader.device_type == "android"
+    assert loader.get_by("login_button")
+    assert TestDataLoader.shared("test_data.json").get_test_data("test_login_valid_user")["username"]
+
+
+def test_bundle_serves_locators_without_parsing(tmp_path, monkeypatch):
+    bundle_path = str(tmp_path / "resources.bundle")
+    ResourceBundle.build(bundle_path)
+    LocatorRegistry.clear()
+    monkeypatch.setenv(BUNDLE_ENV, bundle_path)
+
+    def no_parsing(*args):
+        raise AssertionError("Locator file parsed although it is bundled")
+
+    monkeypatch.setattr(LocatorRegistry, "_validate", no_parsing)
+    loader = LocatorLoader(page="login")  # Installs the bundle on first use
+    assert loader.get_by("login_button") == LocatorRegistry.compiled(loader.locator_path, "android")["login_button"]
+
+
+def test_stale_entries_are_reparsed(tmp_path, monkeypatch):
+    bundle = ResourceBundle.load(ResourceBundle.build(str(tmp_path / "resources.bundle")))
+    bundle.index["locators"]["login"]["mtime"] -= 1  # As if the file was edited after the build  # As if the file was edited after the build
+    decode = bundle.decode
+
+    def no_stale_decoding(entry):
+        if entry["path"].endswith("login_locators.json"):
+            pytest.fail("Stale entry decoded")
+        return decode(entry)
+
+    monkeypatch.setattr(bundle, "decode", no_stale_decoding)  # Before install(), which binds it
+    LocatorRegistry.clear()
+    bundle.install()
+    ResourcePaths._bundle_checked = True
+    assert LocatorLoader(page="login").get_by("login_button")
+
+
+def test_default_bundle_is_installed_once_for_every_loader(monkeypatch):
+    installs = []
+    monkeypatch.setattr(ResourceBundle, "install_default", classmethod(lambda cls: installs.append(cls)))
+    LocatorLoader(page="login")
+    TestDataLoader.shared("test_data.json")
+    assert len(installs) == 1
+
+
+def test_only_used_pages_are_decoded(tmp_path):
+    files = {}
+    for page in ("first", "second"):
+        files[page] = str(tmp_path / f"{page}_locators.json")
+        with open(files[page], "w") as file:
+            json.dump({"button": {"android_locator": {"type": "id", "value": page}}}, file)
+    bundle = ResourceBundle.load(ResourceBundle.build(str(tmp_path / "resources.bundle"), locator_files=files))
+    decoded = []
+    decode = bundle.decode
+    bundle.decode = lambda entry: decoded.append(entry["path"]) or decode(entry)
+    LocatorRegistry.clear()
+    bundle.install()
+    ResourcePaths._bundle_checked = True
+
+    assert LocatorLoader(page="second").get_by("button") == ("id", "second")
+    # Test data is decoded on install, the first page is never decoded
+    assert [os.path.basename(path) for path in decoded] == ["test_data.json", "second_locators.json", "config.json"]
+
+
+def test_invalid_bundles_are_rejected(tmp_path, monkeypatch):
+    path = tmp_path / "resources.bundle"
+    ResourceBundle.build(str(path))
+    content = bytearray(path.read_bytes())
+    content[ResourceBundle.HEADER.size] ^= 0xFF
+    path.write_bytes(bytes(content))
+    with pytest.raises(ValueError, match="corrupt"):
+        ResourceBundle.load(str(path))
+
+    monkeypatch.setattr(ResourceBundle, "FORMAT_VERSION", ResourceBundle.FORMAT_VERSION + 1)
+    with pytest.raises(ValueError, match="rebuild"):
+        ResourceBundle.load(str(path))
+
+    monkeypatch.setenv(BUNDLE_ENV, str(path))
+    assert ResourceBundle.install_default() is False  # Skipped, the loaders parse the files instead
+
+
+def test_importing_the_pages_package_imports_no_page():
+    code = ("import sys, Appium_FW.pages as pages; assert not [m for m in sys.modules if m.endswith('_page')]; "
+            "assert pages.PageRegistry.get('login').__name__ == 'LoginPage'; print('ok')")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            cwd=os.path.dirname(PACKAGE_DIR))
+    assert result.stdout.strip() == "ok", result.stderr
@@ -12,8 +12,8 @@ class LoginTest:
         # Initialize the Appium driver
         self.driver = DriverManager.init_driver()
 
-        # Load the test data from the JSON file
-        self.test_data_loader = TestDataLoader('test_data.json')
+        # Get the process-wide loader of the test data (read once, not once per test)
+        self.test_data_loader = TestDataLoader.shared('test_data.json')
 
         # Create an instance of LoginPage with the driver
         self.login_obj = LoginPage(self.driver)
@@ -0,0 +1,50 @@
+import json
+
+from Appium_FW.Utils.ShardScheduler import DurationStore, ShardScheduler
+
+DEVICES = [{"udid": "device-1"}, {"udid": "device-2"}]
+
+
+def module_of(node_id):
+    return node_id.split("::", 1)[0]
+
+
+def test_groups_are_balanced_by_recorded_durations(tmp_path):
+    durations = DurationStore(str(tmp_path))
+    for node_id, seconds in {"a.py::t1": 30, "a.py::t2": 30, "b.py::t1": 40, "c.py::t1": 20}.items():
+        durations.record(node_id, seconds)
+
+    shards = ShardScheduler(DEVICES, durations).plan(list(durations.durations), module_of)
+
+    assert sorted(shard.expected_seconds for shard in shards) == [60, 60]
+    assert ShardScheduler.imbalance(shards)["imbalance_ratio"] == 1.0
+
+
+def test_tests_of_a_group_stay_on_one_device(tmp_path):
+    node_ids = [f"login.py::t{i}" for i in range(5)] + ["cart.py::t1"]
+
+    shards = ShardScheduler(DEVICES, DurationStore(str(tmp_path))).plan(node_ids, module_of)
+
+    assert {tuple(shard.groups) for shard in shards} == {("login.py",), ("cart.py",)}
+
+
+def test_durations_survive_between_runs(tmp_path):
+    store = DurationStore(str(tmp_path))
+    store.record("a.py::t1", 2.0)
+    store.save("shard-0")
+
+    assert DurationStore(str(tmp_path)).load().estimate("a.py::t1", default=0) == 2.0
+
+
+def test_the_newest_measurement_wins_across_shard_files(tmp_path):
+    # shard-1 sorts after shard-0 but holds the older measurement
+    (tmp_path / "shard-0.json").write_text(json.dumps({"a.py::t1": {"seconds": 5.0, "recorded": 200.0}}))
+    (tmp_path / "shard-1.json").write_text(json.dumps({"a.py::t1": {"seconds": 1.0, "recorded": 100.0},
+                                                       "b.py::t1": {"seconds": 3.0, "recorded": 300.0}}))
+
+    store = DurationStore(str(tmp_path)).load()
+    assert store.estimate("a.py::t1", default=0) == 5.0
+
+    early = DurationStore(str(tmp_path)).load(not_after=250.0)
+    assert early.estimate("a.py::t1", default=0) == 5.0
+    assert early.estimate("b.py::t1", default=0) == 0  # Recorded after the run started
@@ -0,0 +1,119 @@
+import json
+import types
+
+import pytest
+
+pytest_plugins = ["pytester"]
+
+PLUGIN = ("-p", "Appium_FW.plugins.change_selection", "-p", "no:cacheprovider")
+
+
+@pytest.fixture
+def suite(pytester):
+    pytester.makefile(".json", config=json.dumps({"device_type": "android"}))
+    locators = {name: {"android_locator": {"type": "id", "value": name}, "ios_locator": {"type": "id", "value": name}}
+                for name in ("username", "password", "login_button")}
+    pytester.makefile(".json", login_locators=json.dumps(locators))
+    pytester.makefile(".json", test_data=json.dumps({"valid": {"user": "a"}, "locked": {"user": "b"}}))
+    pytester.makepyfile(test_suite="""
+        from Appium_FW.Utils.LocatorLoader import LocatorLoader
+        from Appium_FW.Utils.TestDataLoader import TestDataLoader
+
+        def test_username():
+            LocatorLoader(page="login").get_locator("username")
+
+        def test_button():
+            LocatorLoader(page="login").get_by("login_button")
+
+        def test_valid_data():
+            TestDataLoader("test_data.json").get_test_data("valid")
+
+        def test_locked_data():
+            TestDataLoader("test_data.json").get_test_data("locked")
+    """)
+    pytester.runpytest(*PLUGIN).assert_outcomes(passed=4)
+    return pytester
+
+
+def rewrite(pytester, name, change):
+    path = pytester.path / name
+    content = json.loads(path.read_text())
+    change(content)
+    path.write_text(json.dumps(content))
+
+
+def test_dependencies_are_recorded_per_entry(suite):
+    records = json.loads((suite.path / ".test_dependencies.json").read_text())["tests"]
+    dependencies = {kind_and_name[0] for kind_and_name in records["test_suite.py::test_button"]["dependencies"]}
+    assert dependencies == {"page", "locator", "file"}
+    assert ["data", "test_data.json", "name", "locked"] == records["test_suite.py::test_locked_data"]["dependencies"][0][:-1]
+
+    result = suite.runpytest(*PLUGIN, "--changed-only", "--changed-sample", "0")
+    result.assert_outcomes(deselected=4)
+    result.stdout.fnmatch_lines(["0 tests selected *, 0 sampled, 4 deselected"])
+
+
+def test_only_tests_of_changed_entries_are_selected(suite):
+    rewrite(suite, "login_locators.json", lambda locators: locators["login_button"]["android_locator"].update(value="b"))
+    rewrite(suite, "test_data.json", lambda data: data["locked"].update(user="c"))
+
+    result = suite.runpytest(*PLUGIN, "--changed-only", "--changed-sample", "0", "-v")
+    result.assert_outcomes(passed=2, deselected=2)
+    result.stdout.fnmatch_lines(["*test_button PASSED*", "*test_locked_data PASSED*"])
+
+    # They passed with the new content and are not selected again
+    suite.runpytest(*PLUGIN, "--changed-only", "--changed-sample", "0").assert_outcomes(deselected=4)
+
+
+def test_safety_sample_and_failed_tests_still_run(suite):
+    suite.makepyfile(test_new="def test_new():\n    assert False\n")
+    suite.runpytest(*PLUGIN, "--changed-only", "--changed-sample", "0").assert_outcomes(failed=1, deselected=4)
+
+    result = suite.runpytest(*PLUGIN, "--changed-only", "--changed-sample", "0.3", "--changed-seed", "1")
+    result.assert_outcomes(failed=1, passed=2, deselected=2)  # ceil(4 * 0.3) sampled
+
+
+def test_skipped_tests_run_again(suite):
+    suite.makepyfile(test_skipped="""
+        import os
+        import pytest
+
+        def test_device_only():
+            if not os.path.exists("device.flag"):
+                pytest.skip("no device")
+    """)
+    suite.runpytest(*PLUGIN, "--changed-only", "--changed-sample", "0").assert_outcomes(skipped=1, deselected=4)
+    records = json.loads((suite.path / ".test_dependencies.json").read_text())["tests"]
+    assert records["test_skipped.py::test_device_only"]["outcome"] == "skipped"
+
+    (suite.path / "device.flag").write_text("")
+    suite.runpytest(*PLUGIN, "--changed-only", "--changed-sample", "0").assert_outcomes(passed=1, deselected=4)
+    suite.runpytest(*PLUGIN, "--changed-only", "--changed-sample", "0").assert_outcomes(deselected=5)
+
+
+def test_config_and_conftest_changes_select_every_test(suite):
+    rewrite(suite, "config.json", lambda config: config.update(device_type="ios"))
+    suite.runpytest(*PLUGIN, "--changed-only", "--changed-sample", "0").assert_outcomes(passed=4)
+
+    suite.makeconftest("import pytest\n")
+    suite.runpytest(*PLUGIN, "--changed-only", "--changed-sample", "0").assert_outcomes(passed=4)
+    suite.runpytest(*PLUGIN, "--changed-only", "--changed-sample", "0").assert_outcomes(deselected=4)
+
+
+def test_concurrent_sessions_and_workers_merge_their_records(suite):
+    first = suite.parseconfigure(*PLUGIN).pluginmanager.get_plugin("change-selection")
+    second = suite.parseconfigure(*PLUGIN).pluginmanager.get_plugin("change-selection")
+    first._record("test_shard_a.py::test_a", set())
+    second._record("test_shard_b.py::test_b", set())
+    first._save()
+    second._save()  # Loaded before the first save, yet keeps its records
+    records = json.loads((suite.path / ".test_dependencies.json").read_text())["tests"]
+    assert {"test_shard_a.py::test_a", "test_shard_b.py::test_b", "test_suite.py::test_username"} <= set(records)
+
+    # An xdist controller takes over what its workers recorded
+    controller = suite.parseconfigure(*PLUGIN).pluginmanager.get_plugin("change-selection")
+    worker = types.SimpleNamespace(workeroutput={"change_selection": {"test_worker.py::test_w": records[
+        "test_shard_a.py::test_a"]}})
+    controller.pytest_testnodedown(worker, None)
+    controller.pytest_sessionfinish(None)
+    assert "test_worker.py::test_w" in json.loads((suite.path / ".test_dependencies.json").read_text())["tests"]
@@ -0,0 +1,66 @@
+import json
+import os
+
+import pytest
+
+from Appium_FW.Utils.TestDataLoader import OffsetIndex, TestDataLoader
+
+pytest_plugins = ["pytester"]
+
+
+@pytest.fixture
+def jsonl_file(tmp_path):
+    path = tmp_path / "users.jsonl"
+    with open(path, "w") as file:
+        for i in range(1000):
+            file.write(json.dumps({"name": f"user_{i}", "username": f"u{i}", "password": f"p{i}"}) + "\n")
+    return str(path)
+
+
+def test_jsonl_lookups_go_through_the_offset_index(jsonl_file):
+    loader = TestDataLoader(jsonl_file)
+    assert loader.get_test_data("user_742") == {"username": "u742", "password": "p742"}
+    assert OffsetIndex(f"{jsonl_file}.idx", jsonl_file).is_current()
+    assert loader._test_data is None  # Nothing was materialized
+    with pytest.raises(KeyError):
+        loader.get_test_data("user_1000")
+
+
+def test_index_is_rebuilt_when_the_data_changes(jsonl_file):
+    loader = TestDataLoader(jsonl_file)
+    loader.get_test_data("user_1")
+    with open(jsonl_file, "a") as file:
+        file.write(json.dumps({"name": "late_user", "username": "late", "password": "x"}) + "\n")
+    assert loader.get_test_data("late_user")["username"] == "late"
+
+
+def test_csv_cases_are_streamed_including_multiline_fields(tmp_path):
+    path = tmp_path / "users.csv"
+    path.write_text('name,username,note\nfirst,a,"two\nlines"\nsecond,b,plain\n')
+    loader = TestDataLoader(str(path))
+    assert list(loader.iter_names()) == ["first", "second"]
+    assert loader.get_test_data("second") == {"username": "b", "note": "plain"}
+    assert loader.get_test_data("first")["note"] == "two\nlines"
+
+
+def test_shared_loader_is_reused_until_the_file_changes(tmp_path):
+    path = tmp_path / "test_data.json"
+    path.write_text(json.dumps({"test_a": {"username": "a"}}))
+    loader = TestDataLoader.shared(str(path))
+    assert TestDataLoader.shared(str(path)) is loader
+
+    path.write_text(json.dumps({"test_a": {"username": "changed"}}))
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+    assert TestDataLoader.shared(str(path)).get_test_data("test_a") == {"username": "changed"}
+
+
+def test_plugin_parametrizes_from_the_dataset(pytester, jsonl_file):
+    pytester.makepyfile(f"""
+        import pytest
+
+        @pytest.mark.data_driven({jsonl_file!r})
+        def test_login(test_case):
+            assert test_case["username"].startswith("u")
+    """)
+    result = pytester.runpytest("-p", "Appium_FW.plugins.data_driven", "--data-driven-limit", "25")
+    result.assert_outcomes(passed=25)
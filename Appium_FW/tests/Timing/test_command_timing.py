@@ -0,0 +1,108 @@
+import csv
+import json
+import time
+
+import pytest
+
+from Appium_FW.Utils.AppiumActions import AppiumActions
+from Appium_FW.Utils.Instrumentation import Instrumentation
+
+pytest_plugins = ["pytester"]
+
+
+class Executor:
+    """Command executor whose every round trip takes the same time."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def execute(self, command, params):
+        time.sleep(self.latency)
+        return {"value": None}
+
+
+class Driver:
+    def __init__(self, latency: float = 0.0):
+        self.command_executor = Executor(latency)
+
+
+@pytest.fixture(autouse=True)
+def instrumentation():
+    Instrumentation.reset()
+    yield Instrumentation
+    Instrumentation.disable()
+    Instrumentation.reset()
+
+
+def test_disabled_instrumentation_leaves_the_driver_unwrapped():
+    driver = Driver()
+    AppiumActions(driver, locator_loader=None)
+    assert "execute" not in vars(driver.command_executor)
+    assert not hasattr(driver.command_executor, "_instrumented")
+
+
+def test_steps_are_split_into_device_and_wait_time():
+    Instrumentation.enable()
+    driver = AppiumActions(Driver(latency=0.02), locator_loader=None).driver
+    with Instrumentation.step("find", "login_button", "id"):
+        driver.command_executor.execute("findElement", {})
+        time.sleep(0.05)  # Polling between attempts
+
+    step = Instrumentation.report()["steps"][0]
+    assert (step["action"], step["locator"], step["strategy"]) == ("find", "login_button", "id")
+    assert 20 <= step["device"]["total_ms"] < 50
+    assert step["wait"]["total_ms"] >= 50
+    assert step["total"]["total_ms"] == pytest.approx(step["device"]["total_ms"] + step["wait"]["total_ms"], abs=1)
+
+
+def test_reports_are_exported_as_json_and_csv(tmp_path):
+    Instrumentation.enable()
+    driver = AppiumActions(Driver(), locator_loader=None).driver
+    with Instrumentation.step("click", "login_button", "id"):
+        driver.command_executor.execute("findElement", {})
+        driver.command_executor.execute("clickElement", {})
+    Instrumentation.record_flow("login", device_calls=3, unbatched_calls=7, seconds=0.1)
+
+    Instrumentation.export_json(str(tmp_path / "timings.json"))
+    report = json.loads((tmp_path / "timings.json").read_text())
+    assert [(command["category"], command["command"]) for command in report["commands"]] == [
+        ("click", "clickElement"), ("find", "findElement")]
+    assert report["steps"][0]["device"]["count"] == 1
+    assert report["flows"][0]["saved_calls"] == 4
+
+    Instrumentation.export_csv(str(tmp_path / "timings.csv"))
+    with open(tmp_path / "timings.csv", newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert [(row["kind"], row["name"], row["measure"]) for row in rows] == [
+        ("step", "click", "total"), ("step", "click", "device"), ("step", "click", "wait"),
+        ("command", "clickElement", "click"), ("command", "findElement", "find"),
+        ("flow", "login", "3/7 calls")]
+    assert all(row["count"] == "1" for row in rows)
+
+
+def test_plugin_writes_the_reports_and_lists_the_slowest_steps(pytester):
+    pytester.makepyfile(test_suite="""
+        from Appium_FW.Utils.Instrumentation import Instrumentation
+
+        def test_step():
+            with Instrumentation.step("click", "login_button", "id"):
+                Instrumentation.record_command("clickElement", 0.01)
+    """)
+    result = pytester.runpytest("-p", "Appium_FW.plugins.command_timing", "--appium-timings=timings",
+                                "-p", "no:cacheprovider")
+    result.assert_outcomes(passed=1)
+    result.stdout.fnmatch_lines(["*slowest locators/steps*", "*click login_button [[]id[]]: 1 calls*"])
+    assert (pytester.path / "timings" / "timings.json").exists()
+    assert (pytester.path / "timings" / "timings.csv").exists()
+
+
+def test_plugin_without_the_option_records_nothing(pytester):
+    pytester.makepyfile(test_suite="""
+        from Appium_FW.Utils.Instrumentation import Instrumentation
+
+        def test_disabled():
+            assert not Instrumentation.enabled
+    """)
+    result = pytester.runpytest("-p", "Appium_FW.plugins.command_timing", "-p", "no:cacheprovider")
+    result.assert_outcomes(passed=1)
+    assert not (pytester.path / "timings").exists()
@@ -0,0 +1,60 @@
+"""
+Fixtures shared by the framework's tests: a throwaway working directory for the loaders and
+sessions on a FakeAppiumServer.
+"""
+import contextlib
+import json
+import os
+import shutil
+
+import pytest
+
+from Appium_FW.Utils.LocatorLoader import LocatorRegistry
+from Appium_FW.Utils.ResourcePaths import PAGES_DIR, ResourcePaths
+from Appium_FW.Utils.TestDataLoader import TestDataLoader
+from Appium_FW.testing.FakeAppiumServer import FakeAppiumServer
+from Appium_FW.testing.SampleApps import LOGIN_PACKAGE, start_driver
+
+
+@pytest.fixture
+def fresh_registries(tmp_path, monkeypatch):
+    """An empty temporary working directory, with the shared locator and resource state reset around the test."""
+    monkeypatch.chdir(tmp_path)
+    LocatorRegistry.clear()
+    ResourcePaths.clear()
+    ResourcePaths.reset_bundle()
+    yield tmp_path
+    LocatorRegistry.clear()
+    ResourcePaths.clear()
+    ResourcePaths.reset_bundle()
+    TestDataLoader._shared.clear()
+
+
+@pytest.fixture
+def workdir(fresh_registries):
+    """A working directory with an Android config.json, where only the files written by the test are loaded."""
+    ResourcePaths._bundle_checked = True  # No default bundle either
+    (fresh_registries / "config.json").write_text(json.dumps({"device_type": "android"}))
+    return fresh_registries
+
+
+@pytest.fixture
+def login_workdir(workdir):
+    """workdir with LoginPage's locators copied in."""
+    shutil.copy(os.path.join(PAGES_DIR, "LoginPage", "login_locators.json"), workdir)
+    return workdir
+
+
+@pytest.fixture
+def fake_device():
+    """
+    Start a FakeAppiumServer and a session on it: fake_device(platform=..., app_package=..., **server_options)
+    returns (server, driver). Both are shut down after the test.
+    """
+    with contextlib.ExitStack() as stack:
+        def start(platform: str = "Android", app_package: str = LOGIN_PACKAGE, **server_options):
+            server = stack.enter_context(FakeAppiumServer(**server_options))
+            driver = start_driver(server, platform, app_package)
+            stack.callback(driver.quit)
+            return server, driver
+        yield start